@@ -0,0 +1,433 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tempfile
+import tracemalloc
+
+import numpy as np
+import torch
+
+from entire_game import *
+from casino_poker import *
+from pyro_simulation import *
+from casino_game_simulator import *
+from table_simulation import TableSimulator
+from deal_corpus import generate_deal_corpus, CorpusPokerGame
+from outs_analyzer import DrawAnalysis
+import jit_kernels
+
+# Registered benchmarks: name -> (setup function, operations per call)
+BENCHMARKS = {}
+
+DEFAULT_SEED = 1234
+
+
+def benchmark(name, ops_per_call=1):
+    """
+    Register a benchmark.
+
+    The decorated function is the setup: it runs untimed and returns the
+    zero-argument callable that is timed. ops_per_call converts calls into
+    the unit reported as ops/sec (e.g. showdowns for a Monte Carlo scenario).
+    A cleanup attribute on the callable runs once its timing is done.
+    """
+    def register(setup):
+        BENCHMARKS[name] = (setup, ops_per_call)
+        return setup
+    return register
+
+
+def seed_everything(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+    torch.manual_seed(seed)
+
+
+def _sample_deals(count):
+    # Fixed list of deals built from the seeded global random state
+    game = PokerGame()
+    return [game.deal_cards() for _ in range(count)]
+
+
+@benchmark('evaluator.evaluate_hand')
+def bench_evaluate_hand():
+    evaluator = PokerHandEvaluator()
+    deals = _sample_deals(256)
+    state = {'i': 0}
+
+    def run():
+        deal = deals[state['i'] % len(deals)]
+        state['i'] += 1
+        evaluator.evaluate_hand(deal['Player 1'], deal['Community Cards'])
+    return run
+
+
+@benchmark('evaluator.determine_winner')
+def bench_determine_winner():
+    deals = _sample_deals(256)
+    state = {'i': 0}
+
+    def run():
+        deal = deals[state['i'] % len(deals)]
+        state['i'] += 1
+        determine_winner(deal['Player 1'], deal['Player 2'], deal['Community Cards'])
+    return run
+
+
+@benchmark('game.deal_cards')
+def bench_deal_cards():
+    game = PokerGame()
+    return game.deal_cards
+
+
+@benchmark('game.deal_streets')
+def bench_deal_streets():
+    # The dealing path of CasinoGameSimulator.simulate_hand (via _find_unique_card)
+    game = PokerGame()
+
+    def run():
+        game.reset_deck()
+        game.deal_player_cards()
+        game.deal_opponent_cards()
+        game.deal_flop()
+        game.deal_turn()
+        game.deal_river()
+    return run
+
+
+@benchmark('game.deal_streets_corpus')
+def bench_deal_streets_corpus():
+    # game.deal_streets reading pre-generated deals from a memory-mapped corpus
+    directory = tempfile.TemporaryDirectory(prefix='uth_bench_')
+    game = CorpusPokerGame(generate_deal_corpus(os.path.join(directory.name, 'deals.npy'), 1 << 18,
+                                                seed=DEFAULT_SEED))
+
+    def run():
+        if game.position >= game.stop:
+            game.position = 0
+        game.reset_deck()
+        game.deal_player_cards()
+        game.deal_opponent_cards()
+        game.deal_flop()
+        game.deal_turn()
+        game.deal_river()
+    run.cleanup = directory.cleanup
+    return run
+
+
+@benchmark('corpus.generate', ops_per_call=1 << 16)
+def bench_generate_corpus():
+    directory = tempfile.TemporaryDirectory(prefix='uth_bench_')
+    path = os.path.join(directory.name, 'deals.npy')
+
+    def run():
+        generate_deal_corpus(path, 1 << 16, seed=DEFAULT_SEED)
+    run.cleanup = directory.cleanup
+    return run
+
+
+def _scenario_hand():
+    deal = _sample_deals(1)[0]
+    return deal['Player 1'], deal['Community Cards']
+
+
+@benchmark('simulation.simulate_poker_hands_1v1', ops_per_call=100)
+def bench_simulate_1v1():
+    simulator = PyroPokerSimulation(PokerGame())
+    deal = _sample_deals(1)[0]
+    return lambda: simulator.simulate_poker_hands_1v1(deal['Player 1'], deal['Player 2'], num_simulations=100)
+
+
+@benchmark('simulation.simulate_pre_flop', ops_per_call=10 * 10)
+def bench_simulate_pre_flop():
+    simulator = PyroPokerSimulation(PokerGame())
+    player_cards, _ = _scenario_hand()
+    return lambda: simulator.simulate_pre_flop(player_cards, 10, 10)
+
+
+@benchmark('simulation.simulate_scenario_1', ops_per_call=10 * 10)
+def bench_simulate_scenario_1():
+    simulator = PyroPokerSimulation(PokerGame())
+    player_cards, board = _scenario_hand()
+    return lambda: simulator.simulate_scenario_1(player_cards, board[:3], 10, 10)
+
+
+@benchmark('simulation.simulate_scenario_2', ops_per_call=10 * 10)
+def bench_simulate_scenario_2():
+    simulator = PyroPokerSimulation(PokerGame())
+    player_cards, board = _scenario_hand()
+    return lambda: simulator.simulate_scenario_2(player_cards, board[:3], board[3], 10, 10)
+
+
+@benchmark('simulation.simulate_scenario_3', ops_per_call=100)
+def bench_simulate_scenario_3():
+    simulator = PyroPokerSimulation(PokerGame())
+    player_cards, board = _scenario_hand()
+    return lambda: simulator.simulate_scenario_3(player_cards, board, 100)
+
+
+@benchmark('simulation.simulate_multiway', ops_per_call=1000 * 6)
+def bench_simulate_multiway():
+    # ops are player-hands, so cost per opponent shows up as a flat ops/sec
+    simulator = PyroPokerSimulation(PokerGame())
+    player_cards, board = _scenario_hand()
+    return lambda: simulator.simulate_multiway(player_cards, 5, board[:3], num_trials=1000)
+
+
+@benchmark('simulation.simulate_scenario_3_exact')
+def bench_simulate_scenario_3_exact():
+    # Fresh boards each call, so this times the board precomputation plus one lookup
+    simulator = PyroPokerSimulation(PokerGame())
+    deals = _sample_deals(4096)
+    state = {'i': 0}
+
+    def run():
+        deal = deals[state['i'] % len(deals)]
+        state['i'] += 1
+        simulator.simulate_scenario_3(deal['Player 1'], deal['Community Cards'], exact=True)
+    return run
+
+
+@benchmark('jit.rank_hands', ops_per_call=4096)
+def bench_jit_rank_hands():
+    hands = np.array([np.random.permutation(52)[:7] for _ in range(4096)])
+    return lambda: jit_kernels.rank_hands(hands)
+
+
+@benchmark('jit.showdown_tally', ops_per_call=10000)
+def bench_jit_showdown_tally():
+    player_cards, board = _scenario_hand()
+    return lambda: jit_kernels.showdown_tally(player_cards, board[:3], 10000)
+
+
+@benchmark('outs.analyze_flop')
+def bench_analyze_flop():
+    # Exact turn and river category distribution plus the draw features
+    deals = _sample_deals(256)
+    state = {'i': 0}
+
+    def run():
+        deal = deals[state['i'] % len(deals)]
+        state['i'] += 1
+        DrawAnalysis(deal['Player 1'], deal['Community Cards'][:3])
+    return run
+
+
+@benchmark('lookup.get_win_rate')
+def bench_get_win_rate():
+    deals = _sample_deals(256)
+    state = {'i': 0}
+
+    def run():
+        deal = deals[state['i'] % len(deals)]
+        state['i'] += 1
+        get_win_rate(deal['Player 1'], data)
+    return run
+
+
+@benchmark('casino.resolve_round')
+def bench_resolve_round():
+    casino_game = CasinoPokerGame(initial_player_stack=10 ** 9)
+    outcomes = [(random.randint(1, 10), random.randint(1, 10), random.randint(1, 3)) for _ in range(256)]
+    state = {'i': 0}
+
+    def run():
+        player_score, dealer_score, winner = outcomes[state['i'] % len(outcomes)]
+        state['i'] += 1
+        casino_game.place_bet(10)
+        casino_game.place_blind_bet()
+        casino_game.place_trip_bet(5)
+        casino_game.place_flop_bet()
+        casino_game.resolve_round(player_score, dealer_score, winner)
+        # Keep the history from growing over millions of calls
+        casino_game.round_history.clear()
+    return run
+
+
+def _session_run(**options):
+    def run():
+        simulator = CasinoGameSimulator(initial_stack=10 ** 6, **options)
+        with contextlib.redirect_stdout(io.StringIO()):
+            simulator.simulate_session(num_hands=5, start_bet=10, verbose=False)
+    return run
+
+
+@benchmark('casino.simulate_session', ops_per_call=5)
+def bench_simulate_session():
+    return _session_run()
+
+
+@benchmark('casino.simulate_session_sprt', ops_per_call=5)
+def bench_simulate_session_sprt():
+    # The sequential-test decision path
+    return _session_run(sequential_test='sprt')
+
+
+@benchmark('table.play_round', ops_per_call=6)
+def bench_table_play_round():
+    # ops are seat-hands, so a flat ops/sec across seat counts means linear cost
+    table = TableSimulator(num_seats=6, initial_stack=10 ** 9)
+
+    def run():
+        table.play_round(start_bet=10)
+    return run
+
+
+def _cleanup(run):
+    # Release what a setup created (e.g. temporary corpus files)
+    cleanup = getattr(run, 'cleanup', None)
+    if cleanup is not None:
+        cleanup()
+
+
+def run_benchmark(name, seed=DEFAULT_SEED, min_time=1.0, repeat=3):
+    """
+    Time one benchmark and measure its peak traced memory.
+
+    The callable is warmed up once, then called in a loop for at least
+    min_time seconds; the best of `repeat` loops is reported. Memory is
+    measured in a separate tracemalloc pass because tracing slows calls down.
+
+    Returns:
+        dict: ops_per_sec, sec_per_call, calls and peak_memory_kb
+    """
+    setup, ops_per_call = BENCHMARKS[name]
+    seed_everything(seed)
+    run = setup()
+    try:
+        run()
+        best_rate = 0.0
+        calls = 0
+        for _ in range(repeat):
+            calls = 0
+            start = time.perf_counter()
+            elapsed = 0.0
+            while elapsed < min_time:
+                run()
+                calls += 1
+                elapsed = time.perf_counter() - start
+            best_rate = max(best_rate, calls / elapsed)
+    finally:
+        _cleanup(run)
+
+    seed_everything(seed)
+    run = setup()
+    try:
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        _cleanup(run)
+
+    return {
+        'ops_per_sec': best_rate * ops_per_call,
+        'sec_per_call': 1 / best_rate,
+        'calls': calls,
+        'peak_memory_kb': peak / 1024
+    }
+
+
+def run_suite(names=None, seed=DEFAULT_SEED, min_time=1.0, repeat=3, verbose=True):
+    """
+    Run the selected benchmarks (all by default).
+
+    Returns:
+        dict: 'meta' describing the run and 'results' keyed by benchmark name
+    """
+    names = names or list(BENCHMARKS)
+    results = {}
+    for name in names:
+        results[name] = run_benchmark(name, seed, min_time, repeat)
+        if verbose:
+            result = results[name]
+            print(f"{name:40s} {result['ops_per_sec']:14.1f} ops/sec "
+                  f"{result['sec_per_call'] * 1e3:10.3f} ms/call {result['peak_memory_kb']:10.1f} KiB peak")
+    return {
+        'meta': {
+            'timestamp': generate_timestamp(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'min_time': min_time,
+            'repeat': repeat
+        },
+        'results': results
+    }
+
+
+def compare_results(baseline, current, threshold=0.10):
+    """
+    Compare a run against a baseline.
+
+    A benchmark regresses when its ops/sec drops, or its peak memory grows,
+    by more than `threshold` (a fraction) relative to the baseline.
+
+    Returns:
+        list: (name, metric, baseline value, current value, relative change) per regression
+    """
+    regressions = []
+    for name, result in current['results'].items():
+        if name not in baseline['results']:
+            continue
+        base = baseline['results'][name]
+        speed_change = result['ops_per_sec'] / base['ops_per_sec'] - 1
+        if speed_change < -threshold:
+            regressions.append((name, 'ops_per_sec', base['ops_per_sec'], result['ops_per_sec'], speed_change))
+        if base['peak_memory_kb'] > 0:
+            memory_change = result['peak_memory_kb'] / base['peak_memory_kb'] - 1
+            if memory_change > threshold:
+                regressions.append((name, 'peak_memory_kb', base['peak_memory_kb'], result['peak_memory_kb'],
+                                    memory_change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for the evaluator, dealer, simulator and session engine")
+    parser.add_argument('--only', nargs='*', help="Benchmark names to run (default: all)")
+    parser.add_argument('--list', action='store_true', help="List the benchmarks and exit")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--min-time', type=float, default=1.0, help="Seconds per timing loop")
+    parser.add_argument('--repeat', type=int, default=3, help="Timing loops per benchmark (best is kept)")
+    parser.add_argument('--save', help="Write the results as a JSON baseline")
+    parser.add_argument('--compare', help="Baseline JSON to check the results against")
+    parser.add_argument('--current', help="Compare this saved JSON run instead of running the suite")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Allowed relative regression")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name in BENCHMARKS:
+            print(name)
+        return 0
+
+    if args.current:
+        with open(args.current) as file:
+            current = json.load(file)
+    else:
+        current = run_suite(args.only, args.seed, args.min_time, args.repeat)
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump(current, file, indent=2)
+        print(f"Results saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compare_results(baseline, current, args.threshold)
+        for name, metric, before, after, change in regressions:
+            print(f"REGRESSION {name} {metric}: {before:.1f} -> {after:.1f} ({change:+.1%})")
+        if regressions:
+            return 1
+        print(f"No regressions above {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+from collections import OrderedDict
+import numpy as np
+
+from fast_evaluator import cards_to_indices
+from range_equity import COMBO_INDEX, COMBO_MASKS, CARD_COMBOS, combo_ranks, board_mask
+from instrumentation import INSTRUMENTATION
+
+# Boards kept by get_board_ranks (least recently used are evicted first)
+BOARD_CACHE_SIZE = 256
+
+
+def distinct_cards(cards):
+    """
+    Whether no card repeats, i.e. the cards could come from one deck.
+
+    A multi-deck shoe (shoe.ShoePokerGame) can deal the same card twice;
+    BoardRanks only ranks single-deck spots, so callers check the board and
+    hero cards first and sample the other spots.
+
+    Args:
+        cards (list): Card indices or (rank, suit) cards
+    """
+    return len(set(cards)) == len(cards)
+
+
+class BoardRanks:
+    """
+    Every possible dealer holding on one complete board, ranked once.
+
+    The 1081 holdings that do not touch the board are kept as one sorted
+    rank array, and the 46 holdings containing each remaining card as
+    per-card sorted arrays. A hero hand's record against a random dealer
+    is then two binary searches on the full array minus the same on the
+    arrays of the hero's two cards (the dealer cannot hold them).
+    """
+
+    def __init__(self, board):
+        if not distinct_cards(board):
+            raise ValueError("Board cards must be distinct (see distinct_cards)")
+        self.board = tuple(sorted(board))
+        ranks = combo_ranks(list(self.board))
+        live = (COMBO_MASKS & board_mask(self.board)) == 0
+        self.ranks = ranks
+        self.sorted_ranks = np.sort(ranks[live])
+        card_ranks = np.where(live[CARD_COMBOS], ranks[CARD_COMBOS], -1)
+        # Blocked holdings get rank -1 and sit in front of every per-card array
+        self.card_sorted_ranks = np.sort(card_ranks, axis=1)
+        self.card_blocked = (~live[CARD_COMBOS]).sum(axis=1)
+
+    def covers(self, hero_cards):
+        """
+        Whether counts applies: two distinct hero cards off the board.
+
+        Args:
+            hero_cards (list): Two card indices
+        """
+        return len(hero_cards) == 2 and distinct_cards(list(self.board) + list(hero_cards))
+
+    def counts(self, hero_cards):
+        """
+        Dealer holdings beating, losing to and tying a hero hand.
+
+        Args:
+            hero_cards (list): Two distinct card indices not on the board (see covers)
+
+        Returns:
+            tuple: (hero wins, dealer wins, ties) as holding counts
+        """
+        if not self.covers(hero_cards):
+            raise ValueError("Hero cards must be distinct and off the board")
+        first, second = sorted(hero_cards)
+        hero_rank = self.ranks[COMBO_INDEX[(first, second)]]
+
+        below = np.searchsorted(self.sorted_ranks, hero_rank, side='left')
+        upto = np.searchsorted(self.sorted_ranks, hero_rank, side='right')
+        total = len(self.sorted_ranks)
+        for card in (first, second):
+            card_ranks = self.card_sorted_ranks[card]
+            card_below = np.searchsorted(card_ranks, hero_rank, side='left') - self.card_blocked[card]
+            below -= card_below
+            upto -= np.searchsorted(card_ranks, hero_rank, side='right') - self.card_blocked[card]
+            total -= len(card_ranks) - self.card_blocked[card]
+        # The hero's own holding sits in both per-card arrays, so it was removed twice
+        upto += 1
+        total += 1
+        return int(below), int(total - upto), int(upto - below)
+
+    def equity(self, hero_cards):
+        """
+        Exact win percentages of a hero hand against a random dealer hand.
+
+        Args:
+            hero_cards (list): Two (rank, suit) cards
+
+        Returns:
+            dict: 'Player 1 Win', 'Player 2 Win' and 'Tie' in percent, like simulate_scenario_3
+        """
+        wins, losses, ties = self.counts(cards_to_indices(hero_cards))
+        total = wins + losses + ties
+        return {
+            'Player 1 Win': round(wins / total * 100, 2),
+            'Player 2 Win': round(losses / total * 100, 2),
+            'Tie': round(ties / total * 100, 2)
+        }
+
+
+_board_cache = OrderedDict()
+
+
+def get_board_ranks(community_cards):
+    """
+    BoardRanks of a five-card board, shared by every caller for that board.
+
+    Args:
+        community_cards (list): Five distinct (rank, suit) cards
+
+    Returns:
+        BoardRanks: The cached precomputation
+    """
+    key = tuple(sorted(cards_to_indices(community_cards)))
+    board_ranks = _board_cache.get(key)
+    if board_ranks is not None:
+        INSTRUMENTATION.cache_hit('board_ranks')
+        _board_cache.move_to_end(key)
+        return board_ranks
+
+    INSTRUMENTATION.cache_miss('board_ranks')
+    board_ranks = BoardRanks(key)
+    _board_cache[key] = board_ranks
+    if len(_board_cache) > BOARD_CACHE_SIZE:
+        _board_cache.popitem(last=False)
+    return board_ranks
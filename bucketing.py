@@ -0,0 +1,456 @@
+import os
+import time
+import random
+import argparse
+import itertools
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from fast_evaluator import TABLE_DIR, cards_to_indices
+from range_equity import COMBO_INDEX, COMBO_MASKS, NUM_COMBOS, combo_ranks, board_mask, showdown_weights
+from strategy_solver import SOLVER_CACHE_DIR, canonical_flop, canonical_flops, permute_cards, _solve_flop_job
+from shared_tables import TableRegistry, publish_rank_table, attach_worker_tables
+
+BUCKET_TABLE_FILE = os.path.join(TABLE_DIR, 'flop_buckets.npz')
+
+# Equity histogram bins on [0, 1]
+HISTOGRAM_BINS = 8
+
+# Hand bucket of combos blocked by the flop
+NO_BUCKET = 255
+
+# Points per k-means shard
+SHARD_SIZE = 1 << 16
+
+# Points registry of the k-means workers (set by _attach_points, or the parent's own when in process)
+_points_registry = None
+
+
+def board_texture(flop):
+    """
+    Texture features of a flop, each in [0, 1].
+
+    Returns:
+        np.ndarray: Ranks high to low, paired, trips, two-tone, monotone, rank spread
+            and how many straight windows hold all of its ranks
+    """
+    ranks = sorted((card >> 2 for card in flop), reverse=True)
+    suit_counts = np.bincount([card & 3 for card in flop], minlength=4)
+    distinct = set(ranks)
+    # The ten five-rank windows, ace low for the wheel
+    windows = [{(top - k) % 13 for k in range(5)} for top in range(3, 13)]
+    straight_windows = sum(distinct <= window for window in windows) if len(distinct) == 3 else 0
+    return np.array([ranks[0] / 12, ranks[1] / 12, ranks[2] / 12,
+                     float(len(distinct) < 3), float(len(distinct) == 1),
+                     float(suit_counts.max() == 2), float(suit_counts.max() == 3),
+                     (ranks[0] - ranks[2]) / 12, straight_windows / 3])
+
+
+def flop_equity_histograms(flop, num_runouts=100, bins=HISTOGRAM_BINS, seed=None):
+    """
+    Distribution of every combo's river equity against a random dealer hand over the runouts of a flop.
+
+    Args:
+        flop (list): Three card indices
+        num_runouts (int): Turn and river pairs sampled without replacement (None for all 1176)
+        bins (int): Histogram bins on [0, 1]
+        seed (int): Seed of the runout sample, combined with the flop
+
+    Returns:
+        tuple: ((1326, bins) fraction of runouts per equity bin, (1326,) mean equity);
+            NaN rows for combos blocked by the flop
+    """
+    remaining = [card for card in range(52) if card not in set(flop)]
+    runouts = list(itertools.combinations(remaining, 2))
+    if num_runouts is not None and num_runouts < len(runouts):
+        rng = np.random.default_rng(None if seed is None else [seed] + [int(card) for card in flop])
+        runouts = [runouts[k] for k in sorted(rng.choice(len(runouts), num_runouts, replace=False))]
+
+    counts = np.zeros((NUM_COMBOS, bins))
+    equity_sums = np.zeros(NUM_COMBOS)
+    live = np.zeros(NUM_COMBOS)
+    rows = np.arange(NUM_COMBOS)
+    for runout in runouts:
+        board = list(flop) + list(runout)
+        unblocked = (COMBO_MASKS & board_mask(board)) == 0
+        weights = unblocked.astype(np.float64)
+        wins, ties, totals = showdown_weights(combo_ranks(board), weights, weights)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            equity = np.where(unblocked, (wins + ties / 2) / totals, 0.0)
+        counts[rows[unblocked], np.minimum((equity[unblocked] * bins).astype(np.int64), bins - 1)] += 1
+        equity_sums += equity
+        live += unblocked
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return counts / live[:, None], equity_sums / live
+
+
+def _flop_features_job(job):
+    # Worker entry point: equity histograms of one flop
+    flop, num_runouts, bins, seed = job
+    return flop_equity_histograms(flop, num_runouts, bins, seed)
+
+
+def hand_points(histograms):
+    # Cumulative histograms: Euclidean distance between them tracks the earth mover's distance
+    return np.cumsum(histograms, axis=-1)[..., :-1]
+
+
+def flop_point(flop, mean_equity, bins=HISTOGRAM_BINS):
+    """
+    Clustering features of a flop: its texture and the histogram of its combos' mean equities.
+    """
+    live = mean_equity[~np.isnan(mean_equity)]
+    spread = np.histogram(live, bins=bins, range=(0.0, 1.0))[0] / len(live)
+    return np.concatenate([board_texture(flop), np.cumsum(spread)[:-1]])
+
+
+def _attach_points(directory):
+    # Pool initializer of the k-means workers
+    global _points_registry
+    _points_registry = TableRegistry(directory)
+
+
+def _nearest(points, centers):
+    # Index and squared distance of the nearest center of every point
+    distances = (points ** 2).sum(axis=1)[:, None] - 2 * points @ centers.T + (centers ** 2).sum(axis=1)[None, :]
+    labels = distances.argmin(axis=1)
+    return labels, np.maximum(distances[np.arange(len(points)), labels], 0.0)
+
+
+def _kmeans_shard(job):
+    # Assignment step of one shard: labels, per-center weighted sums and weights, and the inertia
+    start, stop, centers = job
+    points = np.asarray(_points_registry.get('kmeans_points')[start:stop], dtype=np.float64)
+    weights = np.asarray(_points_registry.get('kmeans_weights')[start:stop], dtype=np.float64)
+    labels, distances = _nearest(points, centers)
+    sums = np.stack([np.bincount(labels, weights=points[:, d] * weights, minlength=len(centers))
+                     for d in range(points.shape[1])], axis=1)
+    return labels, sums, np.bincount(labels, weights=weights, minlength=len(centers)), float(distances @ weights)
+
+
+def _initial_centers(points, weights, k, rng, sample_size=20000):
+    # k-means++ seeding on a weighted sample of the points
+    sample = rng.choice(len(points), min(sample_size, len(points)), replace=False, p=weights / weights.sum())
+    candidates = points[np.sort(sample)]
+    centers = [candidates[rng.integers(len(candidates))]]
+    distances = ((candidates - centers[0]) ** 2).sum(axis=1)
+    for _ in range(1, min(k, len(candidates))):
+        total = distances.sum()
+        choice = rng.choice(len(candidates), p=distances / total) if total > 0 else rng.integers(len(candidates))
+        centers.append(candidates[choice])
+        distances = np.minimum(distances, ((candidates - candidates[choice]) ** 2).sum(axis=1))
+    return np.array(centers)
+
+
+def kmeans(points, k, weights=None, iterations=50, workers=None, seed=None, tolerance=1e-6, shard_size=SHARD_SIZE):
+    """
+    Weighted k-means (Lloyd's algorithm) with the assignment step split over processes.
+
+    The points are published once to a TableRegistry that the workers map;
+    each iteration only sends the centers out and gets per-shard sums back.
+    Shards are reduced in order, so the result does not depend on workers.
+
+    Args:
+        points (np.ndarray): (N, D) points
+        k (int): Clusters
+        weights (np.ndarray): Weight of each point (default 1)
+        iterations (int): Most Lloyd iterations
+        workers (int): Worker processes; 1 runs in this process (default os.cpu_count())
+        seed (int): Seed of the k-means++ initialization
+        tolerance (float): Stop once the inertia improves by less than this fraction
+
+    Returns:
+        tuple: ((k, D) centers, (N,) labels, weighted inertia)
+    """
+    global _points_registry
+    points = np.ascontiguousarray(points, dtype=np.float32)
+    weights = np.ones(len(points)) if weights is None else np.asarray(weights, dtype=np.float64)
+    centers = _initial_centers(points.astype(np.float64), weights, k, np.random.default_rng(seed))
+    shards = [(start, min(start + shard_size, len(points))) for start in range(0, len(points), shard_size)]
+    workers = workers or os.cpu_count()
+
+    with TableRegistry() as registry:
+        registry.publish('kmeans_points', points, 'kmeans')
+        registry.publish('kmeans_weights', weights, 'kmeans')
+        executor = None
+        if workers > 1 and len(shards) > 1:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_attach_points,
+                                           initargs=(registry.directory,))
+            assign = executor.map
+        else:
+            _points_registry = registry
+            assign = map
+        try:
+            previous = np.inf
+            for iteration in range(iterations + 1):
+                results = list(assign(_kmeans_shard, [(start, stop, centers) for start, stop in shards]))
+                inertia = sum(result[3] for result in results)
+                if iteration == iterations or previous - inertia <= tolerance * inertia:
+                    break
+                previous = inertia
+                sums = sum(result[1] for result in results)
+                counts = sum(result[2] for result in results)
+                # Empty clusters keep their center
+                filled = counts > 0
+                centers = centers.copy()
+                centers[filled] = sums[filled] / counts[filled, None]
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            _points_registry = None
+    return centers, np.concatenate([result[0] for result in results]), inertia
+
+
+def _map_jobs(function, jobs, workers):
+    # Per-flop jobs in worker processes sharing one rank table
+    with TableRegistry() as registry:
+        publish_rank_table(registry)
+        with ProcessPoolExecutor(max_workers=workers, initializer=attach_worker_tables,
+                                 initargs=(registry.directory,)) as executor:
+            return list(executor.map(function, jobs))
+
+
+class BucketTable:
+    """
+    Flop decisions of the solved strategy, abstracted to (flop bucket, hand bucket) cells.
+
+    Canonical flops are clustered by texture and equity spread, hole+flop
+    states by the histogram of their river equity over the runouts. Each
+    cell bets 2x when the solver's bet EV beats checking summed over its
+    states. No per-combo table is stored: the first lookup on a flop
+    featurizes it (flop_equity_histograms, seeded like the build, so the
+    clustered flops get their training buckets back) and assigns its
+    combos to the nearest hand centers; later lookups are array reads.
+
+    Args:
+        flops (np.ndarray): (N, 3) canonical flops
+        flop_buckets (np.ndarray): (N,) bucket of each flop
+        flop_centers (np.ndarray): Flop cluster centers
+        hand_centers (np.ndarray): Hand cluster centers
+        actions (np.ndarray): (flop buckets, hand buckets) True to bet 2x
+        num_runouts (int): Runouts sampled per flop for the features
+        bins (int): Equity histogram bins
+        feature_seed (int): Seed of the runout samples of the features
+    """
+
+    def __init__(self, flops, flop_buckets, flop_centers, hand_centers, actions,
+                 num_runouts=100, bins=HISTOGRAM_BINS, feature_seed=0):
+        self.flops = np.asarray(flops)
+        self.flop_buckets = np.asarray(flop_buckets, dtype=np.uint8)
+        self.flop_centers = np.asarray(flop_centers)
+        self.hand_centers = np.asarray(hand_centers)
+        self.actions = np.asarray(actions, dtype=bool)
+        self.num_runouts = int(num_runouts)
+        self.bins = int(bins)
+        self.feature_seed = feature_seed
+        self.flop_rows = {tuple(int(card) for card in flop): row for row, flop in enumerate(self.flops)}
+        # Buckets of the flops featurized so far
+        self._assigned = {}
+
+    @classmethod
+    def load(cls, path=BUCKET_TABLE_FILE):
+        with np.load(path) as table:
+            feature_seed = int(table['feature_seed'])
+            return cls(table['flops'], table['flop_buckets'], table['flop_centers'], table['hand_centers'],
+                       table['actions'], int(table['num_runouts']), int(table['bins']),
+                       feature_seed if feature_seed >= 0 else None)
+
+    def save(self, path=BUCKET_TABLE_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # -1 stands for an unseeded build
+        feature_seed = -1 if self.feature_seed is None else self.feature_seed
+        np.savez_compressed(path, flops=self.flops, flop_buckets=self.flop_buckets, flop_centers=self.flop_centers,
+                            hand_centers=self.hand_centers, actions=self.actions, num_runouts=self.num_runouts,
+                            bins=self.bins, feature_seed=feature_seed)
+
+    @property
+    def table_bytes(self):
+        # Memory of the stored lookups: the flop buckets, both sets of centers and the decision cells
+        return (self.flop_buckets.nbytes + self.flop_centers.nbytes + self.hand_centers.nbytes
+                + self.actions.nbytes)
+
+    def assign(self, flop, histograms, mean_equity):
+        """
+        Buckets of a flop and its combos from their features.
+
+        Returns:
+            tuple: (flop bucket, (1326,) hand buckets with NO_BUCKET where blocked)
+        """
+        flop_bucket = int(_nearest(flop_point(flop, mean_equity, self.bins)[None, :], self.flop_centers)[0][0])
+        live = ~np.isnan(mean_equity)
+        hand_buckets = np.full(NUM_COMBOS, NO_BUCKET, dtype=np.uint8)
+        # The float32 points kmeans clustered, so training states keep their labels
+        points = hand_points(histograms[live]).astype(np.float32).astype(np.float64)
+        hand_buckets[live] = _nearest(points, self.hand_centers)[0]
+        return flop_bucket, hand_buckets
+
+    def buckets(self, flop):
+        """
+        Args:
+            flop (tuple): Canonical flop card indices
+
+        Returns:
+            tuple: (flop bucket, (1326,) hand buckets)
+        """
+        if flop not in self._assigned:
+            flop_bucket, hand_buckets = self.assign(
+                flop, *flop_equity_histograms(flop, self.num_runouts, self.bins, self.feature_seed))
+            row = self.flop_rows.get(flop)
+            if row is not None:
+                flop_bucket = int(self.flop_buckets[row])
+            self._assigned[flop] = flop_bucket, hand_buckets
+        return self._assigned[flop]
+
+    def flop_action(self, hand, flop):
+        """
+        Returns:
+            bool: True to make the 2x bet
+        """
+        canonical, permutation = canonical_flop(cards_to_indices(flop))
+        flop_bucket, hand_buckets = self.buckets(canonical)
+        combo = COMBO_INDEX[tuple(sorted(permute_cards(cards_to_indices(hand), permutation)))]
+        return bool(self.actions[flop_bucket, hand_buckets[combo]])
+
+
+def _cell_actions(flop_labels, hand_labels, flop_weights, bet, check, num_flop_buckets, num_hand_buckets):
+    # Bet in a cell when the weighted bet EV beats checking; empty cells follow their hand bucket over all flops
+    live = hand_labels != NO_BUCKET
+    gain = np.where(live, np.nan_to_num(bet - check), 0.0) * flop_weights[:, None]
+    cells = flop_labels[:, None].repeat(NUM_COMBOS, axis=1)[live] * num_hand_buckets + hand_labels[live]
+    cell_gain = np.bincount(cells, weights=gain[live], minlength=num_flop_buckets * num_hand_buckets)
+    cell_weight = np.bincount(cells, minlength=num_flop_buckets * num_hand_buckets)
+    hand_gain = np.bincount(hand_labels[live], weights=gain[live], minlength=num_hand_buckets)
+    actions = np.where(cell_weight > 0, cell_gain > 0, np.tile(hand_gain > 0, num_flop_buckets))
+    return actions.reshape(num_flop_buckets, num_hand_buckets)
+
+
+def ev_loss(table, flop_labels, hand_labels, flop_weights, bet, check):
+    """
+    EV of the bucketed flop decisions against unabstracted (per-combo) play.
+
+    Args:
+        table (BucketTable): Abstraction
+        flop_labels (np.ndarray): (N,) flop buckets
+        hand_labels (np.ndarray): (N, 1326) hand buckets
+        flop_weights (np.ndarray): (N,) raw flops in each canonical flop class
+        bet, check (np.ndarray): (N, 1326) solver EVs of the flop decisions (NaN where blocked)
+
+    Returns:
+        dict: 'Unabstracted EV', 'Abstracted EV' and 'EV Loss' per flop decision in antes,
+            and the fraction of decisions that agree
+    """
+    live = hand_labels != NO_BUCKET
+    chosen = table.actions[flop_labels[:, None], np.where(live, hand_labels, 0)]
+    weights = np.where(live, flop_weights[:, None], 0.0)
+    best = np.where(live, np.fmax(bet, check), 0.0)
+    played = np.where(live, np.where(chosen, bet, check), 0.0)
+    agree = np.where(live, chosen == (bet > check), False)
+    total = weights.sum()
+    return {
+        'Unabstracted EV': float((best * weights).sum() / total),
+        'Abstracted EV': float((played * weights).sum() / total),
+        'EV Loss': float(((best - played) * weights).sum() / total),
+        'Agreement': float((agree * weights).sum() / total)
+    }
+
+
+def build_buckets(num_flops=None, flop_buckets=32, hand_buckets=64, num_runouts=100, bins=HISTOGRAM_BINS,
+                  holdout=0, workers=None, seed=None, cache_dir=SOLVER_CACHE_DIR):
+    """
+    Cluster flops and hole+flop states and derive the bucketed flop decisions.
+
+    Features (flop_equity_histograms) and the exact solver EVs
+    (strategy_solver.solve_flop, through its per-flop cache) are computed
+    in parallel processes, then both clusterings run through kmeans.
+
+    Args:
+        num_flops (int): Cluster a random sample of canonical flops (all 1755 when None)
+        flop_buckets (int): Flop clusters
+        hand_buckets (int): Hole+flop clusters (at most 255)
+        num_runouts (int): Runouts sampled per flop for the equity histograms
+        bins (int): Equity histogram bins
+        holdout (int): Further sampled flops, kept out of the clustering, for the report
+        workers (int): Worker processes
+        seed (int): Seed of the flop sample, the runouts and the clusterings
+        cache_dir (str): strategy_solver stage cache
+
+    Returns:
+        tuple: (BucketTable, report dict with 'Train' and (with holdout) 'Holdout' ev_loss
+            rows, 'Table Bytes' and 'Unabstracted Bytes' (a bet/check byte per flop and combo))
+    """
+    if hand_buckets >= NO_BUCKET:
+        raise ValueError(f"At most {NO_BUCKET - 1} hand buckets")
+    flops, counts = canonical_flops()
+    sampled = list(range(len(flops)))
+    if num_flops is not None:
+        sampled = random.Random(seed).sample(sampled, min(num_flops + holdout, len(flops)))
+    held_out = sorted(sampled[len(sampled) - holdout:]) if holdout else []
+    sampled = sorted(sampled[:len(sampled) - holdout] if holdout else sampled)
+
+    rows = sampled + held_out
+    jobs = [tuple(int(card) for card in flops[row]) for row in rows]
+    features = _map_jobs(_flop_features_job, [(flop, num_runouts, bins, seed) for flop in jobs], workers)
+    solved = _map_jobs(_solve_flop_job, [(flop, cache_dir) for flop in jobs], workers)
+    histograms = np.array([feature[0] for feature in features])
+    mean_equity = np.array([feature[1] for feature in features])
+    bet = np.array([result['bet'] for result in solved])
+    check = np.array([result['check'] for result in solved])
+    train = np.arange(len(sampled))
+
+    # Hole+flop states, weighted by the raw flops their canonical flop stands for
+    live = ~np.isnan(mean_equity[train])
+    state_flops = np.nonzero(live)[0]
+    hand_centers, state_labels, _ = kmeans(hand_points(histograms[train][live]), hand_buckets,
+                                           weights=counts[sampled][state_flops], workers=workers, seed=seed)
+    hand_labels = np.full((len(train), NUM_COMBOS), NO_BUCKET, dtype=np.uint8)
+    hand_labels[live] = state_labels
+
+    flop_points = np.array([flop_point(jobs[k], mean_equity[k], bins) for k in train])
+    flop_centers, flop_labels, _ = kmeans(flop_points, min(flop_buckets, len(train)), weights=counts[sampled],
+                                          workers=1, seed=seed)
+
+    actions = _cell_actions(flop_labels, hand_labels, counts[sampled], bet[train], check[train],
+                            len(flop_centers), len(hand_centers))
+    table = BucketTable(flops[sampled], flop_labels, flop_centers, hand_centers, actions, num_runouts, bins, seed)
+    report = {
+        'Train': ev_loss(table, flop_labels, hand_labels, counts[sampled], bet[train], check[train]),
+        'Table Bytes': table.table_bytes,
+        # An unabstracted decision table: one bet/check byte per flop and combo
+        'Unabstracted Bytes': len(train) * NUM_COMBOS
+    }
+    if held_out:
+        assigned = [table.assign(jobs[k], histograms[k], mean_equity[k]) for k in range(len(sampled), len(rows))]
+        held = slice(len(sampled), len(rows))
+        report['Holdout'] = ev_loss(table, np.array([flop for flop, _ in assigned]),
+                                    np.array([hands for _, hands in assigned]), counts[held_out], bet[held], check[held])
+    return table, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cluster flops and hole+flop states into strategy buckets")
+    parser.add_argument('--flops', type=int, default=None, help="Canonical flops to cluster (default all)")
+    parser.add_argument('--holdout', type=int, default=0, help="Extra flops kept out for the EV-loss report")
+    parser.add_argument('--flop-buckets', type=int, default=32)
+    parser.add_argument('--hand-buckets', type=int, default=64)
+    parser.add_argument('--runouts', type=int, default=100, help="Runouts sampled per flop for the features")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    table, report = build_buckets(args.flops, args.flop_buckets, args.hand_buckets, args.runouts,
+                                  holdout=args.holdout, workers=args.workers, seed=args.seed)
+    table.save()
+    print(f"{len(table.flops)} flops -> {table.actions.shape[0]} flop x {table.actions.shape[1]} hand buckets "
+          f"in {time.perf_counter() - started:.1f} s -> {BUCKET_TABLE_FILE}")
+    print(f"Lookup tables {report['Table Bytes'] / 1024:.1f} KiB "
+          f"(unabstracted decisions {report['Unabstracted Bytes'] / 1024:.1f} KiB)")
+    for name in ('Train', 'Holdout'):
+        if name in report:
+            row = report[name]
+            print(f"{name:8s} EV {row['Abstracted EV']:+.4f} vs unabstracted {row['Unabstracted EV']:+.4f}: "
+                  f"loss {row['EV Loss']:.4f} antes per flop decision, {row['Agreement'] * 100:.1f}% same action")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,17 +2,32 @@ from entire_game import *
 from casino_poker import *
 from pyro_simulation import *
 from result_graph import *
+from strategy_solver import StrategyTable, STRATEGY_TABLE_FILE
+from compact_log import CompactLog, replay_session
+from strategies import HandBatch
+from outs_analyzer import DrawAnalysis, flop_decision
 
 import sys
+import random
 from datetime import datetime
+from statistics import median
 import os
 os.environ["KMP_DUPLICATE_LIB_OK"]="TRUE"
 
 class CasinoGameSimulator:
-    def __init__(self, initial_stack=1000, min_bet=10, max_bet=100, min_trip=5, max_trip=100):
-        self.poker_game = PokerGame()
+    def __init__(self, initial_stack=1000, min_bet=10, max_bet=100, min_trip=5, max_trip=100, sequential_test=None,
+                 strategy_table=None, poker_game=None, compact_log=None,
+                 strategy=None, flop_fast_path=False):
+        # Deals come from poker_game (e.g. a shoe.ShoePokerGame); the Monte Carlo
+        # decisions always draw from their own single deck
+        self.poker_game = poker_game if poker_game is not None else PokerGame()
+
+        # Compact logging: deals come from the log's seeded stream and only decisions are written
+        self.compact_log = compact_log
+        if compact_log is not None:
+            self.poker_game = compact_log.poker_game()
         self.hand_evaluator = PokerHandEvaluator()
-        self.poker_sim = PyroPokerSimulation(self.poker_game)
+        self.poker_sim = PyroPokerSimulation(PokerGame())
         self.casino_game = CasinoPokerGame(
             initial_player_stack=initial_stack,
             min_amount=min_bet,
@@ -27,6 +42,25 @@ class CasinoGameSimulator:
         self.total_profit = 0
         self.start_time = datetime.now()
 
+        # Equity decisions: None runs the full Monte Carlo budget, 'ci' or
+        # 'sprt' stop sampling once the threshold decision is settled
+        self.sequential_test = sequential_test
+        self.decision_trials = []  # (street, trials used) per equity decision
+
+        # Solved basic strategy (StrategyTable or a path to one); decisions it
+        # does not cover fall back to the equity thresholds below
+        if isinstance(strategy_table, str):
+            strategy_table = StrategyTable.load(strategy_table)
+        self.strategy_table = strategy_table
+
+        # Batch strategy plugin (see strategies.ThresholdStrategy), asked with one-hand batches;
+        # None keeps the Monte Carlo thresholds below
+        self.strategy = strategy
+
+        # Settle clear flop spots from the outs analysis instead of the Monte Carlo
+        self.flop_fast_path = flop_fast_path
+
+    @INSTRUMENTATION.timed('hand')
     def simulate_hand_with_given_cards(self, start_bet, player_hand, dealer_hand, community_cards, 
                                    make_trip_bet=False, trip_bet_amount=0, verbose=True):
         """Simulate a single hand of Ultimate Texas Hold'em with given cards"""
@@ -86,6 +120,7 @@ class CasinoGameSimulator:
                 if verbose:
                     print("Folded")
                     print(f"\nDealer's hand: {self.poker_game.display_cards(dealer_hand)}")
+                self._record_hand(folded=True)
                 self.casino_game.fold()
                 self.total_profit = self.casino_game.get_player_stack() - self.casino_game.starting_stack  # Assuming 1000 initial stack
                 self.total_hands += 1
@@ -124,6 +159,7 @@ class CasinoGameSimulator:
                 print(f"\nIt's a tie")
         
         # Resolve all bets
+        self._record_hand()
         self.casino_game.resolve_round(player_result[0], dealer_result[0], winner)
         
         # Update statistics
@@ -139,6 +175,7 @@ class CasinoGameSimulator:
         return True
 
         
+    @INSTRUMENTATION.timed('hand')
     def simulate_hand(self, start_bet, make_trip_bet=False, trip_bet_amount=0, verbose=True):
         """Simulate a single hand of Ultimate Texas Hold'em"""
         # Reset deck for new hand
@@ -203,6 +240,7 @@ class CasinoGameSimulator:
                 if verbose:
                     print("Folded")
                     print(f"\nDealer's hand: {self.poker_game.display_cards(dealer_hand)}")
+                self._record_hand(folded=True)
                 self.casino_game.fold()
                 self.total_profit = self.casino_game.get_player_stack() - 1000  # Assuming 1000 initial stack
                 self.total_hands += 1
@@ -242,6 +280,7 @@ class CasinoGameSimulator:
                 print(f"\nIt's a tie")
         
         # Resolve all bets
+        self._record_hand()
         self.casino_game.resolve_round(player_result[0], dealer_result[0], winner)
         
         # Update statistics
@@ -256,11 +295,23 @@ class CasinoGameSimulator:
         
         return True
     
+    def _record_hand(self, folded=False):
+        # Write the hand's decision to the compact log (deals are regenerated from its seed)
+        if self.compact_log is not None:
+            self.compact_log.record(self.casino_game, folded)
+
+    @INSTRUMENTATION.timed('decision.preflop')
     def _should_bet_preflop(self, hand):
         """Simple pre-flop betting strategy"""
         # values = [self.hand_evaluator.card_values[card[0]] for card in hand]
         # Bet on pocket pairs or both cards 10 or higher
         # return (values[0] == values[1]) or (min(values) >= 10)
+        if self.strategy_table:
+            action = self.strategy_table.preflop_action(hand)
+            if action is not None:
+                return action
+        if self.strategy is not None:
+            return bool(self.strategy.bet_preflop_batch(HandBatch.from_cards([hand]))[0])
         win_rate = get_win_rate(hand, data)
         # print(win_rate)
         # result = self.poker_sim.simulate_pre_flop(hand)
@@ -269,30 +320,85 @@ class CasinoGameSimulator:
         return False
         # return True
     
+    @INSTRUMENTATION.timed('decision.flop')
     def _should_bet_flop(self, hand, flop):
         """Simple flop betting strategy"""
         # result = self.hand_evaluator.evaluate_hand(hand, flop)
         # # Bet if we have pair or better
         # return result[0] >= 3
+        if self.strategy_table:
+            action = self.strategy_table.flop_action(hand, flop)
+            if action is not None:
+                return action
+        if self.strategy is not None:
+            return bool(self.strategy.bet_flop_batch(HandBatch.from_cards([hand], [flop]))[0])
+        if self.flop_fast_path:
+            decision = flop_decision(DrawAnalysis(hand, flop))
+            if decision is not None:
+                self.decision_trials.append(('flop', 0))
+                INSTRUMENTATION.record('trials_per_decision.flop', 0)
+                return decision
+        if self.sequential_test:
+            result = self.poker_sim.sequential_dealer_win_test(hand, flop, 40, method=self.sequential_test,
+                                                               max_trials=100 * 100, seed=random.getrandbits(64))
+            self.decision_trials.append(('flop', result['Trials']))
+            INSTRUMENTATION.record('trials_per_decision.flop', result['Trials'])
+            return result['Below Threshold']
         result = self.poker_sim.simulate_scenario_1(hand, flop)
+        self.decision_trials.append(('flop', 100 * 100))
+        INSTRUMENTATION.record('trials_per_decision.flop', 100 * 100)
         if result['Player 2 Win'] < 40:
             return True
         return False
         # return True
     
+    @INSTRUMENTATION.timed('decision.river')
     def _should_bet_river(self, hand, community_cards):
         """Simple river betting strategy"""
         # result = self.hand_evaluator.evaluate_hand(hand, community_cards)
         # # Bet if we have two pair or better
         # return result[0] >= 2
+        if self.strategy_table:
+            return self.strategy_table.river_action(hand, community_cards)
+        if self.strategy is not None:
+            return bool(self.strategy.bet_river_batch(HandBatch.from_cards([hand], [community_cards]))[0])
         player_result = self.hand_evaluator.evaluate_hand(hand, community_cards)
         if player_result[0] > 3:
             return True
-        result = self.poker_sim.simulate_scenario_3(hand, community_cards)
+        if self.sequential_test:
+            result = self.poker_sim.sequential_dealer_win_test(hand, community_cards, 45, method=self.sequential_test,
+                                                               max_trials=100, batch_size=10,
+                                                               seed=random.getrandbits(64))
+            self.decision_trials.append(('river', result['Trials']))
+            INSTRUMENTATION.record('trials_per_decision.river', result['Trials'])
+            return result['Below Threshold']
+        # Exact against every dealer holding; the board ranks are shared with the UI overlay
+        result = self.poker_sim.simulate_scenario_3(hand, community_cards, exact=True)
         if result['Player 2 Win'] < 45:
             return True
         return False
     
+    def get_decision_trial_stats(self):
+        """
+        Summarize how many Monte Carlo trials the equity decisions used.
+
+        Returns:
+            dict: Per street ('flop', 'river') the decision count and the
+            total, mean and median trials per decision
+        """
+        stats = {}
+        for street in ('flop', 'river'):
+            trials = [count for name, count in self.decision_trials if name == street]
+            if not trials:
+                continue
+            stats[street] = {
+                'decisions': len(trials),
+                'total_trials': sum(trials),
+                'mean_trials': sum(trials) / len(trials),
+                'median_trials': median(trials)
+            }
+        return stats
+
     def calculate_total_wins(self,round_results):
         """
         Calculate the sum of different types of wins from a list of round results.
@@ -341,11 +447,16 @@ class CasinoGameSimulator:
         print(f"Average profit per hand: ${self.total_profit/self.total_hands:.2f}")
         print(f"Session duration: {duration}")
         print(f"Final chip stack: ${self.casino_game.get_player_stack()}")
+        for street, stats in self.get_decision_trial_stats().items():
+            print(f"{street.capitalize()} decisions: {stats['decisions']}, "
+                  f"median trials: {stats['median_trials']}, total trials: {stats['total_trials']}")
 
 # Example usage:
-def main():
-    # Initialize simulator with default values
-    simulator = CasinoGameSimulator(initial_stack=1000, min_bet=10, max_bet=100)
+def main(compact_log=None):
+    # Initialize simulator with default values, playing the solved strategy if one has been saved
+    strategy_table = STRATEGY_TABLE_FILE if os.path.exists(STRATEGY_TABLE_FILE) else None
+    simulator = CasinoGameSimulator(initial_stack=1000, min_bet=10, max_bet=100, strategy_table=strategy_table,
+                                    compact_log=compact_log)
     
     # Simulate a session of 100 hands with $10 bets
     simulator.simulate_session(
@@ -353,10 +464,17 @@ def main():
         start_bet=10,
         make_trip_bet=False,
         trip_bet_amount=0,
-        verbose=True # Set to True for detailed hand information
+        verbose=compact_log is None # Set to True for detailed hand information
     )
 
-if __name__ == "__main__":
+if __name__ == "__main__" and '--compact' in sys.argv:
+    # Seed and decisions only; `python compact_log.py <log>` regenerates the text log
+    compact_log = CompactLog(f"casino_sim_{generate_timestamp()}.uthlog", start_bet=10,
+                             source='casino_game_simulator')
+    main(compact_log)
+    print(f"Compact log written to {compact_log.path}")
+
+elif __name__ == "__main__":
     
     output_file = f"casino_sim_{generate_timestamp()}.txt"
     with open(output_file, "w") as file:
@@ -365,5 +483,8 @@ if __name__ == "__main__":
         # Reset stdout to default (optional)
         sys.stdout = sys.__stdout__
         print(f"All print statements have been written to {output_file}.")
+
+    if INSTRUMENTATION.enabled:
+        INSTRUMENTATION.to_json(f"{os.path.splitext(output_file)[0]}_instrumentation.json")
         
     plot_graph(output_file)
\ No newline at end of file
@@ -1,3 +1,5 @@
+from instrumentation import INSTRUMENTATION
+
 class CasinoPokerGame:
     def __init__(self, initial_player_stack=1000, initial_dealer_stack=100000, min_amount=10, max_amount=100, min_trip_bet=5, max_trip_bet=100):
         self.player_stack = initial_player_stack
@@ -147,6 +149,7 @@ class CasinoPokerGame:
         # Special Case of Resolve where no extra bet is made and there are no payouts
         self.resolve_round(1,1,1,fold = True)
 
+    @INSTRUMENTATION.timed('payout')
     def resolve_round(self, player_hand_score, dealer_hand_score, player_wins, fold = False):
         # Calculate total main pot
         total_main_pot = self.start_bet + self.final_bet + self.blind_bet + self.trip_bet
@@ -0,0 +1,200 @@
+import sys
+import json
+import random
+
+from entire_game import *
+from casino_poker import CasinoPokerGame
+
+COMPACT_LOG_VERSION = 1
+
+# Deal orders: 'streets' is CasinoGameSimulator.simulate_hand (deal_player_cards, ...,
+# deal_river), 'deal_cards' is PokerGame.deal_cards as used by the UI
+DEAL_ORDERS = ('streets', 'deal_cards')
+
+# Play bet multiples written per hand; 0 is a showdown without a play bet (the bet
+# was refused for lack of chips), which is not a fold
+DECISION_CODES = {4: '4', 2: '2', 1: '1', 0: '0'}
+FOLD_CODE = 'F'
+DECISION_MULTIPLES = {code: multiple for multiple, code in DECISION_CODES.items()}
+DECISION_MULTIPLES[FOLD_CODE] = None
+
+
+def hand_rng(seed, hand_number):
+    # Independent, reproducible shuffle stream of one hand of a session
+    return random.Random(f"{seed}:{hand_number}")
+
+
+class SeededPokerGame(PokerGame):
+    """
+    PokerGame whose n-th reset_deck shuffles with hand_rng(seed, n).
+
+    Every hand's deck depends only on the session seed and the hand's
+    position in the stream, so any hand can be regenerated on its own.
+    """
+
+    def __init__(self, seed, position=0):
+        self.seed = seed
+        self.position = position
+        super().__init__(rng=hand_rng(seed, 'init'))
+
+    def reset_deck(self):
+        self.rng = hand_rng(self.seed, self.position)
+        self.position += 1
+        super().reset_deck()
+
+
+class CompactLog:
+    """
+    Session log holding the seed, the stream position and one short line per hand.
+
+    The first line is a JSON header (seed, position, deal order, default
+    bets); each hand then adds its decision code ('4', '2', '1', '0' or 'F'),
+    followed by ",ante,trips" only when the bets differ from the defaults
+    and ",ante,trips,blind" when a blind was refused for lack of chips.
+    Cards are never written: replay_deal regenerates them through PokerGame.
+    """
+
+    def __init__(self, path, seed=None, position=0, deal_order='streets', initial_stack=1000,
+                 start_bet=10, trip_bet=0, source=''):
+        if deal_order not in DEAL_ORDERS:
+            raise ValueError(f"Unknown deal order: {deal_order}")
+        self.path = path
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(1 << 63)
+        self.start_bet = start_bet
+        self.trip_bet = trip_bet
+        header = {
+            'version': COMPACT_LOG_VERSION,
+            'seed': self.seed,
+            'position': position,
+            'deal_order': deal_order,
+            'initial_stack': initial_stack,
+            'start_bet': start_bet,
+            'trip_bet': trip_bet,
+            'source': source
+        }
+        self.position = position
+        with open(path, 'w') as file:
+            file.write(json.dumps(header) + '\n')
+
+    def poker_game(self):
+        """
+        Returns:
+            SeededPokerGame: The game that deals this session's hands
+        """
+        return SeededPokerGame(self.seed, self.position)
+
+    def record(self, casino_game, folded=False):
+        """
+        Append the current hand, read from the bets of casino_game before the round is resolved.
+
+        Args:
+            casino_game (CasinoPokerGame): Game holding this hand's bets
+            folded (bool): The player folded at the river
+        """
+        # The play bet actually placed: a refused bet still goes to showdown
+        line = FOLD_CODE if folded else DECISION_CODES[casino_game.final_bet // casino_game.start_bet]
+        if casino_game.blind_bet != casino_game.start_bet:
+            line += f",{casino_game.start_bet},{casino_game.trip_bet},{casino_game.blind_bet}"
+        elif casino_game.start_bet != self.start_bet or casino_game.trip_bet != self.trip_bet:
+            line += f",{casino_game.start_bet},{casino_game.trip_bet}"
+        with open(self.path, 'a') as file:
+            file.write(line + '\n')
+
+
+def read_log(path):
+    """
+    Returns:
+        tuple: (header dict, list of (play multiple or None for a fold, ante, trips, blind) per hand)
+    """
+    with open(path) as file:
+        header = json.loads(file.readline())
+        if header.get('version') != COMPACT_LOG_VERSION:
+            raise ValueError(f"Unsupported compact log version: {header.get('version')}")
+        hands = []
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            code, *bets = line.split(',')
+            start_bet, trip_bet = (int(bets[0]), int(bets[1])) if bets else (header['start_bet'], header['trip_bet'])
+            blind_bet = int(bets[2]) if len(bets) > 2 else start_bet
+            hands.append((DECISION_MULTIPLES[code], start_bet, trip_bet, blind_bet))
+    return header, hands
+
+
+def replay_deal(header, hand_number):
+    """
+    Regenerate one hand of a session exactly as it was dealt.
+
+    Args:
+        header (dict): Log header (see read_log)
+        hand_number (int): 0-based hand index within the session
+
+    Returns:
+        dict: 'Player 1', 'Player 2' (the dealer) and 'Community Cards'
+    """
+    game = SeededPokerGame(header['seed'], header['position'] + hand_number)
+    if header['deal_order'] == 'deal_cards':
+        return game.deal_cards()
+    game.reset_deck()
+    player_hand = game.deal_player_cards()
+    dealer_hand = game.deal_opponent_cards()
+    community_cards = game.deal_flop() + [game.deal_turn(), game.deal_river()]
+    return {'Player 1': player_hand, 'Player 2': dealer_hand, 'Community Cards': community_cards}
+
+
+def replay_session(path, verbose=False):
+    """
+    Replay a compact log: regenerate every deal and resolve the recorded decisions.
+
+    Args:
+        path (str): Compact log file
+        verbose (bool): Print each hand in the text log format read by result_graph
+
+    Returns:
+        list: Round results of CasinoPokerGame.resolve_round, one per hand
+    """
+    header, hands = read_log(path)
+    casino_game = CasinoPokerGame(initial_player_stack=header['initial_stack'])
+    evaluator = PokerHandEvaluator()
+    for hand_number, (multiple, start_bet, trip_bet, blind_bet) in enumerate(hands):
+        deal = replay_deal(header, hand_number)
+        player_hand, dealer_hand, community_cards = deal['Player 1'], deal['Player 2'], deal['Community Cards']
+
+        # Bets are placed directly: the recorded session already validated them
+        casino_game.start_bet = start_bet
+        casino_game.side_bet = True
+        casino_game.blind_bet = blind_bet
+        casino_game.trip_bet = trip_bet
+        casino_game.player_stack -= start_bet + blind_bet + trip_bet
+        if multiple is not None:
+            casino_game.final_bet = multiple * start_bet
+            casino_game.player_stack -= casino_game.final_bet
+            player_result = evaluator.evaluate_hand(player_hand, community_cards)
+            dealer_result = evaluator.evaluate_hand(dealer_hand, community_cards)
+            if player_result[0] != dealer_result[0]:
+                winner = 1 if player_result[0] > dealer_result[0] else 2
+            else:
+                winner = evaluator.evaluate_equal_rank_hands(player_result, dealer_result)
+            casino_game.resolve_round(player_result[0], dealer_result[0], winner)
+        else:
+            casino_game.fold()
+
+        if verbose:
+            print(f"\n=== Hand {hand_number + 1} ===")
+            print(f"\nPlayer's hand: {' '.join(rank + suit for rank, suit in player_hand)}")
+            print(f"Dealer's hand: {' '.join(rank + suit for rank, suit in dealer_hand)}")
+            print(f"Community cards: {' '.join(rank + suit for rank, suit in community_cards)}")
+            print("Folded" if multiple is None else f"Play bet: {multiple}x")
+            print(f"\nHand complete. Current stack: {casino_game.get_player_stack()}")
+    return casino_game.get_round_history()
+
+
+if __name__ == "__main__":
+    # python compact_log.py session.uthlog [hand_number]
+    log_header, logged_hands = read_log(sys.argv[1])
+    if len(sys.argv) > 2:
+        number = int(sys.argv[2])
+        print(replay_deal(log_header, number - 1), logged_hands[number - 1])
+    else:
+        replay_session(sys.argv[1], verbose=True)
@@ -0,0 +1,159 @@
+import os
+import sys
+import json
+import time
+import numpy as np
+
+from entire_game import *
+from fast_evaluator import INDEX_CARD, TABLE_DIR
+
+DEAL_CORPUS_FILE = os.path.join(TABLE_DIR, 'deal_corpus.npy')
+DEAL_CORPUS_VERSION = 1
+
+# Cards per hand: player, dealer, then the five community cards (the order of PokerGame.deal_cards)
+CARDS_PER_DEAL = 9
+
+# Hands generated per block; block b always comes from the b-th spawned seed
+BLOCK_SIZE = 1 << 16
+
+
+def _generate_block(seed_sequence, num_hands):
+    # Nine steps of a Fisher-Yates shuffle of every row at once: uniform first nine cards
+    rng = np.random.default_rng(seed_sequence)
+    decks = np.tile(np.arange(52, dtype=np.uint8), (num_hands, 1))
+    rows = np.arange(num_hands)
+    for k in range(CARDS_PER_DEAL):
+        picks = k + rng.integers(0, 52 - k, size=num_hands)
+        chosen = decks[rows, picks]
+        decks[rows, picks] = decks[:, k]
+        decks[:, k] = chosen
+    return decks[:, :CARDS_PER_DEAL].copy()
+
+
+def generate_deal_corpus(path=DEAL_CORPUS_FILE, num_hands=1_000_000, seed=0):
+    """
+    Write num_hands deals as an (N, 9) uint8 .npy file that can be memory-mapped.
+
+    Hands are generated in blocks of BLOCK_SIZE from seeds spawned off one
+    SeedSequence, so the same seed always gives the same file, and a longer
+    corpus starts with the hands of a shorter one. The seed and size are
+    recorded in a JSON file next to the corpus.
+
+    Returns:
+        DealCorpus: The new corpus
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    deals = np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8, shape=(num_hands, CARDS_PER_DEAL))
+    num_blocks = -(-num_hands // BLOCK_SIZE)
+    for block, seed_sequence in enumerate(np.random.SeedSequence(seed).spawn(num_blocks)):
+        start = block * BLOCK_SIZE
+        stop = min(start + BLOCK_SIZE, num_hands)
+        # Always a full block, so a block's hands do not depend on the corpus size
+        deals[start:stop] = _generate_block(seed_sequence, BLOCK_SIZE)[:stop - start]
+    deals.flush()
+    del deals
+    with open(path + '.json', 'w') as file:
+        json.dump({'version': DEAL_CORPUS_VERSION, 'seed': seed, 'hands': num_hands, 'block_size': BLOCK_SIZE}, file)
+    return DealCorpus(path)
+
+
+class DealCorpus:
+    """
+    Read-only, memory-mapped view of a generated deal corpus.
+
+    Rows are (player, player, dealer, dealer, flop, flop, flop, turn, river)
+    card indices. Only the pages a reader touches are loaded, and processes
+    reading the same file share them.
+    """
+
+    def __init__(self, path=DEAL_CORPUS_FILE):
+        self.path = path
+        self.deals = np.load(path, mmap_mode='r')
+        if self.deals.dtype != np.uint8 or self.deals.ndim != 2 or self.deals.shape[1] != CARDS_PER_DEAL:
+            raise ValueError(f"{path} is not a deal corpus")
+        self.metadata = {}
+        if os.path.exists(path + '.json'):
+            with open(path + '.json') as file:
+                self.metadata = json.load(file)
+
+    def __len__(self):
+        return len(self.deals)
+
+    def worker_range(self, worker, num_workers, num_hands=None):
+        """
+        Contiguous share of one worker; the shares of 0..num_workers-1 cover the first num_hands hands once.
+
+        Returns:
+            tuple: (start, stop) row numbers
+        """
+        num_hands = len(self) if num_hands is None else min(num_hands, len(self))
+        return worker * num_hands // num_workers, (worker + 1) * num_hands // num_workers
+
+    def slice(self, start=0, stop=None):
+        """
+        Returns:
+            np.ndarray: (stop - start, 9) int64 card indices (copied out of the mapping)
+        """
+        return np.array(self.deals[start:stop], dtype=np.int64)
+
+    def iter_chunks(self, chunk_size=BLOCK_SIZE, worker=0, num_workers=1, num_hands=None):
+        """
+        Stream a worker's share in chunks.
+
+        Yields:
+            tuple: (first row number, (n, 9) int64 card indices)
+        """
+        start, stop = self.worker_range(worker, num_workers, num_hands)
+        for chunk_start in range(start, stop, chunk_size):
+            yield chunk_start, self.slice(chunk_start, min(chunk_start + chunk_size, stop))
+
+    def deal(self, row):
+        """
+        Returns:
+            dict: The row in the format of PokerGame.deal_cards
+        """
+        cards = [INDEX_CARD[card] for card in self.deals[row]]
+        return {'Player 1': cards[:2], 'Player 2': cards[2:4], 'Community Cards': cards[4:]}
+
+
+class CorpusPokerGame(PokerGame):
+    """
+    PokerGame dealing the rows of a DealCorpus in order, for session engines.
+
+    reset_deck loads the next row, so deal_cards and the street-by-street
+    methods of CasinoGameSimulator.simulate_hand both deal it as player,
+    dealer, then the community cards.
+    """
+
+    def __init__(self, corpus, start=0, stop=None):
+        self.corpus = corpus if isinstance(corpus, DealCorpus) else DealCorpus(corpus)
+        self.position = start
+        self.stop = len(self.corpus) if stop is None else stop
+        super().__init__()
+
+    def reset_deck(self):
+        if self.position >= self.stop:
+            raise ValueError("Deal corpus exhausted")
+        # Reversed so that pop() deals in corpus order
+        self.deck = [INDEX_CARD[card] for card in self.corpus.deals[self.position][::-1]]
+        self.position += 1
+        self.dealt_cards.clear()
+
+    def shuffle_deck(self):
+        # The corpus is already shuffled
+        pass
+
+    def _find_unique_card(self, excluded_cards):
+        if not self.deck:
+            raise ValueError("No more cards dealt to this hand")
+        return self.deck.pop()
+
+
+if __name__ == "__main__":
+    # python deal_corpus.py [num_hands] [seed]
+    num_hands = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    started = time.perf_counter()
+    corpus = generate_deal_corpus(DEAL_CORPUS_FILE, num_hands, seed)
+    elapsed = time.perf_counter() - started
+    print(f"{len(corpus)} deals in {elapsed:.1f} s ({len(corpus) / elapsed:,.0f} deals/s) -> {DEAL_CORPUS_FILE}")
@@ -0,0 +1,485 @@
+import csv
+import json
+import time
+import uuid
+import socket
+import random
+import argparse
+import threading
+import socketserver
+import multiprocessing
+import numpy as np
+from collections import deque
+
+from range_equity import HandRange, COMBO_CLASSES, range_equity
+from strategy_solver import STRATEGY_TABLE_FILE, canonical_flops, solve_flop, assemble_strategy
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8766
+
+# Every preflop class; matchup seeds use positions in this list
+PREFLOP_CLASSES = sorted(set(COMBO_CLASSES))
+
+# Seconds a worker may hold a unit without renewing before it is handed to another worker
+DEFAULT_LEASE_TIMEOUT = 30.0
+
+# Seconds a worker waits before asking again while every remaining unit is leased
+RETRY_DELAY = 0.5
+
+# Failed or expired leases of one unit before the job is abandoned
+DEFAULT_MAX_ATTEMPTS = 3
+
+# Seconds without any worker message before the coordinator gives up
+DEFAULT_IDLE_TIMEOUT = 300.0
+
+
+class PreflopMatchupJob:
+    """
+    Preflop class against class equities, the table of run_comprehensive_poker_simulation.
+
+    A unit is one hero class against a block of villain classes. Each
+    matchup samples its runouts from its own seed, so a row does not
+    depend on how the matchups were split or which worker ran them; the
+    mirrored matchup shares the seed, so its rates are the complement.
+
+    Args:
+        num_runouts (int): Runouts sampled per matchup (see range_equity)
+        block_size (int): Villain classes per unit
+        seed (int): Seed of the runout samples
+        classes (list): Preflop classes to cover (default all 169)
+    """
+
+    kind = 'preflop'
+
+    def __init__(self, num_runouts=200, block_size=13, seed=0, classes=None):
+        self.num_runouts = num_runouts
+        self.block_size = block_size
+        self.seed = seed
+        self.classes = list(classes) if classes is not None else PREFLOP_CLASSES
+
+    def params(self):
+        return {'num_runouts': self.num_runouts, 'block_size': self.block_size, 'seed': self.seed,
+                'classes': self.classes}
+
+    def units(self):
+        units = []
+        for hero in self.classes:
+            for start in range(0, len(self.classes), self.block_size):
+                units.append({'id': len(units), 'hero': hero, 'villains': self.classes[start:start + self.block_size]})
+        return units
+
+    def run(self, unit):
+        rows = []
+        hero = PREFLOP_CLASSES.index(unit['hero'])
+        for villain_class in unit['villains']:
+            villain = PREFLOP_CLASSES.index(villain_class)
+            result = range_equity(HandRange.from_classes({unit['hero']: 1.0}), HandRange.from_classes({villain_class: 1.0}),
+                                  num_runouts=self.num_runouts, seed=[self.seed, min(hero, villain), max(hero, villain)])
+            rows.append([unit['hero'], villain_class, result['Hero Win'], result['Villain Win'], result['Tie']])
+        return rows
+
+    def merge(self, results):
+        # Rows in unit order
+        return [row for result in results for row in result]
+
+    def save(self, merged, path):
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['Hero_Class', 'Villain_Class', 'Hero_Win_Rate', 'Villain_Win_Rate', 'Tie_Rate'])
+            writer.writerows(merged)
+
+
+class StrategyShardJob:
+    """
+    The flop stage of strategy_solver.solve_strategy, one shard of canonical flops per unit.
+
+    The merged shards go through assemble_strategy exactly like a local
+    solve, so the table is the same whichever workers solved which flops.
+
+    Args:
+        num_flops (int): Solve a random sample of canonical flops (all 1755 when None)
+        shard_size (int): Flops per unit
+        seed (int): Seed of the flop sample
+    """
+
+    kind = 'strategy'
+
+    def __init__(self, num_flops=None, shard_size=8, seed=None):
+        self.num_flops = num_flops
+        self.shard_size = shard_size
+        self.seed = seed
+        self.flops, self.counts = canonical_flops()
+        if num_flops is not None:
+            sampled = sorted(random.Random(seed).sample(range(len(self.flops)), min(num_flops, len(self.flops))))
+            self.flops, self.counts = self.flops[sampled], self.counts[sampled]
+
+    def params(self):
+        return {'num_flops': self.num_flops, 'shard_size': self.shard_size, 'seed': self.seed}
+
+    def units(self):
+        return [{'id': k, 'flops': [[int(card) for card in flop] for flop in self.flops[start:start + self.shard_size]]}
+                for k, start in enumerate(range(0, len(self.flops), self.shard_size))]
+
+    def run(self, unit):
+        # NaN (blocked combos) survives the JSON round trip
+        return [{key: values.tolist() for key, values in solve_flop(flop).items()} for flop in unit['flops']]
+
+    def merge(self, results):
+        solved = [{key: np.array(values) for key, values in flop.items()} for result in results for flop in result]
+        return assemble_strategy(self.flops, self.counts, solved)
+
+    def save(self, merged, path):
+        merged.save(path)
+
+
+JOB_KINDS = {job.kind: job for job in (PreflopMatchupJob, StrategyShardJob)}
+
+
+def _request(address, message, timeout=60.0):
+    # One newline-terminated JSON message each way per connection
+    with socket.create_connection(address, timeout=timeout) as connection:
+        connection.sendall(json.dumps(message).encode() + b'\n')
+        with connection.makefile('rb') as reply:
+            return json.loads(reply.readline())
+
+
+class _CoordinatorHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            reply = self.server.coordinator.handle(json.loads(line))
+        except (KeyError, ValueError) as error:
+            reply = {'error': str(error)}
+        self.wfile.write(json.dumps(reply).encode() + b'\n')
+
+
+class Coordinator:
+    """
+    Hands out the units of a job to workers over TCP and merges their results.
+
+    Workers lease one unit at a time and renew the lease while they work
+    on it. A lease that is not renewed within lease_timeout (a lost
+    worker) goes back to the front of the queue for the next worker. The
+    first result of a unit is kept and later duplicates are dropped; the
+    job merges results in unit order, so the output does not depend on the
+    number of workers, their speed or their failures.
+
+    A unit whose run raised, or whose lease expired, max_attempts times
+    stops the job, as does idle_timeout seconds without any worker
+    message; run then raises instead of waiting forever.
+
+    Args:
+        job: PreflopMatchupJob, StrategyShardJob or any object with kind, params(), units(), run() and merge()
+        host (str): Interface to listen on
+        port (int): Port (0 picks a free one, see address)
+        lease_timeout (float): Seconds before an unrenewed lease is reassigned
+        max_attempts (int): Failed or expired leases of one unit before the job is abandoned
+        idle_timeout (float): Seconds without a worker message before the job is abandoned (None waits forever)
+    """
+
+    def __init__(self, job, host=DEFAULT_HOST, port=DEFAULT_PORT, lease_timeout=DEFAULT_LEASE_TIMEOUT,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.job = job
+        self.units = {unit['id']: unit for unit in job.units()}
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.idle_timeout = idle_timeout
+        self.pending = deque(sorted(self.units))
+        self.leases = {}  # unit id -> (lease id, worker, expiry time)
+        self.results = {}
+        self.workers = {}  # worker -> units completed
+        self.attempts = {}  # unit id -> failed or expired leases
+        self.error = None
+        self.last_message = time.monotonic()
+        self.reassigned = 0
+        self.failures = 0
+        self.duplicates = 0
+        self.lock = threading.Lock()
+        self.finished = threading.Event()
+        if not self.units:
+            self.finished.set()
+        self.server = socketserver.ThreadingTCPServer((host, port), _CoordinatorHandler, bind_and_activate=False)
+        self.server.daemon_threads = True
+        self.server.allow_reuse_address = True
+        self.server.server_bind()
+        self.server.server_activate()
+        self.server.coordinator = self
+
+    @property
+    def address(self):
+        return self.server.server_address[:2]
+
+    def _retry(self, unit_id, reason):
+        # Requeue a unit at the front, or abandon the job once it has used its attempts
+        self.attempts[unit_id] = self.attempts.get(unit_id, 0) + 1
+        if self.attempts[unit_id] >= self.max_attempts:
+            self.error = f"Unit {unit_id} failed {self.attempts[unit_id]} times, last: {reason}"
+            self.finished.set()
+            return
+        self.pending.appendleft(unit_id)
+        self.reassigned += 1
+
+    def _reclaim(self, now):
+        # Expired leases go back to the front of the queue, lowest unit first
+        expired = sorted(unit_id for unit_id, (_, _, expiry) in self.leases.items() if expiry < now)
+        for unit_id in reversed(expired):
+            del self.leases[unit_id]
+            self._retry(unit_id, 'lease expired')
+
+    def handle(self, message):
+        """
+        Answer one worker message: 'lease', 'renew', 'result' or 'failed'.
+        """
+        now = time.monotonic()
+        with self.lock:
+            self.last_message = now
+            if self.error is not None:
+                return {'done': True}
+            if message['type'] == 'lease':
+                self._reclaim(now)
+                if self.pending:
+                    unit_id = self.pending.popleft()
+                    lease = uuid.uuid4().hex
+                    self.leases[unit_id] = (lease, message['worker'], now + self.lease_timeout)
+                    return {'lease': lease, 'unit': self.units[unit_id], 'kind': self.job.kind,
+                            'params': self.job.params(), 'lease_timeout': self.lease_timeout}
+                if self.leases:
+                    return {'wait': RETRY_DELAY}
+                return {'done': True}
+
+            unit_id = message['unit']
+            held = self.leases.get(unit_id)
+            if message['type'] == 'renew':
+                if held is None or held[0] != message['lease']:
+                    return {'ok': False}
+                self.leases[unit_id] = (held[0], held[1], now + self.lease_timeout)
+                return {'ok': True}
+
+            if message['type'] == 'result':
+                if unit_id in self.results:
+                    self.duplicates += 1
+                    return {'ok': False}
+                self.results[unit_id] = message['result']
+                self.workers[message['worker']] = self.workers.get(message['worker'], 0) + 1
+                # A reassigned unit may still be pending or leased elsewhere
+                self.leases.pop(unit_id, None)
+                if unit_id in self.pending:
+                    self.pending.remove(unit_id)
+                if len(self.results) == len(self.units):
+                    self.finished.set()
+                return {'ok': True}
+
+            if message['type'] == 'failed':
+                # Only the current lease holder's failure counts against the unit
+                if held is None or held[0] != message['lease']:
+                    return {'ok': False}
+                del self.leases[unit_id]
+                self.failures += 1
+                self._retry(unit_id, message.get('error', 'unknown error'))
+                return {'ok': True}
+        raise ValueError(f"Unknown message type {message['type']}")
+
+    def run(self, progress=False, workers_alive=None):
+        """
+        Serve until every unit has a result.
+
+        Args:
+            progress (bool): Print progress every second
+            workers_alive (callable): Returns False once no worker can report any more
+                (run_local's processes); the job is abandoned then
+
+        Returns:
+            The job's merge of the results in unit order
+
+        Raises:
+            RuntimeError: A unit used up its attempts or no worker is left
+            TimeoutError: No worker message for idle_timeout seconds
+        """
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        self.last_message = time.monotonic()
+        try:
+            while not self.finished.wait(1.0):
+                if progress:
+                    print(f"{len(self.results)}/{len(self.units)} units, {len(self.leases)} leased, "
+                          f"{self.reassigned} reassigned")
+                if workers_alive is not None and not workers_alive() and not self.finished.is_set():
+                    raise RuntimeError(f"Every worker exited with {len(self.units) - len(self.results)} units left")
+                if self.idle_timeout is not None and time.monotonic() - self.last_message > self.idle_timeout:
+                    raise TimeoutError(f"No worker message for {self.idle_timeout:.0f} s "
+                                       f"with {len(self.units) - len(self.results)} units left")
+        finally:
+            self.server.shutdown()
+            self.server.server_close()
+        if self.error is not None:
+            raise RuntimeError(self.error)
+        return self.job.merge([self.results[unit_id] for unit_id in sorted(self.units)])
+
+    def stats(self):
+        return {'Units': len(self.units), 'Reassigned': self.reassigned, 'Failures': self.failures,
+                'Duplicates': self.duplicates, 'Units Per Worker': dict(self.workers)}
+
+
+def _renew_leases(address, message, interval, stop):
+    # Renew a lease until the unit is finished (stop is set)
+    while not stop.wait(interval):
+        try:
+            if not _request(address, dict(message, type='renew')).get('ok'):
+                return
+        except OSError:
+            return
+
+
+def run_worker(host=DEFAULT_HOST, port=DEFAULT_PORT, worker=None, fail_after=None):
+    """
+    Lease, run and report units until the coordinator is done (or gone).
+
+    A unit whose run raises is reported as failed, and the worker goes on
+    with the next lease; the coordinator decides whether to retry it.
+
+    Args:
+        worker (str): Name reported to the coordinator (default host name and a random suffix)
+        fail_after (int): Stand in for a lost node: exit without reporting the unit after this many
+
+    Returns:
+        int: Units completed
+    """
+    address = (host, port)
+    worker = worker or f"{socket.gethostname()}-{uuid.uuid4().hex[:6]}"
+    jobs = {}
+    completed = 0
+    while True:
+        try:
+            reply = _request(address, {'type': 'lease', 'worker': worker})
+        except OSError:
+            # The coordinator shuts down once every unit has a result
+            return completed
+        if reply.get('done'):
+            return completed
+        if 'wait' in reply:
+            time.sleep(reply['wait'])
+            continue
+        if fail_after is not None and completed >= fail_after:
+            return completed
+
+        key = (reply['kind'], json.dumps(reply['params'], sort_keys=True))
+        if key not in jobs:
+            jobs[key] = JOB_KINDS[reply['kind']](**reply['params'])
+        unit = reply['unit']
+        lease = {'lease': reply['lease'], 'unit': unit['id'], 'worker': worker}
+        stop = threading.Event()
+        renewer = threading.Thread(target=_renew_leases, args=(address, lease, reply['lease_timeout'] / 3, stop),
+                                   daemon=True)
+        renewer.start()
+        try:
+            result = jobs[key].run(unit)
+            message = dict(lease, type='result', result=result)
+        except Exception as error:
+            message = dict(lease, type='failed', error=f"{type(error).__name__}: {error}")
+        finally:
+            stop.set()
+        try:
+            _request(address, message)
+        except OSError:
+            return completed
+        if message['type'] == 'result':
+            completed += 1
+
+
+def run_local(job, num_workers=2, lease_timeout=DEFAULT_LEASE_TIMEOUT, fail_after=None, progress=False,
+              max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Run a job with worker processes on this machine standing in for nodes.
+
+    Args:
+        job: The job to distribute
+        num_workers (int): Worker processes
+        lease_timeout (float): Seconds before an unrenewed lease is reassigned
+        fail_after (int): The first worker drops out holding a lease after this many units
+        max_attempts (int): Failed or expired leases of one unit before the job is abandoned
+
+    Returns:
+        tuple: (merged result, coordinator stats)
+    """
+    coordinator = Coordinator(job, DEFAULT_HOST, 0, lease_timeout, max_attempts)
+    host, port = coordinator.address
+    # Spawned like separate nodes: a forked worker would inherit the listening socket and could
+    # connect to it after the coordinator stopped serving
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=run_worker, args=(host, port, f"local-{k}", fail_after if k == 0 else None))
+                 for k in range(num_workers)]
+    for process in processes:
+        process.start()
+    try:
+        merged = coordinator.run(progress, workers_alive=lambda: any(process.is_alive() for process in processes))
+    finally:
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+    return merged, coordinator.stats()
+
+
+def _make_job(args):
+    if args.job == 'preflop':
+        return PreflopMatchupJob(args.runouts, args.block_size, args.seed,
+                                 args.classes.split(',') if args.classes else None)
+    return StrategyShardJob(args.flops, args.shard_size, args.seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distribute preflop and strategy table generation over TCP")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    coordinate = subparsers.add_parser('coordinate', help="Serve a job's units to workers and write the result")
+    local = subparsers.add_parser('local', help="Coordinator plus worker processes on this machine")
+    work = subparsers.add_parser('work', help="Run a worker against a coordinator")
+    for subparser in (coordinate, local):
+        subparser.add_argument('job', choices=sorted(JOB_KINDS))
+        subparser.add_argument('--output', help="Result file (CSV for preflop, .npz for strategy)")
+        subparser.add_argument('--lease-timeout', type=float, default=DEFAULT_LEASE_TIMEOUT)
+        subparser.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS,
+                               help="Failed or expired leases of one unit before giving up")
+        subparser.add_argument('--seed', type=int, default=0)
+        subparser.add_argument('--runouts', type=int, default=200, help="preflop: runouts per matchup")
+        subparser.add_argument('--block-size', type=int, default=13, help="preflop: villain classes per unit")
+        subparser.add_argument('--classes', help="preflop: comma-separated classes (default all 169)")
+        subparser.add_argument('--flops', type=int, default=None, help="strategy: canonical flops (default all)")
+        subparser.add_argument('--shard-size', type=int, default=8, help="strategy: flops per unit")
+    local.add_argument('--workers', type=int, default=2)
+    local.add_argument('--fail-after', type=int, default=None, help="Drop the first worker after this many units")
+    coordinate.add_argument('--idle-timeout', type=float, default=DEFAULT_IDLE_TIMEOUT,
+                            help="Give up after this many seconds without a worker message")
+    for subparser in (coordinate, work):
+        subparser.add_argument('--host', default=DEFAULT_HOST)
+        subparser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    work.add_argument('--fail-after', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.command == 'work':
+        print(f"Completed {run_worker(args.host, args.port, fail_after=args.fail_after)} units")
+        return
+
+    job = _make_job(args)
+    output = args.output or (f'preflop_matchups_{args.seed}.csv' if args.job == 'preflop' else STRATEGY_TABLE_FILE)
+    started = time.perf_counter()
+    if args.command == 'local':
+        merged, stats = run_local(job, args.workers, args.lease_timeout, args.fail_after, progress=True,
+                                  max_attempts=args.max_attempts)
+    else:
+        coordinator = Coordinator(job, args.host, args.port, args.lease_timeout, args.max_attempts,
+                                  args.idle_timeout)
+        print(f"Coordinating {len(coordinator.units)} units on {args.host}:{args.port}")
+        merged = coordinator.run(progress=True)
+        stats = coordinator.stats()
+    job.save(merged, output)
+    print(f"{stats['Units']} units in {time.perf_counter() - started:.1f} s "
+          f"({stats['Reassigned']} reassigned, {stats['Failures']} failed runs, {stats['Duplicates']} duplicates) "
+          f"-> {output}")
+    print(f"Units per worker: {stats['Units Per Worker']}")
+
+
+if __name__ == "__main__":
+    main()
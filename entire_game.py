@@ -4,13 +4,20 @@ import pandas as pd
 from collections import Counter
 from itertools import combinations
 from datetime import datetime 
+from instrumentation import INSTRUMENTATION
+
+# Card ranks and suits in deck order
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+SUITS = ['S', 'H', 'D', 'C']
 
 class PokerGame:
-    def __init__(self):
+    def __init__(self, rng=None):
+        # Shuffle source: any object with a shuffle method, e.g. random.Random(seed)
+        # for reproducible deals; defaults to the global random module
+        self.rng = rng if rng is not None else random
+
         # Create a deck of cards using product of ranks and suits
-        ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
-        suits = ['S', 'H', 'D', 'C']
-        self.deck = list(itertools.product(ranks, suits))
+        self.deck = list(itertools.product(RANKS, SUITS))
         self.shuffle_deck()
         
         # Track dealt cards to avoid repeats
@@ -18,17 +25,16 @@ class PokerGame:
 
     def reset_deck(self):
         # Reset and reshuffle the deck for a new game
-        ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
-        suits = ['S', 'H', 'D', 'C']
-        self.deck = list(itertools.product(ranks, suits))
+        self.deck = list(itertools.product(RANKS, SUITS))
         self.shuffle_deck()
         self.dealt_cards.clear()
         
     def shuffle_deck(self):
-        random.shuffle(self.deck)
+        self.rng.shuffle(self.deck)
     
     def deal_cards(self):
         # Deal cards for two players
+        timer = INSTRUMENTATION.start('deal')
         self.reset_deck()
         
         player1_hand = [self.deck.pop() for _ in range(2)]
@@ -36,6 +42,7 @@ class PokerGame:
         
         # Deal community cards
         community_cards = [self.deck.pop() for _ in range(5)]
+        INSTRUMENTATION.stop(timer)
         
         return {
             'Player 1': player1_hand,
@@ -109,9 +116,11 @@ class PokerGame:
     
     def _find_unique_card(self, excluded_cards):
         """Find a card that hasn't been dealt yet."""
+        timer = INSTRUMENTATION.start('deal')
         for card in self.deck:
             if card not in excluded_cards:
                 self.deck.remove(card)
+                INSTRUMENTATION.stop(timer)
                 return card
         
         raise ValueError("No more unique cards available in the deck")
@@ -146,6 +155,7 @@ class PokerHandEvaluator:
                            '9':9, '10':10, 'J':11, 'Q':12, 'K':13, 'A':14}
 
     def evaluate_hand(self, hole_cards, community_cards):
+        timer = INSTRUMENTATION.start('evaluate')
         all_cards = hole_cards + community_cards
         all_combinations = list(combinations(all_cards, 5))
         best_hand = (0, '', [])  # (score, hand_name, cards)
@@ -200,6 +210,7 @@ class PokerHandEvaluator:
                     best_hand = (score[0], hand_name, five_cards)
 
                 
+        INSTRUMENTATION.stop(timer)
         return best_hand
     
     def evaluate_equal_rank_hands(self, p1_score, p2_score):
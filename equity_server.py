@@ -0,0 +1,327 @@
+import json
+import time
+import queue
+import random
+import argparse
+import threading
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import numpy as np
+
+from entire_game import *
+from fast_evaluator import cards_to_indices, index_to_card, seven_card_rank_array, load_five_card_table
+from board_cache import get_board_ranks
+from instrumentation import Histogram
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Sampled dealer hands and runouts per pre-flop, flop or turn query
+DEFAULT_SAMPLES = 2000
+
+# Most samples one query may ask for
+MAX_SAMPLES = 200000
+
+# Seconds a request waits for its batch before answering 504
+REQUEST_TIMEOUT = 30
+
+
+def parse_card(text):
+    # "AS" / "10H" -> ('A', 'S') / ('10', 'H'), the format of PokerGame.display_cards
+    return text[:-1], text[-1]
+
+
+def format_card(card):
+    return f"{card[0]}{card[1]}"
+
+
+def _sample_outcomes(queries, rng):
+    """
+    Win/loss/tie counts of pre-flop, flop and turn queries, vectorized over the batch.
+
+    Every query draws its dealer hands and missing board cards from its own
+    remaining deck; the seven-card hands of all queries are then ranked in
+    one seven_card_rank_array call.
+    """
+    player_hands, dealer_hands, sizes = [], [], []
+    for hand, board, samples in queries:
+        known = hand + board
+        remaining = np.array([card for card in range(52) if card not in known], dtype=np.intp)
+        missing = 2 + 5 - len(board)
+        # A random permutation prefix per sample: dealer hole cards, then the runout
+        draws = remaining[np.argsort(rng.random((samples, len(remaining))), axis=1)[:, :missing]]
+        full_board = np.concatenate([np.broadcast_to(np.array(board, dtype=np.intp), (samples, len(board))),
+                                     draws[:, 2:]], axis=1)
+        player_hands.append(np.concatenate([np.broadcast_to(np.array(hand), (samples, 2)), full_board], axis=1))
+        dealer_hands.append(np.concatenate([draws[:, :2], full_board], axis=1))
+        sizes.append(samples)
+
+    player_ranks = seven_card_rank_array(np.concatenate(player_hands))
+    dealer_ranks = seven_card_rank_array(np.concatenate(dealer_hands))
+    results = []
+    start = 0
+    for samples in sizes:
+        player, dealer = player_ranks[start:start + samples], dealer_ranks[start:start + samples]
+        results.append((int((player > dealer).sum()), int((player < dealer).sum()), int((player == dealer).sum())))
+        start += samples
+    return results
+
+
+class EquityBatcher:
+    """
+    Coalesces concurrent equity queries into batches.
+
+    Queries wait up to max_wait seconds (or until max_batch have arrived)
+    and are then answered together: river queries exactly from the shared
+    board cache, earlier streets by one vectorized sample over the batch.
+    """
+
+    def __init__(self, max_batch=64, max_wait=0.005, seed=None):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.rng = np.random.default_rng(seed)
+        self.queue = queue.Queue()
+        self.batch_sizes = Histogram()
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    def submit(self, hand, board, samples=DEFAULT_SAMPLES):
+        """
+        Args:
+            hand (list): Two (rank, suit) cards
+            board (list): 0, 3, 4 or 5 (rank, suit) cards
+            samples (int): Samples for streets before the river, 1 to MAX_SAMPLES
+
+        Returns:
+            Future: Resolves to the equity dict
+        """
+        if len(hand) != 2 or len(board) not in (0, 3, 4, 5):
+            raise ValueError("Expected two hole cards and a board of 0, 3, 4 or 5 cards")
+        if isinstance(samples, bool) or not isinstance(samples, (int, np.integer)) or not 1 <= samples <= MAX_SAMPLES:
+            raise ValueError(f"samples must be an integer from 1 to {MAX_SAMPLES}")
+        indices = cards_to_indices(hand + board)
+        if len(set(indices)) != len(indices):
+            raise ValueError("Duplicate cards in query")
+        future = Future()
+        self.queue.put((indices[:2], indices[2:], samples, future))
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self.batch_sizes.add(len(batch))
+            self._answer(batch)
+
+    def _answer(self, batch):
+        # A failing query only fails its own future, never the rest of its batch
+        sampled = []
+        for hand, board, samples, future in batch:
+            if len(board) == 5:
+                _settle(future, lambda: _format_counts(
+                    *get_board_ranks([index_to_card(card) for card in board]).counts(hand), exact=True))
+            else:
+                sampled.append((hand, board, samples, future))
+        if not sampled:
+            return
+        try:
+            outcomes = _sample_outcomes([(hand, board, samples) for hand, board, samples, _ in sampled], self.rng)
+        except Exception:
+            # Sample the queries one at a time to isolate the bad one
+            outcomes = [None] * len(sampled)
+        for (hand, board, samples, future), outcome in zip(sampled, outcomes):
+            _settle(future, lambda: _format_counts(
+                *(outcome or _sample_outcomes([(hand, board, samples)], self.rng)[0]), exact=False))
+
+
+def _settle(future, compute):
+    # Resolve a future with compute() or the exception it raised
+    try:
+        future.set_result(compute())
+    except Exception as error:
+        future.set_exception(error)
+
+
+def _format_counts(wins, losses, ties, exact):
+    total = wins + losses + ties
+    return {
+        'Player 1 Win': round(wins / total * 100, 2),
+        'Player 2 Win': round(losses / total * 100, 2),
+        'Tie': round(ties / total * 100, 2),
+        'Samples': total,
+        'Exact': exact
+    }
+
+
+class EquityRequestHandler(BaseHTTPRequestHandler):
+    # POST /equity {"hand": ["AS", "KD"], "board": [...], "samples": 2000}; GET /stats
+
+    def do_POST(self):
+        if self.path != '/equity':
+            return self._reply(404, {'error': 'unknown path'})
+        try:
+            query = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            future = self.server.batcher.submit([parse_card(card) for card in query['hand']],
+                                                [parse_card(card) for card in query.get('board', [])],
+                                                query.get('samples', DEFAULT_SAMPLES))
+        except (KeyError, IndexError, ValueError, TypeError, AttributeError) as error:
+            return self._reply(400, {'error': str(error)})
+        try:
+            self._reply(200, future.result(timeout=REQUEST_TIMEOUT))
+        except TimeoutError:
+            self._reply(504, {'error': 'timed out waiting for the batch'})
+        except Exception as error:
+            self._reply(500, {'error': str(error)})
+
+    def do_GET(self):
+        if self.path != '/stats':
+            return self._reply(404, {'error': 'unknown path'})
+        self._reply(200, {'batch_sizes': self.server.batcher.batch_sizes.summary()})
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep the console quiet under load
+        pass
+
+
+def run_server(host=DEFAULT_HOST, port=DEFAULT_PORT, max_batch=64, max_wait=0.005):
+    """
+    Serve equity queries over localhost HTTP until interrupted.
+
+    The five-card table is loaded before the first request so every client
+    shares one warm copy.
+    """
+    load_five_card_table()
+    server = ThreadingHTTPServer((host, port), EquityRequestHandler)
+    server.daemon_threads = True
+    server.batcher = EquityBatcher(max_batch=max_batch, max_wait=max_wait)
+    print(f"Equity server listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+class EquityClient:
+    """
+    Client with the scenario methods of PyroPokerSimulation, answered by the server.
+
+    Results use the same 'Player 1 Win' / 'Player 2 Win' / 'Tie' keys, so a
+    client can stand in for a local PyroPokerSimulation.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, samples=DEFAULT_SAMPLES, timeout=30):
+        self.url = f"http://{host}:{port}"
+        self.samples = samples
+        self.timeout = timeout
+
+    def equity(self, player_cards, board=()):
+        body = json.dumps({'hand': [format_card(card) for card in player_cards],
+                           'board': [format_card(card) for card in board],
+                           'samples': self.samples}).encode()
+        request = urllib.request.Request(self.url + '/equity', data=body,
+                                         headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def simulate_pre_flop(self, player_cards, *args, **kwargs):
+        return self.equity(player_cards)
+
+    def simulate_scenario_1(self, player_cards, flop, *args, **kwargs):
+        return self.equity(player_cards, flop)
+
+    def simulate_scenario_2(self, player_cards, flop, turn, *args, **kwargs):
+        return self.equity(player_cards, list(flop) + [turn])
+
+    def simulate_scenario_3(self, player_cards, community_cards, *args, **kwargs):
+        return self.equity(player_cards, community_cards)
+
+    def stats(self):
+        with urllib.request.urlopen(self.url + '/stats', timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+
+def run_load(host=DEFAULT_HOST, port=DEFAULT_PORT, num_requests=1000, concurrency=16, samples=DEFAULT_SAMPLES, seed=None):
+    """
+    Load generator: random queries across all streets from concurrent clients.
+
+    Returns:
+        dict: 'Requests', 'Throughput' (requests/s) and latency 'p50' / 'p99' / 'max' in ms
+    """
+    rng = random.Random(seed)
+    deck = [(rank, suit) for rank in RANKS for suit in SUITS]
+    queries = []
+    for _ in range(num_requests):
+        cards = rng.sample(deck, 7)
+        queries.append((cards[:2], cards[2:2 + rng.choice((0, 3, 4, 5))]))
+
+    client = EquityClient(host, port, samples=samples)
+    latencies = Histogram()
+    lock = threading.Lock()
+
+    def send(query):
+        started = time.perf_counter()
+        client.equity(*query)
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.add(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(send, queries))
+    elapsed = time.perf_counter() - started
+
+    summary = latencies.summary()
+    return {
+        'Requests': num_requests,
+        'Throughput': num_requests / elapsed,
+        'p50': summary['p50'] * 1e3,
+        'p99': summary['p99'] * 1e3,
+        'max': summary['max'] * 1e3
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local equity server with request batching")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    serve = subparsers.add_parser('serve', help="Run the server")
+    load = subparsers.add_parser('load', help="Run the load generator against a running server")
+    for subparser in (serve, load):
+        subparser.add_argument('--host', default=DEFAULT_HOST)
+        subparser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve.add_argument('--max-batch', type=int, default=64)
+    serve.add_argument('--max-wait', type=float, default=0.005, help="Seconds a batch waits for more queries")
+    load.add_argument('--requests', type=int, default=1000)
+    load.add_argument('--concurrency', type=int, default=16)
+    load.add_argument('--samples', type=int, default=DEFAULT_SAMPLES)
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        run_server(args.host, args.port, args.max_batch, args.max_wait)
+    else:
+        result = run_load(args.host, args.port, args.requests, args.concurrency, args.samples)
+        print(f"Requests: {result['Requests']}, throughput {result['Throughput']:.1f} req/s")
+        print(f"Latency p50 {result['p50']:.2f} ms, p99 {result['p99']:.2f} ms, max {result['max']:.2f} ms")
+        print(f"Server batch sizes: {EquityClient(args.host, args.port).stats()['batch_sizes']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,550 @@
+import os
+import sys
+import time
+import argparse
+import itertools
+import numpy as np
+from collections import Counter
+from contextlib import contextmanager
+from functools import cmp_to_key
+from multiprocessing import Pool
+
+from entire_game import *
+from fast_evaluator import *
+import jit_kernels
+from jit_kernels import rank_hands, HAND_SUBSETS
+from shared_tables import TableRegistry, publish_rank_table, attach_worker_tables
+
+REFERENCE_CORPUS_FILE = os.path.join(TABLE_DIR, 'reference_corpus.npz')
+
+# Candidate evaluators: name -> function mapping an (N, 5) or (N, 7) card index
+# array to N comparable strengths (larger is better, equal is a tie)
+CANDIDATES = {}
+
+# Sampled tallies may sit this many standard errors from the exact rates
+TALLY_Z_LIMIT = 5.0
+
+
+def register_candidate(name, evaluate):
+    """
+    Register a candidate evaluator for the differential tests.
+
+    Candidates are looked up by name inside the worker processes, so
+    register them at import time of a module (or before the pool starts).
+    """
+    CANDIDATES[name] = evaluate
+    return evaluate
+
+
+def _candidate_python(hands):
+    return np.array([hand_strength(row) for row in hands.tolist()], dtype=np.int64)
+
+
+def _candidate_numpy(hands):
+    if hands.shape[1] == 5:
+        return five_card_strength_array(hands)
+    subsets = hands[:, SEVEN_CARD_SUBSETS].reshape(-1, 5)
+    return five_card_strength_array(subsets).reshape(len(hands), -1).max(axis=1)
+
+
+def _candidate_table(hands):
+    if hands.shape[1] == 5:
+        ranks, _ = load_five_card_table()
+        return ranks[colex_index(np.sort(hands, axis=1))].astype(np.int64)
+    return seven_card_rank_array(hands).astype(np.int64)
+
+
+register_candidate('python', _candidate_python)
+register_candidate('numpy', _candidate_numpy)
+register_candidate('table', _candidate_table)
+# Numba kernels, or their NumPy fallback when Numba is not installed
+register_candidate('jit', rank_hands)
+
+
+def _chunks(total, chunk_size):
+    return [(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+
+
+def _reference_chunk(hands):
+    """
+    Evaluate five-card hands with the reference evaluator.
+
+    Returns:
+        tuple: (categories, class ids). Hands with the same class id have the
+        same category and the same card values, which is all the reference
+        comparison looks at.
+    """
+    evaluator = PokerHandEvaluator()
+    categories = np.empty(len(hands), dtype=np.uint8)
+    class_ids = np.empty(len(hands), dtype=np.int64)
+    for row, hand in enumerate(hands.tolist()):
+        cards = [index_to_card(index) for index in hand]
+        category = evaluator.evaluate_hand(cards[:2], cards[2:])[0]
+        values = sorted((evaluator.card_values[rank] for rank, _ in cards), reverse=True)
+        categories[row] = category
+        class_ids[row] = strength_key(category, values)
+    return categories, class_ids
+
+
+def generate_reference_corpus(path=REFERENCE_CORPUS_FILE, workers=None, chunk_size=50000):
+    """
+    Rank every five-card hand with PokerHandEvaluator.
+
+    Every hand is evaluated by the reference evaluate_hand in a process
+    pool. The distinct (category, values) classes are then sorted with the
+    reference evaluate_equal_rank_hands, so the relative ranks are exactly
+    the reference ordering, ties included.
+
+    The corpus is stored as two arrays indexed by colex index (see
+    fast_evaluator.colex_index): uint8 categories and uint16 relative ranks.
+
+    Returns:
+        tuple: (categories, ranks)
+    """
+    hands = all_five_card_hands()
+    jobs = [hands[start:stop] for start, stop in _chunks(len(hands), chunk_size)]
+    with Pool(workers) as pool:
+        results = pool.map(_reference_chunk, jobs)
+    categories = np.concatenate([result[0] for result in results])
+    class_ids = np.concatenate([result[1] for result in results])
+
+    unique_ids, first_rows, inverse = np.unique(class_ids, return_index=True, return_inverse=True)
+    evaluator = PokerHandEvaluator()
+    representatives = []
+    for row in first_rows:
+        cards = tuple(index_to_card(index) for index in hands[row].tolist())
+        representatives.append((int(categories[row]), '', cards))
+
+    def compare(a, b):
+        if representatives[a][0] != representatives[b][0]:
+            return representatives[a][0] - representatives[b][0]
+        output = evaluator.evaluate_equal_rank_hands(representatives[a], representatives[b])
+        return {1: 1, 2: -1, 3: 0}[output]
+
+    order = sorted(range(len(unique_ids)), key=cmp_to_key(compare))
+    class_ranks = np.empty(len(unique_ids), dtype=np.uint16)
+    rank = 1
+    for position, class_index in enumerate(order):
+        if position and compare(order[position - 1], class_index) != 0:
+            rank += 1
+        class_ranks[class_index] = rank
+    ranks = class_ranks[inverse]
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez_compressed(path, categories=categories, ranks=ranks)
+    return categories, ranks
+
+
+def load_reference_corpus(path=REFERENCE_CORPUS_FILE, workers=None):
+    """
+    Load the reference corpus, generating it on first use.
+
+    Returns:
+        tuple: (categories, ranks) indexed by colex index
+    """
+    if not os.path.exists(path):
+        return generate_reference_corpus(path, workers)
+    with np.load(path) as corpus:
+        return corpus['categories'], corpus['ranks']
+
+
+def _edge_case(hand):
+    # Short label of the structures evaluators most often get wrong
+    values = sorted((index >> 2) + 2 for index in hand)
+    counts = sorted(Counter(values).values())
+    if values == [2, 3, 4, 5, 14]:
+        return 'wheel'
+    if counts == [2, 3]:
+        return 'full house'
+    if counts == [1, 2, 2]:
+        return 'two pair'
+    return ''
+
+
+def _describe_hand(hand, categories, ranks, strengths):
+    index = int(colex_index(np.sort(np.asarray(hand))))
+    return {
+        'cards': ' '.join(f"{rank}{suit}" for rank, suit in (index_to_card(card) for card in hand)),
+        'reference_hand': HAND_NAMES[int(categories[index])],
+        'reference_rank': int(ranks[index]),
+        'candidate_strength': int(strengths[index]),
+        'edge_case': _edge_case(hand)
+    }
+
+
+def _candidate_chunk(args):
+    name, hands = args
+    return CANDIDATES[name](hands)
+
+
+def check_five_card_hands(name, corpus=None, workers=None, chunk_size=200000, max_examples=10):
+    """
+    Check a candidate against every five-card hand of the reference corpus.
+
+    The candidate must give one strength to all hands of a reference rank
+    (no split classes) and strictly larger strengths to higher reference
+    ranks (no misordered classes).
+
+    Returns:
+        dict: Mismatch counts, example hands and the candidate's throughput
+    """
+    categories, ranks = corpus if corpus is not None else load_reference_corpus(workers=workers)
+    hands = all_five_card_hands()
+    jobs = [(name, hands[start:stop]) for start, stop in _chunks(len(hands), chunk_size)]
+
+    start = time.perf_counter()
+    with TableRegistry() as registry:
+        publish_rank_table(registry)
+        with Pool(workers, attach_worker_tables, (registry.directory,)) as pool:
+            strengths = np.concatenate(pool.map(_candidate_chunk, jobs))
+    elapsed = time.perf_counter() - start
+
+    order = np.argsort(ranks, kind='stable')
+    sorted_strengths = strengths[order]
+    sorted_ranks = ranks[order]
+    starts = np.flatnonzero(np.r_[True, sorted_ranks[1:] != sorted_ranks[:-1]])
+    group_min = np.minimum.reduceat(sorted_strengths, starts)
+    group_max = np.maximum.reduceat(sorted_strengths, starts)
+    group_sizes = np.diff(np.r_[starts, len(ranks)])
+
+    split = group_min != group_max
+    misordered = np.zeros(len(starts), dtype=bool)
+    overlap = group_min[1:] <= group_max[:-1]
+    misordered[1:] |= overlap
+    misordered[:-1] |= overlap
+    bad_groups = np.flatnonzero(split | misordered)
+
+    examples = []
+    for group in bad_groups[:max_examples]:
+        row = order[starts[group]]
+        examples.append(_describe_hand(hands[row].tolist(), categories, ranks, strengths))
+
+    return {
+        'hands': len(hands),
+        'split_classes': int(split.sum()),
+        'misordered_classes': int(misordered.sum()),
+        'mismatched_hands': int(group_sizes[bad_groups].sum()),
+        'examples': examples,
+        'hands_per_sec': len(hands) / elapsed
+    }
+
+
+def _random_deals(seed, count):
+    # Nine distinct cards per deal: two hero cards, two villain cards, five board cards
+    rng = np.random.default_rng(seed)
+    return np.argsort(rng.random((count, 52)), axis=1)[:, :9]
+
+
+def _seven_card_chunk(args):
+    name, seed, count = args
+    deals = _random_deals(seed, count)
+    hero = np.concatenate([deals[:, 0:2], deals[:, 4:9]], axis=1)
+    villain = np.concatenate([deals[:, 2:4], deals[:, 4:9]], axis=1)
+
+    start = time.perf_counter()
+    hero_strength = CANDIDATES[name](hero)
+    villain_strength = CANDIDATES[name](villain)
+    candidate_time = time.perf_counter() - start
+    candidate = np.where(hero_strength > villain_strength, 1, np.where(villain_strength > hero_strength, 2, 3))
+
+    start = time.perf_counter()
+    reference = np.empty(count, dtype=np.int64)
+    for row, deal in enumerate(deals.tolist()):
+        cards = [index_to_card(index) for index in deal]
+        reference[row] = determine_winner(cards[0:2], cards[2:4], cards[4:9])[2]
+    reference_time = time.perf_counter() - start
+
+    mismatches = deals[candidate != reference]
+    return mismatches, candidate[candidate != reference], reference[candidate != reference], \
+        candidate_time, reference_time
+
+
+def check_seven_card_pairs(name, num_pairs=20000, seed=0, workers=None, chunk_size=2000, max_examples=10):
+    """
+    Compare a candidate with determine_winner on random seven-card showdowns.
+
+    Returns:
+        dict: Mismatch count, example deals and both throughputs
+    """
+    jobs = [(name, seed * 1000003 + chunk, stop - start)
+            for chunk, (start, stop) in enumerate(_chunks(num_pairs, chunk_size))]
+    with TableRegistry() as registry:
+        publish_rank_table(registry)
+        with Pool(workers, attach_worker_tables, (registry.directory,)) as pool:
+            results = pool.map(_seven_card_chunk, jobs)
+
+    mismatches = np.concatenate([result[0] for result in results])
+    candidate_winners = np.concatenate([result[1] for result in results])
+    reference_winners = np.concatenate([result[2] for result in results])
+    candidate_time = sum(result[3] for result in results)
+    reference_time = sum(result[4] for result in results)
+
+    examples = []
+    for deal, candidate, reference in list(zip(mismatches.tolist(), candidate_winners, reference_winners))[:max_examples]:
+        cards = [f"{rank}{suit}" for rank, suit in (index_to_card(index) for index in deal)]
+        examples.append({
+            'player': ' '.join(cards[0:2]),
+            'dealer': ' '.join(cards[2:4]),
+            'board': ' '.join(cards[4:9]),
+            'reference_winner': int(reference),
+            'candidate_winner': int(candidate)
+        })
+
+    return {
+        'pairs': num_pairs,
+        'mismatches': len(mismatches),
+        'examples': examples,
+        'hands_per_sec': 2 * num_pairs / candidate_time,
+        'reference_hands_per_sec': 2 * num_pairs / reference_time
+    }
+
+
+@contextmanager
+def numpy_fallback():
+    # Run the jit_kernels entry points on their NumPy fallback
+    enabled = jit_kernels.JIT_AVAILABLE
+    jit_kernels.JIT_AVAILABLE = False
+    try:
+        yield
+    finally:
+        jit_kernels.JIT_AVAILABLE = enabled
+
+
+def reference_ranks(hands, corpus):
+    """
+    Reference ranks of 5- to 7-card hands: the best reference corpus rank over their five-card subsets.
+
+    Returns:
+        tuple: (ranks, HAND_RANKINGS categories) as int64 arrays
+    """
+    categories, ranks = corpus
+    hands = np.asarray(hands, dtype=np.int64)
+    indices = colex_index(np.sort(hands, axis=-1)[..., HAND_SUBSETS[hands.shape[-1]]])
+    return ranks[indices].max(axis=-1).astype(np.int64), categories[indices].max(axis=-1).astype(np.int64)
+
+
+def _reference_river_tally(hand, board, corpus):
+    # Exact (wins, losses, ties) against every dealer holding on a complete board
+    remaining = [card for card in range(52) if card not in set(hand) | set(board)]
+    dealers = np.array(list(itertools.combinations(remaining, 2)), dtype=np.int64)
+    player = reference_ranks(np.array([list(hand) + list(board)]), corpus)[0][0]
+    dealer = reference_ranks(np.concatenate([dealers, np.broadcast_to(board, (len(dealers), 5))], axis=1), corpus)[0]
+    return np.array([(player > dealer).sum(), (player < dealer).sum(), (player == dealer).sum()], dtype=np.int64)
+
+
+def _reference_turn_tally(hand, board, corpus):
+    # Exact (wins, losses, ties) over every river and dealer holding on a four-card board
+    remaining = [card for card in range(52) if card not in set(hand) | set(board)]
+    return sum(_reference_river_tally(hand, list(board) + [river], corpus) for river in remaining)
+
+
+def _random_spots(rng, count, board_size):
+    deals = np.argsort(rng.random((count, 52)), axis=1)
+    return deals[:, :2], deals[:, 2:2 + board_size]
+
+
+def _parity_row(name, cases, fallback_mismatches, reference_mismatches, examples):
+    return {'kernel': name, 'cases': cases, 'fallback_mismatches': fallback_mismatches,
+            'reference_mismatches': reference_mismatches, 'examples': examples}
+
+
+def _check_river_tally(corpus, rng, num_cases):
+    hands, boards = _random_spots(rng, num_cases, 5)
+    compiled = jit_kernels.river_tally_batch(hands, boards)
+    with numpy_fallback():
+        fallback = jit_kernels.river_tally_batch(hands, boards)
+    reference = np.array([_reference_river_tally(hand, board, corpus) for hand, board in zip(hands, boards)])
+    fallback_bad = (compiled != fallback).any(axis=1)
+    reference_bad = (compiled != reference).any(axis=1)
+    examples = [{'hand': hands[k].tolist(), 'board': boards[k].tolist(), 'kernel': compiled[k].tolist(),
+                 'fallback': fallback[k].tolist(), 'reference': reference[k].tolist()}
+                for k in np.flatnonzero(fallback_bad | reference_bad)[:5]]
+    return _parity_row('river_tally_batch', num_cases, int(fallback_bad.sum()), int(reference_bad.sum()), examples)
+
+
+def _tally_off(tally, exact):
+    # A sampled tally further than TALLY_Z_LIMIT standard errors from the exact win or loss rate
+    samples = tally.sum()
+    rates = exact[:2] / exact.sum()
+    errors = np.sqrt(samples * rates * (1 - rates)) + 1
+    return bool((np.abs(tally[:2] - samples * rates) > TALLY_Z_LIMIT * errors).any())
+
+
+def _check_showdown_tally(corpus, rng, num_cases, num_samples=20000):
+    # Sampled: the two paths draw differently, so each is held to the exact reference rates;
+    # batch rows must equal the single-hand tally of the same seed on either path
+    hands, boards = _random_spots(rng, num_cases, 4)
+    seeds = rng.integers(1 << 31, size=num_cases)
+    fallback_bad = reference_bad = 0
+    examples = []
+    for k in range(num_cases):
+        hand = [index_to_card(int(card)) for card in hands[k]]
+        board = [index_to_card(int(card)) for card in boards[k]]
+        exact = _reference_turn_tally(hands[k].tolist(), boards[k].tolist(), corpus)
+        compiled = jit_kernels.showdown_tally(hand, board, num_samples, int(seeds[k]))
+        compiled_row = jit_kernels.showdown_tally_batch(hands[k:k + 1], boards[k:k + 1], num_samples, seeds[k:k + 1])[0]
+        with numpy_fallback():
+            fallback = jit_kernels.showdown_tally(hand, board, num_samples, int(seeds[k]))
+            fallback_row = jit_kernels.showdown_tally_batch(hands[k:k + 1], boards[k:k + 1], num_samples,
+                                                            seeds[k:k + 1])[0]
+        fallback_off = _tally_off(fallback, exact) or (fallback != fallback_row).any()
+        reference_off = _tally_off(compiled, exact) or (compiled != compiled_row).any()
+        fallback_bad += fallback_off
+        reference_bad += reference_off
+        if (fallback_off or reference_off) and len(examples) < 5:
+            examples.append({'hand': hands[k].tolist(), 'board': boards[k].tolist(), 'kernel': compiled.tolist(),
+                             'fallback': fallback.tolist(), 'reference': (exact / exact.sum()).round(4).tolist()})
+    return _parity_row('showdown_tally', num_cases, int(fallback_bad), int(reference_bad), examples)
+
+
+def _check_board_category_counts(corpus, rng, num_cases):
+    # Every C(50, 5) board per hand, so only a few hands
+    hands, _ = _random_spots(rng, num_cases, 0)
+    fallback_bad = reference_bad = 0
+    examples = []
+    for hand in hands.tolist():
+        compiled = jit_kernels.board_category_counts(hand)
+        with numpy_fallback():
+            fallback = jit_kernels.board_category_counts(hand)
+        remaining = np.array([card for card in range(52) if card not in hand], dtype=np.int64)
+        reference = np.zeros(11, dtype=np.int64)
+        for chunk in _chunks(2118760, 1 << 18):
+            boards = remaining[np.array(list(itertools.islice(itertools.combinations(range(50), 5), *chunk)))]
+            cards = np.concatenate([np.broadcast_to(hand, (len(boards), 2)), boards], axis=1)
+            reference += np.bincount(reference_ranks(cards, corpus)[1], minlength=11)
+        fallback_bad += bool((compiled != fallback).any())
+        reference_bad += bool((compiled != reference).any())
+        if ((compiled != fallback).any() or (compiled != reference).any()) and len(examples) < 5:
+            examples.append({'hand': hand, 'kernel': compiled.tolist(), 'fallback': fallback.tolist(),
+                             'reference': reference.tolist()})
+    return _parity_row('board_category_counts', num_cases, fallback_bad, reference_bad, examples)
+
+
+def _check_draw_categories(corpus, rng, num_cases):
+    fallback_bad = reference_bad = 0
+    examples = []
+    for board_size in (3, 4):
+        hands, boards = _random_spots(rng, num_cases, board_size)
+        next_counts, final_counts = jit_kernels.draw_category_batch(hands, boards)
+        with numpy_fallback():
+            fallback_next, fallback_final = jit_kernels.draw_category_batch(hands, boards)
+        for k in range(num_cases):
+            known = hands[k].tolist() + boards[k].tolist()
+            remaining = np.array([card for card in range(52) if card not in known], dtype=np.int64)
+            next_cards = np.concatenate([np.broadcast_to(known, (len(remaining), len(known))), remaining[:, None]], axis=1)
+            reference_next = np.bincount(reference_ranks(next_cards, corpus)[1], minlength=11)
+            if board_size == 4:
+                reference_final = reference_next
+            else:
+                runouts = remaining[np.array(list(itertools.combinations(range(len(remaining)), 2)), dtype=np.intp)]
+                final_cards = np.concatenate([np.broadcast_to(known, (len(runouts), 5)), runouts], axis=1)
+                reference_final = np.bincount(reference_ranks(final_cards, corpus)[1], minlength=11)
+            single_next, single_final = jit_kernels.draw_categories(hands[k], boards[k])
+            single_next = np.bincount(single_next[remaining], minlength=11)
+            fallback_off = (next_counts[k] != fallback_next[k]).any() or (final_counts[k] != fallback_final[k]).any()
+            reference_off = ((next_counts[k] != reference_next).any() or (final_counts[k] != reference_final).any()
+                             or (single_next != reference_next).any() or (single_final != reference_final).any())
+            fallback_bad += bool(fallback_off)
+            reference_bad += bool(reference_off)
+            if (fallback_off or reference_off) and len(examples) < 5:
+                examples.append({'hand': hands[k].tolist(), 'board': boards[k].tolist(),
+                                 'kernel': final_counts[k].tolist(), 'fallback': fallback_final[k].tolist(),
+                                 'reference': reference_final.tolist()})
+    return _parity_row('draw_categories', 2 * num_cases, fallback_bad, reference_bad, examples)
+
+
+# Kernel checks: name -> (check, default cases)
+KERNEL_CHECKS = {
+    'river_tally_batch': (_check_river_tally, 200),
+    'showdown_tally': (_check_showdown_tally, 20),
+    'board_category_counts': (_check_board_category_counts, 2),
+    'draw_categories': (_check_draw_categories, 100)
+}
+
+
+def check_kernel_parity(names=None, corpus=None, seed=0, workers=None, verbose=True):
+    """
+    Compare each jit_kernels entry point with its NumPy fallback and with the reference evaluator.
+
+    Exact kernels must match both exactly on a seeded corpus of spots;
+    the reference counts are built from the reference corpus ranks (the
+    best of each hand's five-card subsets). Sampled tallies draw their
+    cards differently on each path, so both are held to within
+    TALLY_Z_LIMIT standard errors of the exact reference rates. Without
+    Numba both sides run the fallback and only the reference check bites.
+
+    Returns:
+        dict: Kernel name -> case count, fallback and reference mismatches, examples
+    """
+    corpus = corpus if corpus is not None else load_reference_corpus(workers=workers)
+    rng = np.random.default_rng(seed)
+    report = {}
+    for name in names or list(KERNEL_CHECKS):
+        check, num_cases = KERNEL_CHECKS[name]
+        start = time.perf_counter()
+        report[name] = check(corpus, rng, num_cases)
+        if verbose:
+            row = report[name]
+            print(f"{name}: {row['fallback_mismatches']}/{row['cases']} differ from the NumPy fallback, "
+                  f"{row['reference_mismatches']}/{row['cases']} from the reference "
+                  f"({time.perf_counter() - start:.1f}s{'' if jit_kernels.JIT_AVAILABLE else ', no Numba'})")
+            for example in row['examples']:
+                print(f"    {example}")
+    return report
+
+
+def differential_test(names=None, num_pairs=20000, seed=0, workers=None, verbose=True):
+    """
+    Run the five-card and seven-card checks for each candidate.
+
+    Returns:
+        dict: Candidate name -> {'five_card': ..., 'seven_card': ...}
+    """
+    corpus = load_reference_corpus(workers=workers)
+    report = {}
+    for name in names or list(CANDIDATES):
+        report[name] = {
+            'five_card': check_five_card_hands(name, corpus, workers),
+            'seven_card': check_seven_card_pairs(name, num_pairs, seed, workers)
+        }
+        if verbose:
+            five, seven = report[name]['five_card'], report[name]['seven_card']
+            print(f"{name}: 5-card {five['mismatched_hands']} mismatched hands "
+                  f"({five['split_classes']} split, {five['misordered_classes']} misordered classes), "
+                  f"{five['hands_per_sec']:.0f} hands/sec; "
+                  f"7-card {seven['mismatches']}/{seven['pairs']} mismatched showdowns, "
+                  f"{seven['hands_per_sec']:.0f} hands/sec "
+                  f"(reference {seven['reference_hands_per_sec']:.0f} hands/sec)")
+            for example in five['examples'] + seven['examples']:
+                print(f"    {example}")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reference corpus and differential tests for hand evaluators")
+    parser.add_argument('command', choices=['generate', 'test', 'kernels'])
+    parser.add_argument('--candidates', nargs='*', help="Candidates to test (default: all registered)")
+    parser.add_argument('--pairs', type=int, default=20000, help="Random seven-card showdowns per candidate")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.command == 'generate':
+        start = time.perf_counter()
+        categories, ranks = generate_reference_corpus(workers=args.workers)
+        print(f"Reference corpus of {len(ranks)} hands ({int(ranks.max())} rank classes) "
+              f"written to {REFERENCE_CORPUS_FILE} in {time.perf_counter() - start:.1f}s")
+        return 0
+
+    if args.command == 'kernels':
+        report = check_kernel_parity(seed=args.seed, workers=args.workers)
+        return 1 if any(row['fallback_mismatches'] or row['reference_mismatches'] for row in report.values()) else 0
+
+    report = differential_test(args.candidates, args.pairs, args.seed, args.workers)
+    failed = any(result['five_card']['mismatched_hands'] or result['seven_card']['mismatches']
+                 for result in report.values())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
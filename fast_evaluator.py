@@ -0,0 +1,330 @@
+import os
+import itertools
+import numpy as np
+from math import comb
+
+from entire_game import *
+from instrumentation import INSTRUMENTATION
+
+# Cards are indexed 0..51 in unshuffled deck order: index = rank_index * 4 + suit_index
+CARD_INDEX = {card: index for index, card in enumerate(itertools.product(RANKS, SUITS))}
+INDEX_CARD = list(itertools.product(RANKS, SUITS))
+
+# Strength keys are category << 20 followed by five 4-bit card values (2..14)
+CATEGORY_SHIFT = 20
+HAND_NAMES = {score: name for name, score in PokerHandEvaluator.HAND_RANKINGS.items()}
+
+NUM_FIVE_CARD_HANDS = comb(52, 5)
+TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tables')
+FIVE_CARD_TABLE_FILE = os.path.join(TABLE_DIR, 'five_card_ranks.npz')
+
+# Colex binomials: the index of a sorted 5-card hand c0 < ... < c4 is sum(C(c_i, i + 1))
+COLEX_BINOMIALS = np.array([[comb(card, k) for k in range(1, 6)] for card in range(52)], dtype=np.int64)
+
+# The 21 ways of picking five of seven cards
+SEVEN_CARD_SUBSETS = np.array(list(itertools.combinations(range(7), 5)), dtype=np.intp)
+
+
+def _build_straight_tops():
+    # Top card value of the best straight contained in a 13-bit rank mask, 0 if none
+    tops = [0] * (1 << 13)
+    windows = [(top, 0b11111 << (top - 6)) for top in range(14, 5, -1)]
+    wheel = (1 << 12) | 0b1111
+    for mask in range(1 << 13):
+        for top, window in windows:
+            if mask & window == window:
+                tops[mask] = top
+                break
+        else:
+            if mask & wheel == wheel:
+                tops[mask] = 5
+    return tops
+
+
+STRAIGHT_TOP = _build_straight_tops()
+BIT_COUNT = [bin(mask).count('1') for mask in range(1 << 13)]
+
+
+def card_to_index(card):
+    return CARD_INDEX[card]
+
+
+def cards_to_indices(cards):
+    return [CARD_INDEX[card] for card in cards]
+
+
+def index_to_card(index):
+    return INDEX_CARD[index]
+
+
+def strength_key(category, values):
+    key = category
+    for value in values:
+        key = (key << 4) | value
+    return key
+
+
+def hand_strength(cards):
+    """
+    Strength of the best five-card hand among 5 to 7 cards.
+
+    Keys order hands exactly like PokerHandEvaluator.evaluate_hand followed
+    by evaluate_equal_rank_hands: a larger key is a better hand and equal
+    keys are ties. key >> CATEGORY_SHIFT is the HAND_RANKINGS score.
+
+    Args:
+        cards (iterable): Card indices (see card_to_index)
+
+    Returns:
+        int: Strength key
+    """
+    rank_counts = [0] * 13
+    suit_masks = [0, 0, 0, 0]
+    for card in cards:
+        rank_counts[card >> 2] += 1
+        suit_masks[card & 3] |= 1 << (card >> 2)
+
+    # Neither quads nor a full house fit in seven cards next to a flush
+    for mask in suit_masks:
+        if BIT_COUNT[mask] >= 5:
+            top = STRAIGHT_TOP[mask]
+            if top == 14:
+                return strength_key(10, (0, 0, 0, 0, 0))
+            if top:
+                return strength_key(9, (top, 0, 0, 0, 0))
+            flush_values = [rank + 2 for rank in range(12, -1, -1) if mask >> rank & 1]
+            return strength_key(6, flush_values[:5])
+
+    quads, trips, pairs, singles = [], [], [], []
+    for rank in range(12, -1, -1):
+        count = rank_counts[rank]
+        if count == 4:
+            quads.append(rank + 2)
+        elif count == 3:
+            trips.append(rank + 2)
+        elif count == 2:
+            pairs.append(rank + 2)
+        elif count == 1:
+            singles.append(rank + 2)
+
+    if quads:
+        quad = quads[0]
+        return strength_key(8, (quad, quad, quad, quad, max(quads[1:] + trips + pairs + singles)))
+
+    if trips and (len(trips) > 1 or pairs):
+        triple = trips[0]
+        pair = max(trips[1:] + pairs)
+        return strength_key(7, (triple, triple, triple, pair, pair))
+
+    top = STRAIGHT_TOP[suit_masks[0] | suit_masks[1] | suit_masks[2] | suit_masks[3]]
+    if top:
+        return strength_key(5, (top, 0, 0, 0, 0))
+
+    if trips:
+        triple = trips[0]
+        return strength_key(4, (triple, triple, triple, singles[0], singles[1]))
+
+    if len(pairs) >= 2:
+        high, low = pairs[0], pairs[1]
+        return strength_key(3, (high, high, low, low, max(pairs[2:] + singles)))
+
+    if pairs:
+        pair = pairs[0]
+        return strength_key(2, (pair, pair, singles[0], singles[1], singles[2]))
+
+    return strength_key(1, singles[:5])
+
+
+def hand_category(strength):
+    return strength >> CATEGORY_SHIFT
+
+
+class FastHandEvaluator:
+    """
+    Integer-based evaluator that ranks hands like PokerHandEvaluator.
+
+    Cards are the usual (rank, suit) tuples; they are converted to card
+    indices and scored with hand_strength.
+    """
+
+    def evaluate(self, hole_cards, community_cards):
+        """
+        Evaluate a hand.
+
+        Returns:
+            tuple: (HAND_RANKINGS score, hand name, strength key)
+        """
+        strength = hand_strength(cards_to_indices(list(hole_cards) + list(community_cards)))
+        category = strength >> CATEGORY_SHIFT
+        return category, HAND_NAMES[category], strength
+
+    def compare(self, player1_cards, player2_cards, community_cards):
+        """
+        Compare two hands on the same board.
+
+        Returns:
+            int: 1 if player 1 wins, 2 if player 2 wins, 3 for a tie (like determine_winner)
+        """
+        board = cards_to_indices(community_cards)
+        strength_1 = hand_strength(cards_to_indices(player1_cards) + board)
+        strength_2 = hand_strength(cards_to_indices(player2_cards) + board)
+        if strength_1 > strength_2:
+            return 1
+        if strength_2 > strength_1:
+            return 2
+        return 3
+
+
+def five_card_strength_array(hands):
+    """
+    Vectorized hand_strength for five-card hands.
+
+    Hands may repeat a card (multi-deck shoes): five of a kind scores as
+    quads and a flush holding a pair keeps its flush tiebreak.
+
+    Args:
+        hands (np.ndarray): Card indices of shape (N, 5)
+
+    Returns:
+        np.ndarray: int64 strength keys of shape (N,)
+    """
+    hands = np.asarray(hands, dtype=np.int64)
+    values = np.sort(hands >> 2, axis=1)[:, ::-1] + 2
+    suits = hands & 3
+
+    is_flush = (suits == suits[:, :1]).all(axis=1)
+    distinct = (np.diff(values, axis=1) != 0).all(axis=1)
+    is_wheel = distinct & (values[:, 0] == 14) & (values[:, 1] == 5)
+    is_straight = distinct & ((values[:, 0] - values[:, 4] == 4) | is_wheel)
+    straight_top = np.where(is_wheel, 5, values[:, 0])
+
+    # Order the cards by (multiplicity, value) so grouped ranks come first
+    counts = (values[:, :, None] == values[:, None, :]).sum(axis=2)
+    order = np.argsort(-(counts * 16 + values), axis=1, kind='stable')
+    grouped = np.take_along_axis(values, order, axis=1)
+    max_count = counts.max(axis=1)
+    paired_cards = (counts == 2).sum(axis=1)
+
+    category = np.ones(len(hands), dtype=np.int64)
+    category[paired_cards == 2] = 2
+    category[paired_cards == 4] = 3
+    category[(max_count == 3) & (paired_cards == 0)] = 4
+    category[is_straight] = 5
+    category[is_flush] = 6
+    category[(max_count == 3) & (paired_cards == 2)] = 7
+    category[max_count >= 4] = 8
+    category[is_straight & is_flush] = 9
+    category[is_straight & is_flush & (straight_top == 14)] = 10
+
+    tiebreak = grouped.copy()
+    straights = is_straight & (category != 10)
+    tiebreak[straights] = 0
+    tiebreak[straights, 0] = straight_top[straights]
+    tiebreak[category == 10] = 0
+    tiebreak[category == 6] = values[category == 6]
+
+    keys = category
+    for column in range(5):
+        keys = (keys << 4) | tiebreak[:, column]
+    return keys
+
+
+def all_five_card_hands():
+    """
+    Every five-card hand as sorted card indices, in colex order.
+
+    Returns:
+        np.ndarray: uint8 array of shape (2598960, 5)
+    """
+    hands = np.fromiter(itertools.chain.from_iterable(itertools.combinations(range(52), 5)),
+                        dtype=np.uint8, count=NUM_FIVE_CARD_HANDS * 5).reshape(-1, 5)
+    hands[colex_index(hands)] = hands.copy()
+    return hands
+
+
+def colex_index(sorted_hands):
+    """
+    Colex index of sorted five-card hands (card indices ascending along axis -1).
+    """
+    sorted_hands = np.asarray(sorted_hands, dtype=np.intp)
+    return (COLEX_BINOMIALS[sorted_hands[..., 0], 0] + COLEX_BINOMIALS[sorted_hands[..., 1], 1] +
+            COLEX_BINOMIALS[sorted_hands[..., 2], 2] + COLEX_BINOMIALS[sorted_hands[..., 3], 3] +
+            COLEX_BINOMIALS[sorted_hands[..., 4], 4])
+
+
+def build_five_card_table():
+    """
+    Rank every five-card hand with five_card_strength_array.
+
+    Returns:
+        tuple: (ranks, categories) indexed by colex index. ranks are uint16
+        relative ranks, 1 for the weakest hand class and 7462 for a royal
+        flush; categories are the uint8 HAND_RANKINGS scores.
+    """
+    keys = five_card_strength_array(all_five_card_hands())
+    _, ranks = np.unique(keys, return_inverse=True)
+    return (ranks + 1).astype(np.uint16), (keys >> CATEGORY_SHIFT).astype(np.uint8)
+
+
+_five_card_table = None
+
+
+def load_five_card_table(path=FIVE_CARD_TABLE_FILE):
+    """
+    Load the five-card rank table, building and caching it on first use.
+
+    Returns:
+        tuple: (ranks, categories), see build_five_card_table
+    """
+    global _five_card_table
+    if _five_card_table is not None:
+        INSTRUMENTATION.cache_hit('five_card_table')
+    else:
+        INSTRUMENTATION.cache_miss('five_card_table')
+        if os.path.exists(path):
+            with np.load(path) as table:
+                _five_card_table = (table['ranks'], table['categories'])
+        else:
+            _five_card_table = build_five_card_table()
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            np.savez_compressed(path, ranks=_five_card_table[0], categories=_five_card_table[1])
+    return _five_card_table
+
+
+def seven_card_rank_array(hands, return_category=False):
+    """
+    Vectorized rank of the best five of seven cards via the five-card table.
+
+    Ranks are the relative ranks of build_five_card_table, so they compare
+    like strength keys but fit in 16 bits.
+
+    Args:
+        hands (np.ndarray): Card indices of shape (..., 7)
+        return_category (bool): Also return the HAND_RANKINGS scores
+
+    Returns:
+        np.ndarray: Ranks of shape (...,) (and categories if requested)
+    """
+    ranks, categories = load_five_card_table()
+    hands = np.sort(np.asarray(hands, dtype=np.intp), axis=-1)
+    subsets = hands[..., SEVEN_CARD_SUBSETS]
+    best = ranks[colex_index(subsets)].max(axis=-1)
+    if return_category:
+        return best, category_of_rank(best)
+    return best
+
+
+_rank_categories = None
+
+
+def category_of_rank(hand_ranks):
+    """
+    HAND_RANKINGS score of relative ranks from the five-card table.
+    """
+    global _rank_categories
+    if _rank_categories is None:
+        ranks, categories = load_five_card_table()
+        lookup = np.zeros(int(ranks.max()) + 1, dtype=np.uint8)
+        lookup[ranks] = categories
+        _rank_categories = lookup
+    return _rank_categories[hand_ranks]
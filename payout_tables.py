@@ -0,0 +1,188 @@
+import csv
+import sys
+import time
+import numpy as np
+from math import comb
+from concurrent.futures import ProcessPoolExecutor
+
+from entire_game import *
+from casino_poker import CasinoPokerGame
+from fast_evaluator import INDEX_CARD, cards_to_indices
+from range_equity import COMBOS, COMBO_INDEX_ARRAY
+from strategy_solver import BLIND_MULTIPLIERS
+from shared_tables import TableRegistry, publish_rank_table, attach_worker_tables
+import jit_kernels
+
+CATEGORY_TABLE_FILE = 'hole_class_categories.csv'
+
+# Boards completing any two hole cards
+NUM_BOARDS = comb(50, 5)
+
+# Trips payout multiplier of each HAND_RANKINGS score (-1 loses the bet), from resolve_round's paytable
+TRIP_MULTIPLIERS = np.array([0.0] + [CasinoPokerGame().get_trip_multiplier(score) for score in range(1, 11)])
+
+# CSV columns of the category counts, in HAND_RANKINGS order from score 1
+CATEGORY_COLUMNS = [name.replace(' ', '_') for name, _ in sorted(PokerHandEvaluator.HAND_RANKINGS.items(),
+                                                                 key=lambda item: item[1])]
+
+
+def hole_classes():
+    """
+    The 169 hole card classes with one representative hand each.
+
+    Returns:
+        list: (first rank, second rank, 'Pair' / 'Suited' / 'Unsuited', two (rank, suit) cards),
+            higher rank first as in poker_hand_statistics.csv
+    """
+    classes = []
+    for high in reversed(RANKS):
+        classes.append((high, high, 'Pair', [(high, SUITS[0]), (high, SUITS[1])]))
+    for hand_type, second_suit in (('Suited', SUITS[0]), ('Unsuited', SUITS[1])):
+        for i, high in reversed(list(enumerate(RANKS))):
+            for low in reversed(RANKS[:i]):
+                classes.append((high, low, hand_type, [(high, SUITS[0]), (low, second_suit)]))
+    return classes
+
+
+def _class_key(first, second, hand_type):
+    # Row key independent of card order
+    return (max(first, second, key=RANKS.index), min(first, second, key=RANKS.index), hand_type)
+
+
+def _combo_key(combo):
+    (rank1, suit1), (rank2, suit2) = [INDEX_CARD[int(card)] for card in combo]
+    if rank1 == rank2:
+        hand_type = 'Pair'
+    else:
+        hand_type = 'Suited' if suit1 == suit2 else 'Unsuited'
+    return _class_key(rank1, rank2, hand_type)
+
+
+def build_category_counts(workers=None):
+    """
+    Enumerate every board for one hand of each class, classes in parallel.
+
+    Suit relabelling does not change category counts, so one representative
+    per class is exact for every hand in it.
+
+    Returns:
+        np.ndarray: (169, 11) board counts per class (rows in hole_classes() order)
+    """
+    hands = [cards_to_indices(cards) for *_, cards in hole_classes()]
+    # Workers map one shared copy of the rank table (used by the NumPy fallback)
+    with TableRegistry() as registry:
+        publish_rank_table(registry)
+        with ProcessPoolExecutor(max_workers=workers, initializer=attach_worker_tables,
+                                 initargs=(registry.directory,)) as executor:
+            return np.array(list(executor.map(jit_kernels.board_category_counts, hands)))
+
+
+class CategoryTable:
+    """
+    Exact final-category probabilities of each of the 169 hole card classes.
+
+    Queries take the player's two cards and cost one array lookup: every
+    one of the 1326 combos is mapped to its class row up front.
+    """
+
+    def __init__(self, counts):
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.probabilities_by_class = self.counts / self.counts.sum(axis=1, keepdims=True)
+        rows = {_class_key(first, second, hand_type): row for row, (first, second, hand_type, _) in enumerate(hole_classes())}
+        self.combo_rows = np.array([rows[_combo_key(combo)] for combo in COMBOS])
+
+    @classmethod
+    def build(cls, workers=None):
+        return cls(build_category_counts(workers))
+
+    @classmethod
+    def load(cls, path=CATEGORY_TABLE_FILE):
+        rows = {}
+        with open(path, newline='') as file:
+            for row in csv.DictReader(file):
+                # Tens are written as T, like poker_hand_statistics.csv
+                first, second = ('10' if card == 'T' else card for card in (row['First_Card'], row['Second_Card']))
+                rows[_class_key(first, second, row['Hand_Type'])] = [0] + [int(row[column]) for column in CATEGORY_COLUMNS]
+        return cls([rows[_class_key(first, second, hand_type)] for first, second, hand_type, _ in hole_classes()])
+
+    def save(self, path=CATEGORY_TABLE_FILE):
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['First_Card', 'Second_Card', 'Hand_Type'] + CATEGORY_COLUMNS)
+            for (first, second, hand_type, _), counts in zip(hole_classes(), self.counts):
+                writer.writerow(['T' if first == '10' else first, 'T' if second == '10' else second, hand_type]
+                                + [int(count) for count in counts[1:]])
+
+    def _row(self, hole_cards):
+        first, second = cards_to_indices(hole_cards)
+        return self.combo_rows[COMBO_INDEX_ARRAY[first, second]]
+
+    def probabilities(self, hole_cards):
+        """
+        Args:
+            hole_cards (list): Two (rank, suit) cards
+
+        Returns:
+            np.ndarray: Probability of each final HAND_RANKINGS score (index 0 unused)
+        """
+        return self.probabilities_by_class[self._row(hole_cards)]
+
+    def trips_ev(self, hole_cards):
+        """
+        Expected net result of a trips bet of 1: the trips paytable only depends on the final category.
+        """
+        return float(self.probabilities(hole_cards) @ TRIP_MULTIPLIERS)
+
+    def expected_blind_multiplier(self, hole_cards):
+        """
+        Expected blind paytable multiplier of the final hand over every board.
+
+        This is unconditional: the blind only pays it when the player wins,
+        and the value given a win needs the dealer's hand distribution too.
+        """
+        return float(self.probabilities(hole_cards) @ BLIND_MULTIPLIERS)
+
+    def payout_distribution(self, hole_cards, bet='trips'):
+        """
+        Returns:
+            dict: Probability of each payout multiplier of the 'trips' or 'blind' paytable
+        """
+        multipliers = TRIP_MULTIPLIERS if bet == 'trips' else BLIND_MULTIPLIERS
+        distribution = {}
+        for score, probability in enumerate(self.probabilities(hole_cards)[1:], start=1):
+            multiplier = float(multipliers[score])
+            distribution[multiplier] = distribution.get(multiplier, 0.0) + float(probability)
+        return distribution
+
+    def class_summary(self):
+        """
+        Returns:
+            list: Per class (first rank, second rank, hand type, trips EV, expected blind multiplier)
+        """
+        return [(first, second, hand_type, float(probabilities @ TRIP_MULTIPLIERS),
+                 float(probabilities @ BLIND_MULTIPLIERS))
+                for (first, second, hand_type, _), probabilities in zip(hole_classes(), self.probabilities_by_class)]
+
+
+_category_table = None
+
+
+def get_category_table(path=CATEGORY_TABLE_FILE):
+    """
+    The shipped CategoryTable, loaded once.
+    """
+    global _category_table
+    if _category_table is None:
+        _category_table = CategoryTable.load(path)
+    return _category_table
+
+
+if __name__ == "__main__":
+    # python payout_tables.py [workers]: rebuild hole_class_categories.csv and print the summary
+    started = time.perf_counter()
+    table = CategoryTable.build(int(sys.argv[1]) if len(sys.argv) > 1 else None)
+    assert (table.counts.sum(axis=1) == NUM_BOARDS).all()
+    table.save()
+    print(f"Enumerated {len(table.counts)} classes x {NUM_BOARDS} boards in {time.perf_counter() - started:.1f} s")
+    for first, second, hand_type, trips, blind in table.class_summary():
+        print(f"{first:>2}{second:>2} {hand_type:8s} trips EV {trips:+.4f}  expected blind multiplier {blind:.4f}")
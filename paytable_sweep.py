@@ -0,0 +1,169 @@
+import os
+import time
+import argparse
+import numpy as np
+
+from casino_poker import CasinoPokerGame
+from fast_evaluator import TABLE_DIR
+from deal_corpus import DealCorpus
+from strategy_ab import deal_hands, showdown
+from strategies import HandBatch, ThresholdStrategy, batch_play_bets
+
+OUTCOME_CORPUS_FILE = os.path.join(TABLE_DIR, 'outcome_corpus.npz')
+
+# Winner codes of resolve_round
+PLAYER_WINS = 1
+DEALER_WINS = 2
+TIE = 3
+
+
+class Paytable:
+    """
+    Payout rules of resolve_round as arrays indexed by HAND_RANKINGS score.
+
+    Args:
+        trips (dict): Trips multiplier per score; -1 loses the bet (default: get_trip_multiplier)
+        blind (dict): Blind multiplier per score when the player wins (default: get_blind_multiplier)
+        dealer_qualifier (int): Lowest dealer score for which a winning ante is paid; below it the ante pushes
+        name (str): Label in reports
+    """
+
+    def __init__(self, trips=None, blind=None, dealer_qualifier=2, name='standard'):
+        game = CasinoPokerGame()
+        trips = trips or {score: game.get_trip_multiplier(score) for score in range(1, 11)}
+        blind = blind or {score: game.get_blind_multiplier(score) for score in range(1, 11)}
+        self.trips = np.array([0.0] + [trips[score] for score in range(1, 11)])
+        self.blind = np.array([0.0] + [blind[score] for score in range(1, 11)])
+        self.dealer_qualifier = dealer_qualifier
+        self.name = name
+
+    def with_changes(self, name, trips=None, blind=None, dealer_qualifier=None):
+        """
+        Copy of this paytable with some multipliers (or the qualifier) replaced.
+        """
+        table = Paytable(dict(enumerate(self.trips)), dict(enumerate(self.blind)),
+                         self.dealer_qualifier if dealer_qualifier is None else dealer_qualifier, name)
+        for score, multiplier in (trips or {}).items():
+            table.trips[score] = multiplier
+        for score, multiplier in (blind or {}).items():
+            table.blind[score] = multiplier
+        return table
+
+
+def build_outcome_corpus(num_hands=100000, strategy=None, seed=None, flop_samples=1000, path=OUTCOME_CORPUS_FILE,
+                         deals=None):
+    """
+    Deal and play a corpus once, keeping only what the payouts depend on.
+
+    Decisions come from a batch strategy (the bot's thresholds by default),
+    so repricing holds the player's actions fixed. deals (an (N, 9) array,
+    e.g. a DealCorpus slice) replaces the num_hands fresh deals.
+
+    Returns:
+        dict: uint8 arrays 'player_category', 'dealer_category', 'winner' and 'play_bet' (0 for a fold)
+    """
+    strategy = strategy or ThresholdStrategy()
+    rng = np.random.default_rng(seed)
+    if deals is None:
+        deals = deal_hands(num_hands, rng)
+    player_ranks, dealer_ranks, player_categories, dealer_categories = showdown(deals)
+    batch = HandBatch(deals[:, :2], deals[:, 4:9], flop_samples, int(rng.integers(1 << 31)))
+    corpus = {
+        'player_category': player_categories.astype(np.uint8),
+        'dealer_category': dealer_categories.astype(np.uint8),
+        'winner': np.where(player_ranks > dealer_ranks, PLAYER_WINS,
+                           np.where(player_ranks < dealer_ranks, DEALER_WINS, TIE)).astype(np.uint8),
+        'play_bet': batch_play_bets(strategy, batch).astype(np.uint8)
+    }
+    if path:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez_compressed(path, **corpus)
+    return corpus
+
+
+def load_outcome_corpus(path=OUTCOME_CORPUS_FILE):
+    with np.load(path) as stored:
+        return {name: stored[name] for name in stored.files}
+
+
+def price(corpus, paytable, trip_bet=1.0):
+    """
+    Net results of every corpus hand under one paytable, following resolve_round.
+
+    Args:
+        corpus (dict): build_outcome_corpus arrays
+        paytable (Paytable): Payout rules
+        trip_bet (float): Trips bet in antes (0 for none)
+
+    Returns:
+        tuple: (main game net, trips net) arrays in antes
+    """
+    player = corpus['player_category']
+    winner = corpus['winner']
+    play_bet = corpus['play_bet'].astype(np.float64)
+    win = play_bet + paytable.blind[player] + (corpus['dealer_category'] >= paytable.dealer_qualifier)
+    net = np.where(winner == PLAYER_WINS, win, np.where(winner == DEALER_WINS, -(2 + play_bet), 0.0))
+    net = np.where(play_bet == 0, -2.0, net)
+    # resolve_round forfeits the trips bet on a fold
+    trips = np.where(play_bet == 0, -trip_bet, trip_bet * paytable.trips[player])
+    return net, trips
+
+
+def sweep(corpus, paytables, trip_bet=1.0):
+    """
+    Reprice the corpus under each paytable.
+
+    Returns:
+        list: Per paytable 'Paytable', 'EV' and 'Variance' of the main game and of the trips
+            bet (per hand, in antes), and 'Seconds' spent pricing
+    """
+    rows = []
+    for paytable in paytables:
+        started = time.perf_counter()
+        net, trips = price(corpus, paytable, trip_bet)
+        rows.append({
+            'Paytable': paytable.name,
+            'EV': float(net.mean()),
+            'Variance': float(net.var()),
+            'Trips EV': float(trips.mean()),
+            'Trips Variance': float(trips.var()),
+            'Seconds': time.perf_counter() - started
+        })
+    return rows
+
+
+def example_paytables():
+    # Common alternatives to the table in casino_poker.py
+    standard = Paytable()
+    return [
+        standard,
+        standard.with_changes('blind flush 1:1', blind={6: 1}),
+        standard.with_changes('blind straight push', blind={5: 0}),
+        standard.with_changes('trips full house 7:1', trips={7: 7}),
+        standard.with_changes('trips straight 5:1', trips={5: 5}),
+        standard.with_changes('dealer always qualifies', dealer_qualifier=1)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reprice a stored outcome corpus under alternative paytables")
+    parser.add_argument('--hands', type=int, default=100000, help="Corpus size when building")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--rebuild', action='store_true', help="Simulate a new corpus even if one is stored")
+    parser.add_argument('--deals', help="Play the first --hands deals of a deal_corpus.py file")
+    args = parser.parse_args(argv)
+
+    if args.rebuild or not os.path.exists(OUTCOME_CORPUS_FILE):
+        started = time.perf_counter()
+        deals = DealCorpus(args.deals).slice(0, args.hands) if args.deals else None
+        corpus = build_outcome_corpus(args.hands, seed=args.seed, deals=deals)
+        print(f"Simulated {args.hands} hands in {time.perf_counter() - started:.1f} s -> {OUTCOME_CORPUS_FILE}")
+    else:
+        corpus = load_outcome_corpus()
+    for row in sweep(corpus, example_paytables()):
+        print(f"{row['Paytable']:26s} EV {row['EV']:+.4f} (var {row['Variance']:.2f})  "
+              f"trips EV {row['Trips EV']:+.4f} (var {row['Trips Variance']:.2f})  {row['Seconds'] * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
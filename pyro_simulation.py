@@ -2,9 +2,18 @@ import torch
 import pyro
 import pyro.distributions as dist
 import numpy as np
+import random
+import itertools
+import math
+from statistics import NormalDist
 from entire_game import *
+from board_cache import get_board_ranks, distinct_cards
+from fast_evaluator import cards_to_indices, colex_index, load_five_card_table, SEVEN_CARD_SUBSETS
 import csv
 
+# The five-card subsets of hole cards + board that use at least one hole card (board first, then the two hole cards)
+HOLE_CARD_SUBSETS = np.array([subset for subset in SEVEN_CARD_SUBSETS if subset.max() >= 5], dtype=np.intp)
+
 class PyroPokerSimulation:
     def __init__(self, game):
         """
@@ -16,6 +25,7 @@ class PyroPokerSimulation:
         self.game = game
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
 
+    @INSTRUMENTATION.timed('monte_carlo.poker_hands_1v1')
     def simulate_poker_hands_1v1(self, player1_hand, player2_hand, num_simulations=10000):
         """
         Simulate poker hands with fixed player hands and random community cards using Pyro.
@@ -65,6 +75,7 @@ class PyroPokerSimulation:
             
             return total_results / num_simulations
 
+        INSTRUMENTATION.count('monte_carlo.trials', num_simulations)
         # Run the simulation
         with pyro.plate('simulation', num_simulations):
             win_percentages = poker_simulation_model(player1_hand, player2_hand)
@@ -76,7 +87,9 @@ class PyroPokerSimulation:
             'Tie': round(win_percentages[2].item() * 100, 2)
         }
 
-    def simulate_pre_flop(self, player_cards, num_opponent_draws=100, num_community_draws=100):
+    @INSTRUMENTATION.timed('monte_carlo.pre_flop')
+    def simulate_pre_flop(self, player_cards, num_opponent_draws=100, num_community_draws=100,
+                          variance_reduction=None, seed=None):
         """
         Simulate pre-flop scenarios with Pyro sampling.
         
@@ -84,10 +97,17 @@ class PyroPokerSimulation:
             player_cards (list): Player's initial hand
             num_opponent_draws (int): Number of opponent hand draws
             num_community_draws (int): Number of community card draws
+            variance_reduction (str): None for plain sampling, 'stratified' or 'antithetic'
+            seed (int): Seed for the variance-reduced samplers
         
         Returns:
-            dict: Win percentages for the player
+            dict: Win percentages for the player (plus standard errors when
+            variance_reduction is set)
         """
+        if variance_reduction is not None:
+            return self._simulate_variance_reduced(player_cards, [], num_opponent_draws,
+                                                   num_community_draws, variance_reduction, seed)
+
         def pre_flop_model(player_cards):
             # Track wins and outcomes
             total_results = torch.zeros(3, device=self.device)
@@ -143,6 +163,7 @@ class PyroPokerSimulation:
             
             return total_results / (num_opponent_draws * num_community_draws)
 
+        INSTRUMENTATION.count('monte_carlo.trials', num_opponent_draws * num_community_draws)
         # Run the simulation
         with pyro.plate('simulation', num_opponent_draws * num_community_draws):
             win_percentages = pre_flop_model(player_cards)
@@ -154,7 +175,9 @@ class PyroPokerSimulation:
             'Tie': round(win_percentages[2].item() * 100, 2)
         }
 
-    def simulate_scenario_1(self, player_cards, flop, num_opponent_draws=100, num_turn_river_draws=100):
+    @INSTRUMENTATION.timed('monte_carlo.scenario_1')
+    def simulate_scenario_1(self, player_cards, flop, num_opponent_draws=100, num_turn_river_draws=100,
+                            variance_reduction=None, seed=None):
         """
         Simulate scenario with fixed player cards and flop using Pyro.
         
@@ -163,10 +186,17 @@ class PyroPokerSimulation:
             flop (list): Community flop cards
             num_opponent_draws (int): Number of opponent hand draws
             num_turn_river_draws (int): Number of turn and river card draws
+            variance_reduction (str): None for plain sampling, 'stratified' or 'antithetic'
+            seed (int): Seed for the variance-reduced samplers
         
         Returns:
-            dict: Win percentages for the player
+            dict: Win percentages for the player (plus standard errors when
+            variance_reduction is set)
         """
+        if variance_reduction is not None:
+            return self._simulate_variance_reduced(player_cards, flop, num_opponent_draws,
+                                                   num_turn_river_draws, variance_reduction, seed)
+
         def scenario_1_model(player_cards, flop):
             # Track wins and outcomes
             total_results = torch.zeros(3, device=self.device)
@@ -218,6 +248,7 @@ class PyroPokerSimulation:
             
             return total_results / (num_opponent_draws * num_turn_river_draws)
 
+        INSTRUMENTATION.count('monte_carlo.trials', num_opponent_draws * num_turn_river_draws)
         # Run the simulation
         with pyro.plate('simulation', num_opponent_draws * num_turn_river_draws):
             win_percentages = scenario_1_model(player_cards, flop)
@@ -229,6 +260,7 @@ class PyroPokerSimulation:
             'Tie': round(win_percentages[2].item() * 100, 2)
         }
 
+    @INSTRUMENTATION.timed('monte_carlo.scenario_2')
     def simulate_scenario_2(self, player_cards, flop, turn, num_opponent_draws=100, num_river_draws=100):
         """
         Simulate scenario with fixed player cards, flop, and turn using Pyro.
@@ -291,6 +323,7 @@ class PyroPokerSimulation:
             
             return total_results / (num_opponent_draws * num_river_draws)
 
+        INSTRUMENTATION.count('monte_carlo.trials', num_opponent_draws * num_river_draws)
         # Run the simulation
         with pyro.plate('simulation', num_opponent_draws * num_river_draws):
             win_percentages = scenario_2_model(player_cards, flop, turn)
@@ -302,7 +335,8 @@ class PyroPokerSimulation:
             'Tie': round(win_percentages[2].item() * 100, 2)
         }
 
-    def simulate_scenario_3(self, player_cards, community_cards, num_opponent_draws=100):
+    @INSTRUMENTATION.timed('monte_carlo.scenario_3')
+    def simulate_scenario_3(self, player_cards, community_cards, num_opponent_draws=100, exact=False):
         """
         Simulate scenario with all community cards fixed using Pyro.
         
@@ -310,10 +344,16 @@ class PyroPokerSimulation:
             player_cards (list): Player's initial hand
             community_cards (list): All community cards
             num_opponent_draws (int): Number of opponent hand draws
+            exact (bool): Count every dealer holding from the cached board ranks
+                (board_cache.get_board_ranks) instead of sampling; repeated cards from
+                a multi-deck shoe are still sampled with the evaluator
         
         Returns:
             dict: Win percentages for the player
         """
+        if exact and distinct_cards(cards_to_indices(list(player_cards) + list(community_cards))):
+            return get_board_ranks(community_cards).equity(player_cards)
+
         def scenario_3_model(player_cards, community_cards):
             # Track wins and outcomes
             total_results = torch.zeros(3, device=self.device)
@@ -348,6 +388,7 @@ class PyroPokerSimulation:
             
             return total_results / num_opponent_draws
 
+        INSTRUMENTATION.count('monte_carlo.trials', num_opponent_draws)
         # Run the simulation
         with pyro.plate('simulation', num_opponent_draws):
             win_percentages = scenario_3_model(player_cards, community_cards)
@@ -358,6 +399,298 @@ class PyroPokerSimulation:
             'Player 2 Win': round(win_percentages[1].item() * 100, 2),
             'Tie': round(win_percentages[2].item() * 100, 2)
         }
+
+    def compare_hands(self, hands, board=None, num_trials=1000, common_random_numbers=True, seed=None):
+        """
+        Estimate the win rates of several hands against a random opponent.
+
+        With common random numbers every hand faces the same shuffled deck:
+        each trial shuffles the unseen cards once and every hand deals its
+        opponent and runout from that permutation, skipping its own cards.
+        Each hand still sees a uniformly random deal, but the deals are
+        strongly correlated, so the paired differences have a much smaller
+        standard error than two independent runs.
+
+        Args:
+            hands (list): Hands (lists of two cards) to compare
+            board (list): Known community cards (empty, flop or flop and turn)
+            num_trials (int): Number of shared deals
+            common_random_numbers (bool): Share the deals between hands
+            seed (int): Seed of the sampler
+
+        Returns:
+            dict: 'Hands' with one result per hand and 'Differences' with the
+            paired difference of each hand against the first one
+        """
+        board = list(board or [])
+        rng = random.Random(seed)
+        num_community = 5 - len(board)
+        unseen = [card for card in itertools.product(RANKS, SUITS) if card not in set(board)]
+
+        # outcomes[trial, hand] is 0 (win), 1 (loss) or 2 (tie)
+        outcomes = np.zeros((num_trials, len(hands)), dtype=np.int8)
+        for trial in range(num_trials):
+            if common_random_numbers:
+                rng.shuffle(unseen)
+            for h, hand in enumerate(hands):
+                if not common_random_numbers:
+                    rng.shuffle(unseen)
+                hand_cards = set(hand)
+                dealt = [card for card in unseen if card not in hand_cards][:2 + num_community]
+                outcomes[trial, h] = self._showdown_outcome(hand, dealt[:2], board + dealt[2:])
+
+        indicators = np.stack([outcomes == k for k in range(3)], axis=2).astype(np.float64)
+        hand_results = [self._format_estimate(indicators[:, h, :]) for h in range(len(hands))]
+        differences = []
+        for h in range(1, len(hands)):
+            paired = indicators[:, h, :] - indicators[:, 0, :]
+            differences.append(self._format_estimate(paired, suffix=' Diff'))
+
+        return {'Hands': hand_results, 'Differences': differences}
+
+    @INSTRUMENTATION.timed('monte_carlo.multiway')
+    def simulate_multiway(self, player_cards, num_opponents, board=None, num_trials=10000, seed=None):
+        """
+        Estimate the player's results against several random opponents.
+
+        Each trial samples the opponents' hole cards and the runout once. The
+        board's own five-card rank is computed once per trial; every player
+        then only adds the 20 five-card subsets that use a hole card, and all
+        players of all trials are ranked in one vectorized pass.
+
+        Args:
+            player_cards (list): Player's two cards
+            num_opponents (int): Opponents, each dealt two random cards
+            board (list): Known community cards (empty, flop or flop and turn)
+            num_trials (int): Sampled deals
+            seed (int): Seed of the sampler
+
+        Returns:
+            dict: 'Player 1 Win' (outright), 'Player 2 Win' (an opponent is
+            ahead), 'Tie' (shared best hand) with standard errors, 'Equity'
+            (pot share in percent), 'Split Ways' (percent of trials split k
+            ways) and 'Opponents Ahead' (percent of trials with k opponents ahead)
+        """
+        board = list(board or [])
+        rng = np.random.default_rng(seed)
+        hero = np.array(cards_to_indices(player_cards), dtype=np.intp)
+        known = set(hero.tolist()) | set(cards_to_indices(board))
+        unseen = np.array([card for card in range(52) if card not in known], dtype=np.intp)
+        num_hole = 2 * num_opponents
+        num_community = 5 - len(board)
+
+        draws = unseen[np.argsort(rng.random((num_trials, len(unseen))), axis=1)[:, :num_hole + num_community]]
+        boards = np.concatenate([np.broadcast_to(np.array(cards_to_indices(board), dtype=np.intp),
+                                                 (num_trials, len(board))), draws[:, num_hole:]], axis=1)
+        # (trial, player, card): the player first, then every opponent
+        holes = np.concatenate([np.broadcast_to(hero, (num_trials, 1, 2)),
+                                draws[:, :num_hole].reshape(num_trials, num_opponents, 2)], axis=1)
+
+        ranks, _ = load_five_card_table()
+        board_ranks = ranks[colex_index(np.sort(boards, axis=1))]
+        seven = np.concatenate([np.broadcast_to(boards[:, None, :], (num_trials, num_opponents + 1, 5)), holes], axis=2)
+        hole_ranks = ranks[colex_index(np.sort(seven[..., HOLE_CARD_SUBSETS], axis=-1))].max(axis=-1)
+        player_ranks = np.maximum(hole_ranks, board_ranks[:, None])
+        INSTRUMENTATION.count('monte_carlo.trials', num_trials)
+
+        hero_rank = player_ranks[:, 0]
+        ahead = (player_ranks[:, 1:] > hero_rank[:, None]).sum(axis=1)
+        tied = (player_ranks[:, 1:] == hero_rank[:, None]).sum(axis=1)
+        win = (ahead == 0) & (tied == 0)
+        tie = (ahead == 0) & (tied > 0)
+        units = np.stack([win, ahead > 0, tie], axis=1).astype(np.float64)
+
+        result = self._format_estimate(units)
+        result['Equity'] = round(float(np.where(ahead == 0, 1 / (tied + 1), 0.0).mean()) * 100, 2)
+        ways = np.bincount(tied[tie] + 1, minlength=num_opponents + 2)
+        result['Split Ways'] = {k: round(float(ways[k]) / num_trials * 100, 2) for k in range(2, num_opponents + 2)}
+        counts = np.bincount(ahead, minlength=num_opponents + 1)
+        result['Opponents Ahead'] = {k: round(float(counts[k]) / num_trials * 100, 2) for k in range(num_opponents + 1)}
+        return result
+
+    def _simulate_variance_reduced(self, player_cards, board, num_opponent_draws, num_inner_draws, mode, seed):
+        """
+        Variance-reduced estimate of the player's win, loss and tie rates.
+
+        'stratified' keeps the nested opponent/runout structure but splits
+        the runouts into equally likely strata by their first card and
+        samples every stratum the same number of times (at least twice), so
+        no part of the deck is over- or under-represented.
+
+        'antithetic' samples num_opponent_draws * num_inner_draws / 2 pairs
+        of complete deals. The unseen cards are sorted by rank and every
+        card is drawn by a uniform index into the remaining cards; the
+        partner deal uses the mirrored index, so a high runout is paired
+        with a low one and their outcomes are negatively correlated.
+
+        Returns:
+            dict: Win percentages with their standard errors
+        """
+        rng = random.Random(seed)
+        board = list(board)
+        num_community = 5 - len(board)
+        known = set(player_cards) | set(board)
+        unseen = [card for card in itertools.product(RANKS, SUITS) if card not in known]
+
+        if mode == 'stratified':
+            # Each opponent draw is an independent unit holding a stratified inner estimate
+            units = []
+            for _ in range(num_opponent_draws):
+                opponent_cards = rng.sample(unseen, 2)
+                remaining = [card for card in unseen if card not in opponent_cards]
+                per_stratum = max(2, num_inner_draws // len(remaining))
+                tally = np.zeros(3)
+                for first in remaining:
+                    rest = [card for card in remaining if card != first]
+                    for _ in range(per_stratum):
+                        runout = [first] + rng.sample(rest, num_community - 1)
+                        tally[self._showdown_outcome(player_cards, opponent_cards, board + runout)] += 1
+                units.append(tally / tally.sum())
+
+        elif mode == 'antithetic':
+            card_values = PokerHandEvaluator().card_values
+            ordered = sorted(unseen, key=lambda card: (card_values[card[0]], card[1]))
+            units = []
+            for _ in range(max(1, num_opponent_draws * num_inner_draws // 2)):
+                pool, mirror_pool = list(ordered), list(ordered)
+                deal, mirror_deal = [], []
+                for _ in range(2 + num_community):
+                    index = int(rng.random() * len(pool))
+                    deal.append(pool.pop(index))
+                    mirror_deal.append(mirror_pool.pop(len(mirror_pool) - 1 - index))
+                tally = np.zeros(3)
+                tally[self._showdown_outcome(player_cards, deal[:2], board + deal[2:])] += 0.5
+                tally[self._showdown_outcome(player_cards, mirror_deal[:2], board + mirror_deal[2:])] += 0.5
+                units.append(tally)
+
+        else:
+            raise ValueError(f"Unknown variance reduction mode: {mode}")
+
+        return self._format_estimate(np.array(units))
+
+    def sequential_dealer_win_test(self, player_cards, board, threshold, method='ci', max_trials=10000,
+                                   batch_size=50, alpha=0.05, indifference=3.0, seed=None):
+        """
+        Decide whether the dealer's win rate is below a threshold, sampling
+        only until the answer is statistically settled.
+
+        Every trial deals a random opponent hand and the missing community
+        cards, so trials are independent draws of "dealer wins".
+
+        'ci' checks a normal confidence interval after every batch. The
+        error budget alpha is split evenly over all possible looks, so
+        stopping at the first conclusive look keeps the overall error at
+        most alpha. Sampling stops once the interval lies entirely on one
+        side of the threshold.
+
+        'sprt' runs Wald's sequential probability ratio test of
+        threshold - indifference against threshold + indifference, with
+        error rates alpha for both hypotheses. It is checked after every
+        trial.
+
+        If neither test settles within max_trials, the point estimate
+        decides, which is what the fixed-budget estimate would do.
+
+        Args:
+            player_cards (list): Player's hand
+            board (list): Known community cards (flop, flop and turn, or all five)
+            threshold (float): Dealer win percentage to test against
+            method (str): 'ci' or 'sprt'
+            max_trials (int): Trial budget of the full, non-sequential estimate
+            batch_size (int): Trials between two looks of the 'ci' test
+            alpha (float): Error rate of the test
+            indifference (float): Half-width in percent of the 'sprt' indifference zone
+            seed (int): Seed of the sampler
+
+        Returns:
+            dict: 'Below Threshold', 'Player 2 Win' (percent), 'Trials' and 'Stopped Early'
+        """
+        rng = random.Random(seed)
+        board = list(board)
+        known = set(player_cards) | set(board)
+        unseen = [card for card in itertools.product(RANKS, SUITS) if card not in known]
+        num_cards = 2 + 5 - len(board)
+        p = threshold / 100
+
+        if method == 'ci':
+            num_looks = math.ceil(max_trials / batch_size)
+            z = NormalDist().inv_cdf(1 - alpha / (2 * num_looks))
+        elif method == 'sprt':
+            p_bet = max(p - indifference / 100, 1e-6)
+            p_check = min(p + indifference / 100, 1 - 1e-6)
+            loss_step = math.log(p_bet / p_check)
+            other_step = math.log((1 - p_bet) / (1 - p_check))
+            upper = math.log((1 - alpha) / alpha)
+            lower = math.log(alpha / (1 - alpha))
+            log_ratio = 0.0
+        else:
+            raise ValueError(f"Unknown sequential test: {method}")
+
+        dealer_wins = 0
+        trials = 0
+        decision = None
+        while trials < max_trials and decision is None:
+            deal = rng.sample(unseen, num_cards)
+            dealer_won = self._showdown_outcome(player_cards, deal[:2], board + deal[2:]) == 1
+            dealer_wins += dealer_won
+            trials += 1
+
+            if method == 'sprt':
+                log_ratio += loss_step if dealer_won else other_step
+                if log_ratio >= upper:
+                    decision = True
+                elif log_ratio <= lower:
+                    decision = False
+
+            elif trials % batch_size == 0:
+                estimate = dealer_wins / trials
+                # Keep the interval from collapsing when every sample agrees so far
+                spread = math.sqrt(max(estimate * (1 - estimate), 1 / trials) / trials)
+                if estimate + z * spread < p:
+                    decision = True
+                elif estimate - z * spread > p:
+                    decision = False
+
+        INSTRUMENTATION.count('monte_carlo.trials', trials)
+        INSTRUMENTATION.record('sequential_test.trials', trials)
+        stopped_early = decision is not None
+        if decision is None:
+            decision = dealer_wins / trials < p
+
+        return {
+            'Below Threshold': decision,
+            'Player 2 Win': round(dealer_wins / trials * 100, 2),
+            'Trials': trials,
+            'Stopped Early': stopped_early
+        }
+
+    def _showdown_outcome(self, player_cards, opponent_cards, community_cards):
+        # 0 = player wins, 1 = opponent wins, 2 = tie (same order as the result dicts)
+        _, _, winner = determine_winner(player_cards, opponent_cards, community_cards)
+        return winner - 1
+
+    def _format_estimate(self, units, suffix=''):
+        """
+        Turn independent (win, loss, tie) sample units into the result dict.
+
+        Args:
+            units (np.ndarray): Array of shape (num_units, 3)
+            suffix (str): Appended to every key (e.g. ' Diff')
+
+        Returns:
+            dict: Percentages and their standard errors
+        """
+        means = units.mean(axis=0)
+        if len(units) > 1:
+            standard_errors = units.std(axis=0, ddof=1) / np.sqrt(len(units))
+        else:
+            standard_errors = np.full(3, np.nan)
+
+        result = {}
+        for key, mean, standard_error in zip(['Player 1 Win', 'Player 2 Win', 'Tie'], means, standard_errors):
+            result[f'{key}{suffix}'] = round(float(mean) * 100, 2)
+            result[f'{key}{suffix} SE'] = round(float(standard_error) * 100, 2)
+        return result
     
     
 # Function to determine if cards are suited
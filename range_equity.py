@@ -0,0 +1,306 @@
+import re
+import itertools
+import numpy as np
+
+from entire_game import *
+from fast_evaluator import *
+from preflop_simulation import get_preflop_abstraction
+
+# All 1326 two-card combos as card index pairs (low index first)
+COMBOS = np.array(list(itertools.combinations(range(52), 2)), dtype=np.intp)
+NUM_COMBOS = len(COMBOS)
+COMBO_MASKS = (np.uint64(1) << COMBOS[:, 0].astype(np.uint64)) | (np.uint64(1) << COMBOS[:, 1].astype(np.uint64))
+COMBO_INDEX = {(int(a), int(b)): index for index, (a, b) in enumerate(COMBOS)}
+# COMBO_INDEX as a 52x52 array (either card order) for vectorized lookups
+COMBO_INDEX_ARRAY = np.full((52, 52), -1, dtype=np.intp)
+COMBO_INDEX_ARRAY[COMBOS[:, 0], COMBOS[:, 1]] = np.arange(NUM_COMBOS)
+COMBO_INDEX_ARRAY[COMBOS[:, 1], COMBOS[:, 0]] = np.arange(NUM_COMBOS)
+
+# Preflop class of every combo, in get_preflop_abstraction notation ("AKs", "AKo", "1010")
+COMBO_CLASSES = [get_preflop_abstraction([index_to_card(int(a)), index_to_card(int(b))]) for a, b in COMBOS]
+
+# CARD_COMBOS[c] lists the 51 combos that contain card c
+CARD_COMBOS = np.array([[COMBO_INDEX[tuple(sorted((card, other)))] for other in range(52) if other != card]
+                        for card in range(52)], dtype=np.intp)
+
+_RANK_TOKEN = r'(10|[2-9TJQKA])'
+_CLASS_PATTERN = re.compile(rf'^{_RANK_TOKEN}{_RANK_TOKEN}([so]?)(\+?)$')
+_RANGE_PATTERN = re.compile(rf'^{_RANK_TOKEN}{_RANK_TOKEN}([so]?)-{_RANK_TOKEN}{_RANK_TOKEN}([so]?)$')
+_RANK_ORDER = {rank: position for position, rank in enumerate(RANKS)}
+
+
+def _rank(token):
+    return '10' if token == 'T' else token
+
+
+def _class_name(high, low, suitedness):
+    # Class string as produced by get_preflop_abstraction
+    if high == low:
+        return f"{high}{low}"
+    return f"{high}{low}{suitedness}"
+
+
+def _expand_token(token):
+    """
+    Preflop classes described by one range token.
+
+    Supported forms: "AA", "AKs", "AKo", "AK" (suited and offsuit), "TT+"
+    (TT and better pairs), "A9s+" (A9s up to AKs), "22-55" and "A2s-A5s".
+    """
+    match = _CLASS_PATTERN.match(token)
+    if match:
+        high, low, suitedness, plus = _rank(match.group(1)), _rank(match.group(2)), match.group(3), match.group(4)
+        if _RANK_ORDER[low] > _RANK_ORDER[high]:
+            high, low = low, high
+        suitednesses = [suitedness] if suitedness or high == low else ['s', 'o']
+        if not plus:
+            return [_class_name(high, low, s) for s in suitednesses]
+        if high == low:
+            return [_class_name(rank, rank, '') for rank in RANKS[_RANK_ORDER[high]:]]
+        kickers = RANKS[_RANK_ORDER[low]:_RANK_ORDER[high]]
+        return [_class_name(high, kicker, s) for kicker in kickers for s in suitednesses]
+
+    match = _RANGE_PATTERN.match(token)
+    if match:
+        high_1, low_1, suited_1 = _rank(match.group(1)), _rank(match.group(2)), match.group(3)
+        high_2, low_2 = _rank(match.group(4)), _rank(match.group(5))
+        suitednesses = [suited_1] if suited_1 else ['s', 'o']
+        if high_1 == low_1 and high_2 == low_2:
+            first, last = sorted((_RANK_ORDER[high_1], _RANK_ORDER[high_2]))
+            return [_class_name(rank, rank, '') for rank in RANKS[first:last + 1]]
+        if high_1 == high_2:
+            first, last = sorted((_RANK_ORDER[low_1], _RANK_ORDER[low_2]))
+            return [_class_name(high_1, kicker, s) for kicker in RANKS[first:last + 1] for s in suitednesses]
+
+    raise ValueError(f"Cannot parse range token: {token}")
+
+
+class HandRange:
+    """
+    A hand range as weights over the 1326 two-card combos.
+
+    Weights are relative: a combo with weight 0.5 is held half as often as
+    one with weight 1. Combos blocked by known cards are removed by the
+    equity engine, not here.
+    """
+
+    def __init__(self, weights=None):
+        self.weights = np.zeros(NUM_COMBOS) if weights is None else np.asarray(weights, dtype=np.float64)
+
+    @classmethod
+    def full(cls):
+        return cls(np.ones(NUM_COMBOS))
+
+    @classmethod
+    def from_cards(cls, cards):
+        """
+        Range holding exactly one hand, e.g. [('A', 'S'), ('K', 'S')].
+        """
+        hand_range = cls()
+        hand_range.weights[COMBO_INDEX[tuple(sorted(cards_to_indices(cards)))]] = 1.0
+        return hand_range
+
+    @classmethod
+    def from_classes(cls, class_weights):
+        """
+        Range from preflop class weights, e.g. {'AKs': 1.0, '1010': 0.5}.
+        """
+        hand_range = cls()
+        for index, combo_class in enumerate(COMBO_CLASSES):
+            hand_range.weights[index] = class_weights.get(combo_class, 0.0)
+        return hand_range
+
+    @classmethod
+    def from_string(cls, text):
+        """
+        Parse a range such as "TT+, AKs, AQo:0.5, A2s-A5s".
+
+        Tokens are separated by commas or spaces; ':w' gives the token a
+        weight (default 1). T and 10 are both accepted for tens.
+        """
+        class_weights = {}
+        for token in re.split(r'[,\s]+', text.strip()):
+            if not token:
+                continue
+            token, _, weight = token.partition(':')
+            for combo_class in _expand_token(token):
+                class_weights[combo_class] = float(weight) if weight else 1.0
+        return cls.from_classes(class_weights)
+
+    def num_combos(self):
+        return int(np.count_nonzero(self.weights))
+
+    def __add__(self, other):
+        return HandRange(self.weights + other.weights)
+
+    def __mul__(self, factor):
+        return HandRange(self.weights * factor)
+
+
+def combo_ranks(board):
+    """
+    Rank every combo on a complete five-card board.
+
+    Args:
+        board (list): Five card indices
+
+    Returns:
+        np.ndarray: Ranks of the 1326 combos (see fast_evaluator.seven_card_rank_array);
+        combos that share a card with the board get meaningless ranks and must be masked
+    """
+    hands = np.empty((NUM_COMBOS, 7), dtype=np.intp)
+    hands[:, :2] = COMBOS
+    hands[:, 2:] = board
+    # Give board-blocked combos two off-board cards so the table lookup stays valid
+    blocked = (COMBO_MASKS & board_mask(board)) != 0
+    hands[blocked, :2] = [card for card in range(52) if card not in set(board)][:2]
+    return seven_card_rank_array(hands).astype(np.int64)
+
+
+def board_mask(cards):
+    mask = np.uint64(0)
+    for card in cards:
+        mask |= np.uint64(1) << np.uint64(card)
+    return mask
+
+
+def _blocked_sums(ranks, weights, hero_ranks):
+    """
+    For every card c and hero combo, the villain weight of combos holding c
+    ranked below, equal to, and in total.
+
+    Uses one flattened array of the 52 per-card combo lists sorted by rank,
+    offset by card so that a single searchsorted serves all cards.
+    """
+    span = int(ranks.max()) + 2
+    card_ranks = ranks[CARD_COMBOS]
+    card_weights = weights[CARD_COMBOS]
+    order = np.argsort(card_ranks, axis=1, kind='stable')
+    sorted_ranks = np.take_along_axis(card_ranks, order, axis=1)
+    sorted_weights = np.take_along_axis(card_weights, order, axis=1)
+    keys = (sorted_ranks + np.arange(52)[:, None] * span).ravel()
+    cumulative = np.concatenate([[0.0], np.cumsum(sorted_weights.ravel())])
+    row_start = cumulative[np.arange(52) * 51]
+
+    def sums(card):
+        base = card * span + hero_ranks
+        below = cumulative[np.searchsorted(keys, base, side='left')] - row_start[card]
+        upto = cumulative[np.searchsorted(keys, base, side='right')] - row_start[card]
+        total = cumulative[card * 51 + 51] - row_start[card]
+        return below, upto - below, total
+
+    return sums(COMBOS[:, 0]), sums(COMBOS[:, 1])
+
+
+def showdown_weights(ranks, hero_weights, villain_weights):
+    """
+    Weighted showdown outcomes of every hero combo against a villain range
+    on one complete board.
+
+    Card removal is exact: villain combos sharing a card with the hero
+    combo are subtracted with per-card cumulative sums instead of a
+    1326 x 1326 mask, so the cost is O(n log n).
+
+    Args:
+        ranks (np.ndarray): combo_ranks of the board
+        hero_weights (np.ndarray): Hero weights with board-blocked combos zeroed
+        villain_weights (np.ndarray): Villain weights with board-blocked combos zeroed
+
+    Returns:
+        tuple: (win, tie, total) villain weight per hero combo
+    """
+    order = np.argsort(ranks, kind='stable')
+    sorted_ranks = ranks[order]
+    cumulative = np.concatenate([[0.0], np.cumsum(villain_weights[order])])
+    below = cumulative[np.searchsorted(sorted_ranks, ranks, side='left')]
+    equal = cumulative[np.searchsorted(sorted_ranks, ranks, side='right')] - below
+    total = cumulative[-1]
+
+    (below_a, equal_a, total_a), (below_b, equal_b, total_b) = _blocked_sums(ranks, villain_weights, ranks)
+
+    # The combo identical to the hero's is subtracted once per card, so add it back once
+    win = below - below_a - below_b
+    tie = equal - equal_a - equal_b + villain_weights
+    total = total - total_a - total_b + villain_weights
+    active = hero_weights > 0
+    return np.where(active, win, 0.0), np.where(active, tie, 0.0), np.where(active, total, 0.0)
+
+
+def _runouts(board, num_runouts, rng):
+    # Every completion of the board, or a random sample of num_runouts of them
+    missing = 5 - len(board)
+    remaining = [card for card in range(52) if card not in set(board)]
+    if missing == 0:
+        return [list(board)]
+    if num_runouts is None:
+        return [list(board) + list(runout) for runout in itertools.combinations(remaining, missing)]
+    return [list(board) + list(rng.choice(remaining, missing, replace=False)) for _ in range(num_runouts)]
+
+
+def range_equity(hero_range, villain_range, board=(), num_runouts=None, seed=None):
+    """
+    Exact (or runout-sampled) equity of one range against another.
+
+    Every runout of a partial board is enumerated unless num_runouts is
+    given, in which case that many runouts are sampled. For each runout all
+    1326 combos are ranked in one vectorized pass and the hero/villain
+    showdowns are counted with card removal (showdown_weights).
+
+    Args:
+        hero_range (HandRange): Hero's range
+        villain_range (HandRange): Villain's (dealer's) range
+        board (list): Known community cards as (rank, suit) tuples, 0 to 5 of them
+        num_runouts (int): Sample this many runouts instead of enumerating
+        seed (int): Seed of the runout sampler
+
+    Returns:
+        dict: 'Hero Win', 'Villain Win', 'Tie' and 'Hero Equity' in percent,
+        'Combo Equity' (hero equity per combo, NaN where the hero holds no
+        weight) and the number of 'Runouts'
+    """
+    board = cards_to_indices(board)
+    rng = np.random.default_rng(seed)
+    wins = np.zeros(NUM_COMBOS)
+    ties = np.zeros(NUM_COMBOS)
+    totals = np.zeros(NUM_COMBOS)
+
+    runouts = _runouts(board, num_runouts, rng)
+    for full_board in runouts:
+        unblocked = (COMBO_MASKS & board_mask(full_board)) == 0
+        hero_weights = np.where(unblocked, hero_range.weights, 0.0)
+        villain_weights = np.where(unblocked, villain_range.weights, 0.0)
+        win, tie, total = showdown_weights(combo_ranks(full_board), hero_weights, villain_weights)
+        wins += hero_weights * win
+        ties += hero_weights * tie
+        totals += hero_weights * total
+
+    matchups = totals.sum()
+    if matchups == 0:
+        raise ValueError("The ranges have no compatible combos on this board")
+    with np.errstate(invalid='ignore', divide='ignore'):
+        combo_equity = np.where(totals > 0, (wins + ties / 2) / totals, np.nan)
+
+    return {
+        'Hero Win': round(wins.sum() / matchups * 100, 2),
+        'Villain Win': round((matchups - wins.sum() - ties.sum()) / matchups * 100, 2),
+        'Tie': round(ties.sum() / matchups * 100, 2),
+        'Hero Equity': round((wins.sum() + ties.sum() / 2) / matchups * 100, 2),
+        'Combo Equity': combo_equity,
+        'Runouts': len(runouts)
+    }
+
+
+def class_equities(combo_equity, hero_range):
+    """
+    Average a per-combo equity array over preflop classes.
+
+    Returns:
+        dict: Class string -> weighted equity of the class's live combos
+    """
+    totals = {}
+    for index, combo_class in enumerate(COMBO_CLASSES):
+        weight = hero_range.weights[index]
+        if weight > 0 and not np.isnan(combo_equity[index]):
+            equity_sum, weight_sum = totals.get(combo_class, (0.0, 0.0))
+            totals[combo_class] = (equity_sum + weight * combo_equity[index], weight_sum + weight)
+    return {combo_class: equity_sum / weight_sum for combo_class, (equity_sum, weight_sum) in totals.items()}
@@ -0,0 +1,165 @@
+import os
+import random
+import argparse
+import numpy as np
+import torch
+from concurrent.futures import ProcessPoolExecutor
+
+from entire_game import *
+from casino_game_simulator import CasinoGameSimulator
+from compact_log import read_log, replay_deal
+from equity_server import parse_card
+from result_graph import HAND_START_PATTERN
+from shared_tables import TableRegistry, publish_rank_table, attach_worker_tables
+
+# Deals per worker task; fixed so results do not depend on the number of workers
+DEFAULT_CHUNK_SIZE = 64
+
+# Stack large enough that no replayed hand is refused for lack of chips
+REPLAY_STACK = 10 ** 9
+
+CARD_LINES = {
+    "Player's hand:": 'Player 1',
+    "Dealer's hand:": 'Player 2',
+    "Community cards:": 'Community Cards'
+}
+
+
+def load_recorded_deals(path):
+    """
+    Read the deals of a saved session.
+
+    Compact logs (.uthlog) are regenerated from their seed. Text logs
+    (the UI's player_stats_*.txt, or a replayed compact log) are parsed
+    for the player, dealer and community card lines of every hand; hands
+    missing any of them, such as bot log hands that folded, are skipped.
+
+    Returns:
+        list: Deals in the format of PokerGame.deal_cards
+    """
+    if path.endswith('.uthlog'):
+        header, hands = read_log(path)
+        return [replay_deal(header, hand_number) for hand_number in range(len(hands))]
+
+    deals = []
+    current = {}
+    with open(path) as file:
+        for line in file:
+            line = line.strip()
+            if HAND_START_PATTERN.search(line):
+                current = {}
+                continue
+            for prefix, key in CARD_LINES.items():
+                if line.startswith(prefix):
+                    current[key] = [parse_card(card) for card in line[len(prefix):].split()]
+            if len(current) == len(CARD_LINES):
+                deals.append(current)
+                current = {}
+    return deals
+
+
+def _replay_chunk(job):
+    # Worker task: play a chunk of deals through a fresh bot and report each hand
+    deals, seed, start_bet, make_trip_bet, trip_bet_amount, simulator_options = job
+    if seed is not None:
+        random.seed(seed)
+        np.random.seed(seed % (1 << 32))
+        torch.manual_seed(seed)
+    simulator = CasinoGameSimulator(initial_stack=REPLAY_STACK, max_bet=max(100, start_bet), **simulator_options)
+    casino_game = simulator.casino_game
+    outcomes = []
+    for deal in deals:
+        stack = casino_game.get_player_stack()
+        if not simulator.simulate_hand_with_given_cards(start_bet, deal['Player 1'], deal['Player 2'],
+                                                        deal['Community Cards'], make_trip_bet, trip_bet_amount,
+                                                        verbose=False):
+            # Bets the table refuses (ante or trips out of limits): no round was played
+            outcomes.append({'skipped': True})
+            continue
+        result = casino_game.get_round_history()[-1]
+        outcomes.append({
+            'skipped': False,
+            'play_bet': result['final_bet'] // start_bet,
+            'net': casino_game.get_player_stack() - stack,
+            'main_pot_win': result['main_pot_win'],
+            'blind_bet_win': result['blind_bet_win'],
+            'trip_bet_win': result['trip_bet_win']
+        })
+    return outcomes
+
+
+def replay_deals(deals, start_bet=10, make_trip_bet=False, trip_bet_amount=0, workers=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE, seed=None, strategy_table=None, sequential_test=None):
+    """
+    Play recorded deals through the bot's decisions and payouts in parallel.
+
+    Deals are split into fixed chunks, each replayed by a fresh
+    CasinoGameSimulator in a worker process (the batch form of
+    simulate_hand_with_given_cards). With a seed, chunk i seeds its Monte
+    Carlo decisions with seed + i, so results are reproducible for any
+    number of workers.
+
+    Args:
+        deals (list): Dicts with 'Player 1', 'Player 2' and 'Community Cards'
+        start_bet (int): Ante of every hand
+        make_trip_bet (bool): Place a trips bet
+        trip_bet_amount (int): Trips bet
+        workers (int): Worker processes (default: CPU count)
+        chunk_size (int): Deals per worker task
+        seed (int): Base seed of the decisions
+        strategy_table (str): Path of a saved StrategyTable the bot plays
+        sequential_test (str): CasinoGameSimulator sequential test ('ci' or 'sprt')
+
+    Returns:
+        list: One dict per deal, in deal order: 'skipped' (True when the bets were refused,
+            with no other keys), else 'play_bet' (0 for a fold), 'net' and the main pot, blind and trips wins
+    """
+    simulator_options = {'strategy_table': strategy_table, 'sequential_test': sequential_test}
+    jobs = [(deals[start:start + chunk_size], None if seed is None else seed + index, start_bet,
+             make_trip_bet, trip_bet_amount, simulator_options)
+            for index, start in enumerate(range(0, len(deals), chunk_size))]
+    # Workers map one shared copy of the rank table instead of loading their own
+    with TableRegistry() as registry:
+        publish_rank_table(registry)
+        with ProcessPoolExecutor(max_workers=workers, initializer=attach_worker_tables,
+                                 initargs=(registry.directory,)) as executor:
+            chunks = list(executor.map(_replay_chunk, jobs))
+    return [outcome for chunk in chunks for outcome in chunk]
+
+
+def summarize_outcomes(outcomes, start_bet=10):
+    """
+    Returns:
+        dict: 'Hands' played, 'Skipped' deals, 'Net', 'EV per hand' in antes and the play bet counts
+    """
+    played = [outcome for outcome in outcomes if not outcome['skipped']]
+    net = np.array([outcome['net'] for outcome in played], dtype=float)
+    play_bets = [outcome['play_bet'] for outcome in played]
+    return {
+        'Hands': len(played),
+        'Skipped': len(outcomes) - len(played),
+        'Net': float(net.sum()),
+        'EV per hand': float(net.mean() / start_bet) if len(net) else 0.0,
+        'Play bets': {multiple: play_bets.count(multiple) for multiple in (4, 2, 1, 0)}
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded deals through the bot in parallel")
+    parser.add_argument('logs', nargs='+', help="Compact logs (.uthlog) or player_stats text logs")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--start-bet', type=int, default=10)
+    parser.add_argument('--strategy-table', default=None, help="Saved StrategyTable for the bot")
+    parser.add_argument('--sequential-test', choices=('ci', 'sprt'), default=None)
+    args = parser.parse_args(argv)
+
+    recorded = [deal for path in args.logs for deal in load_recorded_deals(path)]
+    outcomes = replay_deals(recorded, start_bet=args.start_bet, workers=args.workers, seed=args.seed,
+                            strategy_table=args.strategy_table, sequential_test=args.sequential_test)
+    print(summarize_outcomes(outcomes, args.start_bet))
+
+
+if __name__ == "__main__":
+    os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
+    main()
@@ -1,25 +1,30 @@
 import re
+import sys
+import hashlib
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import os
+from concurrent.futures import ProcessPoolExecutor
+from instrumentation import INSTRUMENTATION
 
-def parse_output_file(filename):
+# Regular expressions shared by every session log parser
+HAND_START_PATTERN = re.compile(r'=== Hand (\d+) ===')
+STACK_PATTERN = re.compile(r'Current stack: (-?\d+(?:\.\d+)?)')
+
+def parse_output_file(filename, initial_stack=1000):
     """
     Parse the output file to extract hand-by-hand information
     """
-    hands = [{"hand_number":0, "stack":1000}]
+    hands = [{"hand_number":0, "stack":initial_stack}]
     current_hand = {}
     
     with open(filename, 'r') as file:
         lines = file.readlines()
     
-    # Regular expressions for parsing
-    hand_start_pattern = re.compile(r'=== Hand (\d+) ===')
-    stack_pattern = re.compile(r'Current stack: (\d+)')
-    
     for line in lines:
-        hand_match = hand_start_pattern.search(line)
-        stack_match = stack_pattern.search(line)
+        hand_match = HAND_START_PATTERN.search(line)
+        stack_match = STACK_PATTERN.search(line)
         
         if hand_match:
             # Start of a new hand
@@ -28,7 +33,9 @@ def parse_output_file(filename):
             current_hand = {'hand_number': int(hand_match.group(1))}
         
         if stack_match:
-            current_hand['stack'] = int(stack_match.group(1))
+            # Blind payouts can leave half-dollar stacks (e.g. 3:2 on a flush)
+            stack = float(stack_match.group(1))
+            current_hand['stack'] = int(stack) if stack.is_integer() else stack
     
     # Append the last hand
     if current_hand:
@@ -36,7 +43,7 @@ def parse_output_file(filename):
     
     return pd.DataFrame(hands)
 
-def create_stack_size_plot(df, input_filename):
+def create_stack_size_plot(df, input_filename, initial_stack=1000):
     """
     Create stack size progression plot and save with input filename
     """
@@ -48,7 +55,6 @@ def create_stack_size_plot(df, input_filename):
     plt.grid(True, linestyle='--', alpha=0.7)
     
     # Add horizontal line for initial stack
-    initial_stack = 1000
     plt.axhline(y=initial_stack, color='r', linestyle='--', label='Initial Stack')
     
     # Annotate final stack
@@ -73,19 +79,205 @@ def create_stack_size_plot(df, input_filename):
     print()
     print(f"Stack size analysis plot saved as {output_filename}")
 
-def plot_graph(input_filename='output_2.txt'):
+def plot_graph(input_filename='output_2.txt', initial_stack=1000):
     # Parse the output file
-    df = parse_output_file(input_filename)
+    df = parse_output_file(input_filename, initial_stack)
     
     # Create stack size progression plot
-    create_stack_size_plot(df, input_filename)
+    create_stack_size_plot(df, input_filename, initial_stack)
     
     # Print some basic statistics
     print("\nGame Statistics:")
     print(f"Total Hands: {len(df) - 1}")
-    print(f"Starting Stack: $1000")
+    print(f"Starting Stack: ${initial_stack}")
     print(f"Ending Stack: ${df['stack'].iloc[-1]}")
-    print(f"Total Profit/Loss: ${df['stack'].iloc[-1] - 1000}")
+    print(f"Total Profit/Loss: ${df['stack'].iloc[-1] - initial_stack}")
+
+def _session_cache_path(filename, cache_dir):
+    """
+    Build the cache file name for a session log.
+
+    The key covers the absolute path, size and modification time so an
+    edited or re-written log is parsed again instead of served stale.
+    """
+    stat = os.stat(filename)
+    key = f"{os.path.abspath(filename)}|{stat.st_size}|{stat.st_mtime_ns}"
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    base_filename = os.path.splitext(os.path.basename(filename))[0]
+    return os.path.join(cache_dir, f"{base_filename}_{digest}.npz")
+
+def load_session(filename, initial_stack=1000, cache_dir='.session_cache'):
+    """
+    Load the stack progression of one session log, parsing it at most once.
+
+    The parsed log is stored as two compact arrays (hand numbers and stacks)
+    in an .npz file, so re-rendering a report only reads the cache.
+
+    Args:
+        filename (str): Session log written by the UI or casino simulator
+        initial_stack (float): Stack before the first hand
+        cache_dir (str): Directory for parsed sessions, None disables caching
+        carry_forward (bool): Keep ended sessions at their final stack (see align_sessions)
+
+    Returns:
+        tuple: (hand_numbers, stacks) as numpy arrays, hand 0 is the initial stack
+    """
+    cache_file = _session_cache_path(filename, cache_dir) if cache_dir else None
+    if cache_file and os.path.exists(cache_file):
+        INSTRUMENTATION.cache_hit('session_log')
+        with np.load(cache_file) as cached:
+            stacks = cached['stacks'].copy()
+            stacks[0] = initial_stack
+            return cached['hand_numbers'].copy(), stacks
+
+    INSTRUMENTATION.cache_miss('session_log')
+    hand_numbers = [0]
+    stacks = [float(initial_stack)]
+    current_hand = None
+    with open(filename, 'r') as file:
+        for line in file:
+            hand_match = HAND_START_PATTERN.search(line)
+            if hand_match:
+                current_hand = int(hand_match.group(1))
+                continue
+            stack_match = STACK_PATTERN.search(line)
+            if stack_match and current_hand is not None:
+                # Keep only the last reported stack of each hand
+                if hand_numbers[-1] == current_hand:
+                    stacks[-1] = float(stack_match.group(1))
+                else:
+                    hand_numbers.append(current_hand)
+                    stacks.append(float(stack_match.group(1)))
+
+    hand_numbers = np.asarray(hand_numbers, dtype=np.int32)
+    stacks = np.asarray(stacks, dtype=np.float64)
+    if cache_file:
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez_compressed(cache_file, hand_numbers=hand_numbers, stacks=stacks)
+    return hand_numbers, stacks
+
+def _load_session_job(args):
+    # Top-level helper so the process pool can pickle it
+    return load_session(*args)
+
+def align_sessions(sessions, carry_forward=True):
+    """
+    Align several sessions on hand number.
+
+    Hands missing inside a session carry the previous stack forward. After
+    a session ended, its final stack is carried to the last hand as well: a
+    bust-out stays in the percentile bands at its final stack, instead of
+    dropping out and leaving the bands to the sessions still playing.
+
+    Args:
+        sessions (list): (hand_numbers, stacks) tuples from load_session
+        carry_forward (bool): Carry final stacks to the last hand; False leaves the hands
+            after a session ended as NaN (e.g. for runs truncated rather than finished)
+
+    Returns:
+        np.ndarray: Matrix of shape (num_sessions, max_hand + 1)
+    """
+    max_hand = max(int(hand_numbers[-1]) for hand_numbers, _ in sessions)
+    aligned = np.full((len(sessions), max_hand + 1), np.nan)
+    for row, (hand_numbers, stacks) in enumerate(sessions):
+        last_hand = max_hand if carry_forward else int(hand_numbers[-1])
+        positions = np.searchsorted(hand_numbers, np.arange(last_hand + 1), side='right') - 1
+        aligned[row, :last_hand + 1] = stacks[positions]
+    return aligned
+
+def summarize_sessions(names, sessions, initial_stack=1000):
+    """
+    Build the per-session summary table of a comparative report.
+
+    Returns:
+        pd.DataFrame: One row per session
+    """
+    rows = []
+    for name, (hand_numbers, stacks) in zip(names, sessions):
+        running_peak = np.maximum.accumulate(stacks)
+        rows.append({
+            'session': name,
+            'hands': int(hand_numbers[-1]),
+            'final_stack': float(stacks[-1]),
+            'profit': float(stacks[-1] - initial_stack),
+            'profit_per_hand': float((stacks[-1] - initial_stack) / max(int(hand_numbers[-1]), 1)),
+            'min_stack': float(stacks.min()),
+            'max_stack': float(stacks.max()),
+            'max_drawdown': float((running_peak - stacks).max()),
+        })
+    return pd.DataFrame(rows)
+
+def build_comparative_report(input_filenames, output_filename='session_comparison.png', initial_stack=1000,
+                             percentiles=(10, 50, 90), workers=None, cache_dir='.session_cache',
+                             carry_forward=True):
+    """
+    Render many session logs into a single comparative dashboard.
+
+    The logs are parsed in parallel (once each, see load_session), aligned by
+    hand number and drawn as overlays with percentile bands on top of a
+    summary table. The summary is also returned so it can be saved elsewhere.
+
+    Args:
+        input_filenames (list): Session logs to compare
+        output_filename (str): Image holding the whole report
+        initial_stack (float): Stack every session started with
+        percentiles (tuple): Low, middle and high percentile of the band
+        workers (int): Parser processes, defaults to the CPU count
+        cache_dir (str): Directory for parsed sessions, None disables caching
+        carry_forward (bool): Keep ended sessions at their final stack (see align_sessions)
+
+    Returns:
+        pd.DataFrame: Summary table, one row per session
+    """
+    jobs = [(filename, initial_stack, cache_dir) for filename in input_filenames]
+    if len(jobs) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            sessions = list(executor.map(_load_session_job, jobs))
+    else:
+        sessions = [_load_session_job(job) for job in jobs]
+
+    names = [os.path.splitext(os.path.basename(filename))[0] for filename in input_filenames]
+    aligned = align_sessions(sessions, carry_forward)
+    summary = summarize_sessions(names, sessions, initial_stack)
+
+    hands_axis = np.arange(aligned.shape[1])
+    low, mid, high = np.nanpercentile(aligned, percentiles, axis=0)
+
+    fig, (plot_ax, table_ax) = plt.subplots(
+        2, 1, figsize=(14, 8 + 0.3 * len(sessions)),
+        gridspec_kw={'height_ratios': [3, 1 + 0.1 * len(sessions)]})
+
+    # Individual sessions, labelled only while the legend stays readable
+    show_labels = len(sessions) <= 10
+    for name, row in zip(names, aligned):
+        plot_ax.plot(hands_axis, row, linewidth=1, alpha=0.5, label=name if show_labels else None)
+
+    plot_ax.fill_between(hands_axis, low, high, color='grey', alpha=0.3,
+                         label=f'P{percentiles[0]}-P{percentiles[2]} band')
+    plot_ax.plot(hands_axis, mid, color='black', linewidth=2, label=f'P{percentiles[1]}')
+    plot_ax.axhline(y=initial_stack, color='r', linestyle='--', label='Initial Stack')
+    plot_ax.set_title(f'Stack Size Comparison ({len(sessions)} sessions)', fontsize=16)
+    plot_ax.set_xlabel('Hand Number', fontsize=12)
+    plot_ax.set_ylabel('Stack Size ($)', fontsize=12)
+    plot_ax.grid(True, linestyle='--', alpha=0.7)
+    plot_ax.legend(fontsize=8)
+
+    table_ax.axis('off')
+    table = table_ax.table(cellText=summary.round(2).values, colLabels=list(summary.columns), loc='center')
+    table.auto_set_font_size(False)
+    table.set_fontsize(8)
+
+    plt.tight_layout()
+    plt.savefig(output_filename)
+    plt.close(fig)
+
+    print()
+    print(f"Comparative analysis of {len(sessions)} sessions saved as {output_filename}")
+    return summary
 
 if __name__ == '__main__':
-    plot_graph(r'conservative_player.txt')
\ No newline at end of file
+    if len(sys.argv) > 1:
+        # python result_graph.py session_a.txt session_b.txt ...
+        print(build_comparative_report(sys.argv[1:]).to_string(index=False))
+    else:
+        plot_graph(r'conservative_player.txt')
\ No newline at end of file
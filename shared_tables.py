@@ -0,0 +1,216 @@
+import os
+import sys
+import json
+import atexit
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+import fast_evaluator
+from fast_evaluator import load_five_card_table, cards_to_indices
+from range_equity import COMBOS, COMBO_INDEX
+from entire_game import *
+
+MANIFEST_FILE = 'manifest.json'
+
+# Bump when the layout of a standard table changes
+FIVE_CARD_TABLE_VERSION = 'five_card_ranks-v1'
+PREFLOP_CSV_FILE = 'poker_hand_statistics.csv'
+
+# Tables attached by this process (set by attach_worker_tables)
+_worker_registry = None
+
+
+class TableRegistry:
+    """
+    Read-only lookup tables shared between processes through memory-mapped files.
+
+    The parent creates the registry and publishes each table once as a .npy
+    file, in /dev/shm when available so the files never touch disk. Workers
+    attach by directory and np.load the files with mmap_mode='r': every
+    process maps the same pages, so per-worker memory stays flat however
+    many workers run. A manifest records each table's version, shape and
+    dtype; attaching with a different expected version raises ValueError.
+    The creating process removes the directory on close() or at exit.
+    """
+
+    def __init__(self, directory=None):
+        self.owner = directory is None
+        if self.owner:
+            base = '/dev/shm' if os.path.isdir('/dev/shm') else None
+            directory = tempfile.mkdtemp(prefix='uth_tables_', dir=base)
+            atexit.register(self.close)
+        self.directory = directory
+        self._arrays = {}
+        self._manifest = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    @property
+    def manifest(self):
+        if self._manifest is None:
+            path = os.path.join(self.directory, MANIFEST_FILE)
+            if os.path.exists(path):
+                with open(path) as file:
+                    self._manifest = json.load(file)
+            else:
+                self._manifest = {}
+        return self._manifest
+
+    def publish(self, name, array, version):
+        """
+        Store a table for the workers.
+
+        Args:
+            name (str): Table name
+            array (np.ndarray): Table contents
+            version (str): Version string checked by attach()
+        """
+        if not self.owner:
+            raise ValueError("Only the process that created the registry can publish tables")
+        array = np.ascontiguousarray(array)
+        file_name = f"{name}.npy"
+        np.save(os.path.join(self.directory, file_name), array)
+        self.manifest[name] = {'file': file_name, 'version': version, 'shape': list(array.shape),
+                               'dtype': array.dtype.str}
+        # Replace the manifest atomically so attaching workers never read a partial file
+        temporary = os.path.join(self.directory, MANIFEST_FILE + '.tmp')
+        with open(temporary, 'w') as file:
+            json.dump(self.manifest, file)
+        os.replace(temporary, os.path.join(self.directory, MANIFEST_FILE))
+        self._arrays.pop(name, None)
+
+    def get(self, name, version=None):
+        """
+        Zero-copy, read-only view of a published table.
+
+        Args:
+            name (str): Table name
+            version (str): Expected version; None accepts any
+
+        Returns:
+            np.ndarray: Memory-mapped table
+        """
+        if name not in self._arrays:
+            entry = self.manifest.get(name)
+            if entry is None:
+                raise KeyError(f"Table {name} is not published in {self.directory}")
+            if version is not None and entry['version'] != version:
+                raise ValueError(f"Table {name} has version {entry['version']}, expected {version}")
+            array = np.load(os.path.join(self.directory, entry['file']), mmap_mode='r')
+            if list(array.shape) != entry['shape'] or array.dtype.str != entry['dtype']:
+                raise ValueError(f"Table {name} does not match its manifest entry")
+            self._arrays[name] = array
+        return self._arrays[name]
+
+    def close(self):
+        # Drop the mappings; the creator also deletes the files
+        self._arrays.clear()
+        if self.owner and os.path.isdir(self.directory):
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def preflop_csv_version(csv_file=PREFLOP_CSV_FILE):
+    # Content hash, so workers notice a regenerated statistics file
+    with open(csv_file, 'rb') as file:
+        return 'preflop-' + hashlib.sha1(file.read()).hexdigest()[:12]
+
+
+def preflop_win_rate_array(data):
+    """
+    get_win_rate of every one of the 1326 combos (see range_equity.COMBOS).
+    """
+    # Imported here: pyro_simulation pulls in torch, which rank-table-only users do not need
+    from pyro_simulation import get_win_rate
+    return np.array([get_win_rate([fast_evaluator.index_to_card(int(a)), fast_evaluator.index_to_card(int(b))], data)
+                     for a, b in COMBOS])
+
+
+def publish_rank_table(registry):
+    ranks, categories = load_five_card_table()
+    registry.publish('five_card_ranks', ranks, FIVE_CARD_TABLE_VERSION)
+    registry.publish('five_card_categories', categories, FIVE_CARD_TABLE_VERSION)
+
+
+def publish_standard_tables(registry, data=None):
+    """
+    Publish the hand-rank table and the preflop win rates.
+
+    Args:
+        registry (TableRegistry): Registry created by this process
+        data (list): Rows of load_data(PREFLOP_CSV_FILE); loaded when None
+    """
+    publish_rank_table(registry)
+    if data is None:
+        from pyro_simulation import load_data
+        data = load_data(PREFLOP_CSV_FILE)
+    registry.publish('preflop_win_rates', preflop_win_rate_array(data), preflop_csv_version())
+
+
+def attach_worker_tables(directory):
+    """
+    Pool initializer: attach the tables of a registry.
+
+    The shared rank table is installed as fast_evaluator's table, so every
+    evaluator in the worker uses the mapped copy instead of loading its own.
+    """
+    global _worker_registry
+    _worker_registry = TableRegistry(directory)
+    fast_evaluator._five_card_table = (_worker_registry.get('five_card_ranks', FIVE_CARD_TABLE_VERSION),
+                                       _worker_registry.get('five_card_categories', FIVE_CARD_TABLE_VERSION))
+
+
+def preflop_win_rate(player_cards):
+    """
+    get_win_rate from the shared table of an attached worker (O(1) instead of a CSV row scan).
+    """
+    win_rates = _worker_registry.get('preflop_win_rates')
+    return float(win_rates[COMBO_INDEX[tuple(sorted(cards_to_indices(player_cards)))]])
+
+
+def worker_memory_kb():
+    """
+    Private (anonymous) and file-backed resident memory of this process in KiB (Linux).
+
+    Returns:
+        dict: 'private' and 'shared'
+    """
+    fields = {}
+    with open('/proc/self/status') as file:
+        for line in file:
+            key, _, value = line.partition(':')
+            if key in ('RssAnon', 'RssFile', 'RssShmem'):
+                fields[key] = int(value.split()[0])
+    return {'private': fields.get('RssAnon', 0), 'shared': fields.get('RssFile', 0) + fields.get('RssShmem', 0)}
+
+
+def _memory_probe(shared):
+    # Worker task: touch the whole rank table and report memory
+    if not shared:
+        fast_evaluator._five_card_table = None
+    ranks, _ = load_five_card_table()
+    int(ranks.sum())
+    return worker_memory_kb()
+
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    load_five_card_table()
+    for shared in (False, True):
+        with TableRegistry() as registry:
+            options = {}
+            if shared:
+                publish_standard_tables(registry)
+                options = {'initializer': attach_worker_tables, 'initargs': (registry.directory,)}
+            with ProcessPoolExecutor(max_workers=workers, **options) as executor:
+                memory = list(executor.map(_memory_probe, [shared] * workers))
+        private = [probe['private'] for probe in memory]
+        print(f"{'Shared' if shared else 'Per-worker'} tables: private memory per worker "
+              f"{min(private)}-{max(private)} KiB, shared {memory[0]['shared']} KiB")
@@ -0,0 +1,221 @@
+import sys
+import time
+from collections import deque
+import numpy as np
+
+from entire_game import *
+from casino_poker import CasinoPokerGame
+from fast_evaluator import (INDEX_CARD, CATEGORY_SHIFT, SEVEN_CARD_SUBSETS, five_card_strength_array,
+                            seven_card_rank_array)
+
+# Hole cards for the player and dealer plus the five community cards
+CARDS_PER_HAND = 9
+
+
+class Shoe:
+    """
+    Multi-deck shoe of card indices (see fast_evaluator.card_to_index).
+
+    The shoe is one NumPy array shuffled in place; dealing advances a
+    position, so a draw is a slice. Two modes:
+
+    - Cut card: hands are dealt until the position passes the cut card at
+      `penetration` of the shoe, then the whole array is reshuffled in
+      place before the next hand.
+    - Continuous shuffler: the cards of each hand go back into the machine
+      `recycle_delay` hands later and are mixed among the undealt cards by
+      a partial Fisher-Yates pass, so only the returned cards are touched.
+    """
+
+    def __init__(self, num_decks=6, penetration=0.75, continuous=False, recycle_delay=0, seed=None):
+        if not 0 < penetration <= 1:
+            raise ValueError("Penetration must be in (0, 1]")
+        self.num_decks = num_decks
+        self.size = 52 * num_decks
+        self.cards = np.tile(np.arange(52, dtype=np.uint8), num_decks)
+        self.cut_card = int(self.size * penetration)
+        self.continuous = continuous
+        self.recycle_delay = recycle_delay
+        self.rng = np.random.default_rng(seed)
+        self.position = 0
+        self.shuffles = 0
+        self.hands_dealt = 0
+        self._discards = deque()  # Hands waiting to return to the continuous shuffler
+        self.shuffle()
+
+    def shuffle(self):
+        # Reshuffle every card back into the shoe
+        self._discards.clear()
+        self.rng.shuffle(self.cards)
+        self.position = 0
+        self.shuffles += 1
+
+    def _return_cards(self, cards):
+        # Put dealt cards back among the undealt ones at uniformly random positions
+        count = len(cards)
+        self.position -= count
+        self.cards[self.position:self.position + count] = cards
+        offsets = self.rng.random(count)
+        for i in range(count):
+            slot = self.position + i
+            swap = slot + int(offsets[i] * (self.size - slot))
+            self.cards[slot], self.cards[swap] = self.cards[swap], self.cards[slot]
+
+    def deal_hand(self, num_cards=CARDS_PER_HAND):
+        """
+        Deal the cards of one hand.
+
+        Returns:
+            np.ndarray: num_cards uint8 card indices in dealing order
+        """
+        if self.continuous:
+            while len(self._discards) > self.recycle_delay:
+                self._return_cards(self._discards.popleft())
+            if self.position + num_cards > self.size:
+                raise ValueError("Not enough cards in the shuffler for a hand")
+        elif self.position >= self.cut_card or self.position + num_cards > self.size:
+            self.shuffle()
+
+        cards = self.cards[self.position:self.position + num_cards].copy()
+        self.position += num_cards
+        self.hands_dealt += 1
+        if self.continuous:
+            self._discards.append(cards)
+        return cards
+
+    def deal_hands(self, num_hands, num_cards=CARDS_PER_HAND):
+        """
+        Deal many hands in order, equivalent to calling deal_hand repeatedly.
+
+        In cut-card mode every run of hands between shuffles is one reshaped
+        slice of the shoe.
+
+        Returns:
+            np.ndarray: uint8 array of shape (num_hands, num_cards)
+        """
+        if self.continuous:
+            return np.array([self.deal_hand(num_cards) for _ in range(num_hands)], dtype=np.uint8)
+
+        hands = np.empty((num_hands, num_cards), dtype=np.uint8)
+        dealt = 0
+        while dealt < num_hands:
+            if self.position >= self.cut_card or self.position + num_cards > self.size:
+                self.shuffle()
+            # Hands starting before the cut card, limited by the cards left
+            before_cut = -(-(self.cut_card - self.position) // num_cards)
+            count = min(num_hands - dealt, before_cut, (self.size - self.position) // num_cards)
+            end = self.position + count * num_cards
+            hands[dealt:dealt + count] = self.cards[self.position:end].reshape(count, num_cards)
+            self.position = end
+            dealt += count
+        self.hands_dealt += num_hands
+        return hands
+
+
+class ShoePokerGame(PokerGame):
+    """
+    PokerGame dealing from a Shoe instead of a fresh 52-card deck.
+
+    reset_deck takes the next hand's cards from the shoe, so every deal
+    method works unchanged as long as a hand uses at most cards_per_hand
+    cards. A multi-deck shoe can repeat a card within a hand, so cards are
+    not filtered against the ones already dealt.
+    """
+
+    def __init__(self, shoe=None, cards_per_hand=CARDS_PER_HAND):
+        self.shoe = shoe if shoe is not None else Shoe()
+        self.cards_per_hand = cards_per_hand
+        super().__init__()
+
+    def reset_deck(self):
+        # Reversed so that pop() deals in shoe order
+        self.deck = [INDEX_CARD[card] for card in self.shoe.deal_hand(self.cards_per_hand)[::-1]]
+        self.dealt_cards.clear()
+
+    def shuffle_deck(self):
+        # The shoe does the shuffling
+        pass
+
+    def _find_unique_card(self, excluded_cards):
+        if not self.deck:
+            raise ValueError("No more cards dealt to this hand")
+        return self.deck.pop()
+
+
+def seven_card_strengths(hands):
+    """
+    Strength keys of seven-card hands that may repeat cards (multi-deck shoes).
+
+    Every five-card subset is scored with five_card_strength_array, which
+    does not assume distinct cards, so keys match fast_evaluator.hand_strength
+    for single-deck hands.
+
+    Args:
+        hands (np.ndarray): Card indices of shape (N, 7)
+
+    Returns:
+        np.ndarray: int64 strength keys of shape (N,)
+    """
+    subsets = np.asarray(hands)[:, SEVEN_CARD_SUBSETS].reshape(-1, 5)
+    return five_card_strength_array(subsets).reshape(len(hands), -1).max(axis=1)
+
+
+def paytable_study(shoe, num_hands, batch_size=100000):
+    """
+    Trips and blind returns of hands dealt from a shoe.
+
+    Every hand is played to showdown, so the blind return is that of a
+    player who never folds. Returns are per unit bet.
+
+    Args:
+        shoe (Shoe): Shoe to deal from
+        num_hands (int): Hands to deal
+        batch_size (int): Hands dealt and evaluated per vectorized batch
+
+    Returns:
+        dict: 'Trips Return', 'Blind Return', 'Category Frequencies'
+        (HAND_RANKINGS score -> share of player hands), 'Hands' and 'Hands per Minute'
+    """
+    casino_game = CasinoPokerGame()
+    trip_multipliers = np.array([0] + [casino_game.get_trip_multiplier(score) for score in range(1, 11)], dtype=np.float64)
+    blind_multipliers = np.array([0] + [casino_game.get_blind_multiplier(score) for score in range(1, 11)], dtype=np.float64)
+
+    category_counts = np.zeros(11, dtype=np.int64)
+    blind_total = 0.0
+    started = time.perf_counter()
+    remaining = num_hands
+    while remaining:
+        count = min(batch_size, remaining)
+        hands = shoe.deal_hands(count).astype(np.intp)
+        player = np.concatenate([hands[:, :2], hands[:, 4:]], axis=1)
+        dealer = hands[:, 2:]
+        if shoe.num_decks == 1:
+            player_strength, player_category = seven_card_rank_array(player, return_category=True)
+            dealer_strength = seven_card_rank_array(dealer)
+        else:
+            player_strength = seven_card_strengths(player)
+            dealer_strength = seven_card_strengths(dealer)
+            player_category = player_strength >> CATEGORY_SHIFT
+        category_counts += np.bincount(player_category, minlength=11)
+        blind_total += np.where(player_strength > dealer_strength, blind_multipliers[player_category],
+                                np.where(player_strength < dealer_strength, -1.0, 0.0)).sum()
+        remaining -= count
+    elapsed = time.perf_counter() - started
+
+    frequencies = category_counts / num_hands
+    return {
+        'Trips Return': float((frequencies * trip_multipliers).sum()),
+        'Blind Return': blind_total / num_hands,
+        'Category Frequencies': {score: float(frequencies[score]) for score in range(1, 11)},
+        'Hands': num_hands,
+        'Hands per Minute': num_hands / elapsed * 60 if elapsed else None
+    }
+
+
+if __name__ == "__main__":
+    num_decks = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    continuous = len(sys.argv) > 2 and sys.argv[2] == 'csm'
+    result = paytable_study(Shoe(num_decks=num_decks, continuous=continuous, seed=0), 1000000)
+    print(f"Decks: {num_decks}, {'continuous shuffler' if continuous else 'cut card'}")
+    print(f"Trips return: {result['Trips Return']:+.4f}  Blind return: {result['Blind Return']:+.4f}")
+    print(f"Hands per minute: {result['Hands per Minute']:,.0f}")
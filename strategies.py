@@ -0,0 +1,305 @@
+import copy
+import numpy as np
+from functools import cached_property
+
+from fast_evaluator import INDEX_CARD, CATEGORY_SHIFT, cards_to_indices, seven_card_rank_array, category_of_rank
+from range_equity import COMBO_INDEX, COMBO_INDEX_ARRAY
+from board_cache import get_board_ranks, distinct_cards
+from outs_analyzer import DrawAnalysis, draw_features_batch
+from shoe import seven_card_strengths
+import jit_kernels
+
+# Play bet in antes for each street's bet; 0 is a fold
+PLAY_BETS = {'preflop': 4, 'flop': 2, 'river': 1}
+
+_preflop_win_rates = None
+
+
+def _sampled_river_dealer_win(hand, board, num_samples, seed):
+    # Percent of sampled dealer hands beating a hand on a complete board that repeats cards (multi-deck
+    # shoes). The rank tables assume distinct cards, so hands are scored with shoe.seven_card_strengths
+    rng = np.random.default_rng(None if seed is None else int(seed))
+    board = np.asarray(board, dtype=np.int64)
+    known = set(int(card) for card in hand) | set(board.tolist())
+    live = np.array([card for card in range(52) if card not in known], dtype=np.int64)
+    first = rng.integers(len(live), size=num_samples)
+    second = rng.integers(len(live) - 1, size=num_samples)
+    second += second >= first
+    dealer_hands = np.column_stack([live[first], live[second], np.tile(board, (num_samples, 1))])
+    player_strength = seven_card_strengths(np.concatenate([np.asarray(hand, dtype=np.int64), board])[None, :])[0]
+    return 100 * np.count_nonzero(seven_card_strengths(dealer_hands) > player_strength) / num_samples
+
+
+def _repeated_rows(cards):
+    # Rows holding some card twice (multi-deck shoes)
+    cards = np.sort(cards, axis=1)
+    return (cards[:, 1:] == cards[:, :-1]).any(axis=1)
+
+
+def preflop_win_rates():
+    """
+    get_win_rate of each of the 1326 combos (see range_equity.COMBOS), looked up once.
+    """
+    global _preflop_win_rates
+    if _preflop_win_rates is None:
+        # Imported here: pyro_simulation pulls in torch and the CSV
+        from pyro_simulation import data
+        from shared_tables import preflop_win_rate_array
+        _preflop_win_rates = preflop_win_rate_array(data)
+    return _preflop_win_rates
+
+
+class HandState:
+    """
+    What the player knows about one deal, with the equity features the strategies read.
+
+    Features are computed on first access and then shared by every strategy
+    looking at the same deal, so comparing strategies costs one estimate per
+    feature and deal.
+
+    Args:
+        cards (np.ndarray): Nine card indices: player, dealer, then the five board cards
+        player_category (int): HAND_RANKINGS score of the player's final hand
+        flop_samples (int): Dealer hands and runouts sampled for the flop feature
+        seed (int): Seed of the flop sample
+    """
+
+    def __init__(self, cards, player_category, flop_samples=1000, seed=None):
+        self.hand = [int(card) for card in cards[:2]]
+        self.board = [int(card) for card in cards[4:9]]
+        self.player_category = int(player_category)
+        self.flop_samples = flop_samples
+        self.seed = seed
+
+    @cached_property
+    def preflop_win_rate(self):
+        # Fraction, as in poker_hand_statistics.csv
+        return float(preflop_win_rates()[COMBO_INDEX[tuple(sorted(self.hand))]])
+
+    @cached_property
+    def flop_dealer_win(self):
+        # Percent, the 'Player 2 Win' of simulate_scenario_1
+        wins, losses, ties = jit_kernels.showdown_tally([INDEX_CARD[card] for card in self.hand],
+                                                        [INDEX_CARD[card] for card in self.board[:3]],
+                                                        self.flop_samples, self.seed)
+        return 100 * losses / self.flop_samples
+
+    @cached_property
+    def river_dealer_win(self):
+        # Percent, exact over every dealer holding like simulate_scenario_3(exact=True)
+        if not distinct_cards(self.hand + self.board):
+            # Repeated cards from a multi-deck shoe: sample the dealer hands instead
+            return _sampled_river_dealer_win(self.hand, self.board[:5], self.flop_samples, self.seed)
+        wins, losses, ties = get_board_ranks([INDEX_CARD[card] for card in self.board]).counts(self.hand)
+        return 100 * losses / (wins + losses + ties)
+
+    @cached_property
+    def flop_draws(self):
+        # Outs and draws on the flop (outs_analyzer.DrawAnalysis)
+        return DrawAnalysis([INDEX_CARD[card] for card in self.hand], [INDEX_CARD[card] for card in self.board[:3]])
+
+
+class HandBatch:
+    """
+    Many decision states at once: hole cards, the known board and lazily computed feature arrays.
+
+    Each feature is computed with one vectorized or compiled call (see
+    jit_kernels) for the rows that ask for it. Subsets share their
+    parent's feature cache, so a street only pays for the hands still
+    undecided, and several strategies deciding on subsets of one batch
+    reuse each other's values. Every row has its own sampling seed, so a
+    row's flop estimate is the same in whichever subset it is computed.
+
+    Args:
+        hands (np.ndarray): (N, 2) card indices
+        boards (np.ndarray): (N, B) known board card indices (B = 0, 3, 4 or 5)
+        flop_samples (int): Dealer hands and runouts sampled for flop_dealer_win
+        seed (int): Seed of the per-row sampling seeds
+        seeds (np.ndarray): Per-row sampling seeds to use instead (e.g. the HandState seeds of the same deals)
+    """
+
+    def __init__(self, hands, boards=None, flop_samples=1000, seed=None, seeds=None):
+        self.hands = np.asarray(hands, dtype=np.int64).reshape(-1, 2)
+        if boards is None:
+            boards = np.empty((len(self.hands), 0), dtype=np.int64)
+        self.boards = np.asarray(boards, dtype=np.int64).reshape(len(self.hands), -1)
+        self.flop_samples = flop_samples
+        if seeds is None:
+            seeds = np.random.default_rng(seed).integers(1 << 31, size=len(self.hands))
+        self.seeds = np.asarray(seeds, dtype=np.int64).reshape(len(self.hands))
+        # Row numbers in the batch that owns the feature cache
+        self.rows = np.arange(len(self.hands))
+        self.size = len(self.hands)
+        self._features = {}
+
+    @classmethod
+    def from_cards(cls, hands, boards=None, **kwargs):
+        """
+        Build a batch from lists of (rank, suit) cards.
+        """
+        return cls([cards_to_indices(hand) for hand in hands],
+                   None if boards is None else [cards_to_indices(board) for board in boards], **kwargs)
+
+    def __len__(self):
+        return len(self.hands)
+
+    def subset(self, rows):
+        """
+        Returns:
+            HandBatch: The selected rows (boolean mask or indices), sharing this batch's features
+        """
+        batch = copy.copy(self)
+        batch.hands = self.hands[rows]
+        batch.boards = self.boards[rows]
+        batch.seeds = self.seeds[rows]
+        batch.rows = self.rows[rows]
+        return batch
+
+    def _feature(self, name, compute):
+        # Cached values of the owning batch (NaN until computed), filling in the rows still missing
+        values = self._features.get(name)
+        if values is None:
+            values = self._features[name] = np.full(self.size, np.nan)
+        missing = np.isnan(values[self.rows])
+        if missing.any():
+            values[self.rows[missing]] = compute(self.hands[missing], self.boards[missing], self.seeds[missing])
+        return values[self.rows]
+
+    def _feature_group(self, name, compute):
+        # Like _feature for features computed together: compute returns a dict filling every one of them
+        values = self._features.get(name)
+        if values is None or np.isnan(values[self.rows]).any():
+            missing = np.isnan(values[self.rows]) if values is not None else np.ones(len(self.rows), dtype=bool)
+            group = compute(self.hands[missing], self.boards[missing], self.seeds[missing])
+            for key, computed in group.items():
+                cache = self._features.setdefault(key, np.full(self.size, np.nan))
+                cache[self.rows[missing]] = computed
+            values = self._features[name]
+        return values[self.rows]
+
+    def _flop_draw_features(self, hands, boards, seeds):
+        # One draw kernel call for both flop draw features
+        features = draw_features_batch(hands, boards[:, :3])
+        return {'flop_outs': features['outs'], 'flop_improve_probability': features['improve_probability']}
+
+    @property
+    def preflop_win_rate(self):
+        return self._feature('preflop_win_rate',
+                             lambda hands, boards, seeds: preflop_win_rates()[COMBO_INDEX_ARRAY[hands[:, 0], hands[:, 1]]])
+
+    @property
+    def flop_dealer_win(self):
+        def compute(hands, boards, seeds):
+            tallies = jit_kernels.showdown_tally_batch(hands, boards[:, :3], self.flop_samples, seeds)
+            return 100 * tallies[:, 1] / self.flop_samples
+        return self._feature('flop_dealer_win', compute)
+
+    @property
+    def river_dealer_win(self):
+        def compute(hands, boards, seeds):
+            repeated = _repeated_rows(np.concatenate([hands, boards[:, :5]], axis=1))
+            values = np.empty(len(hands))
+            tallies = jit_kernels.river_tally_batch(hands[~repeated], boards[~repeated, :5])
+            values[~repeated] = 100 * tallies[:, 1] / tallies.sum(axis=1)
+            # Repeated cards from a multi-deck shoe are sampled, as in HandState
+            for row in np.flatnonzero(repeated):
+                values[row] = _sampled_river_dealer_win(hands[row], boards[row, :5], self.flop_samples, seeds[row])
+            return values
+        return self._feature('river_dealer_win', compute)
+
+    @property
+    def flop_outs(self):
+        # Next cards improving the flop category (see outs_analyzer.draw_features_batch)
+        return self._feature_group('flop_outs', self._flop_draw_features)
+
+    @property
+    def flop_improve_probability(self):
+        # Exact probability of finishing a better category than on the flop
+        return self._feature_group('flop_improve_probability', self._flop_draw_features)
+
+    @property
+    def player_category(self):
+        # HAND_RANKINGS score of the player's final hand
+        def compute(hands, boards, seeds):
+            cards = np.concatenate([hands, boards[:, :5]], axis=1)
+            repeated = _repeated_rows(cards)
+            categories = np.empty(len(cards))
+            categories[~repeated] = category_of_rank(seven_card_rank_array(cards[~repeated]))
+            if repeated.any():
+                # Repeated cards from a multi-deck shoe are scored without the rank table
+                categories[repeated] = seven_card_strengths(cards[repeated]) >> CATEGORY_SHIFT
+            return categories
+        return self._feature('player_category', compute)
+
+
+def batch_play_bets(strategy, batch):
+    """
+    Play bets of a batch strategy: one decision call per street over the hands still undecided.
+
+    Returns:
+        np.ndarray: Play bets in antes (4, 2, 1) or 0 for a fold, per row
+    """
+    play_bets = np.zeros(len(batch), dtype=np.int64)
+    rows = np.arange(len(batch))
+    for street, decide in (('preflop', strategy.bet_preflop_batch), ('flop', strategy.bet_flop_batch),
+                           ('river', strategy.bet_river_batch)):
+        if not len(rows):
+            break
+        bets = np.asarray(decide(batch), dtype=bool)
+        play_bets[rows[bets]] = PLAY_BETS[street]
+        rows = rows[~bets]
+        batch = batch.subset(~bets)
+    return play_bets
+
+
+class ThresholdStrategy:
+    """
+    The equity thresholds of CasinoGameSimulator as a strategy object.
+
+    Decisions are available per hand (play_bet on a HandState) and as the
+    batch protocol (bet_*_batch on a HandBatch, returning boolean arrays).
+
+    Bet 4x when the preflop win rate exceeds preflop_win_rate, 2x when the
+    dealer wins less than flop_dealer_win percent on the flop, and 1x on
+    the river with better than river_category (two pair) or when the dealer
+    wins less than river_dealer_win percent; fold otherwise.
+    """
+
+    def __init__(self, preflop_win_rate=0.56, flop_dealer_win=40, river_category=3, river_dealer_win=45, name=None):
+        self.preflop_win_rate = preflop_win_rate
+        self.flop_dealer_win = flop_dealer_win
+        self.river_category = river_category
+        self.river_dealer_win = river_dealer_win
+        self.name = name or (f"threshold({preflop_win_rate}, {flop_dealer_win}, "
+                             f"{river_category}, {river_dealer_win})")
+
+    def bet_preflop(self, state):
+        return state.preflop_win_rate > self.preflop_win_rate
+
+    def bet_flop(self, state):
+        return state.flop_dealer_win < self.flop_dealer_win
+
+    def bet_river(self, state):
+        return state.player_category > self.river_category or state.river_dealer_win < self.river_dealer_win
+
+    def bet_preflop_batch(self, batch):
+        return batch.preflop_win_rate > self.preflop_win_rate
+
+    def bet_flop_batch(self, batch):
+        return batch.flop_dealer_win < self.flop_dealer_win
+
+    def bet_river_batch(self, batch):
+        return (batch.player_category > self.river_category) | (batch.river_dealer_win < self.river_dealer_win)
+
+    def play_bet(self, state):
+        """
+        Returns:
+            int: Play bet in antes (4, 2, 1) or 0 for a fold
+        """
+        if self.bet_preflop(state):
+            return PLAY_BETS['preflop']
+        if self.bet_flop(state):
+            return PLAY_BETS['flop']
+        if self.bet_river(state):
+            return PLAY_BETS['river']
+        return 0
@@ -0,0 +1,154 @@
+import time
+import argparse
+import numpy as np
+from statistics import NormalDist
+
+from fast_evaluator import seven_card_rank_array
+from strategy_solver import BLIND_MULTIPLIERS, FOLD_EV
+from deal_corpus import DealCorpus
+from strategies import HandState, HandBatch, ThresholdStrategy, batch_play_bets
+
+
+def deal_hands(num_hands, rng):
+    """
+    Independent deals as card indices.
+
+    Returns:
+        np.ndarray: (num_hands, 9) player cards, dealer cards, then the five board cards
+    """
+    return rng.permuted(np.tile(np.arange(52), (num_hands, 1)), axis=1)[:, :9]
+
+
+def showdown(deals):
+    """
+    Rank both hands of every deal once.
+
+    Returns:
+        tuple: (player ranks, dealer ranks, player categories, dealer categories)
+    """
+    board = deals[:, 4:9]
+    player_ranks, player_categories = seven_card_rank_array(np.concatenate([deals[:, :2], board], axis=1), True)
+    dealer_ranks, dealer_categories = seven_card_rank_array(np.concatenate([deals[:, 2:4], board], axis=1), True)
+    return player_ranks, dealer_ranks, player_categories, dealer_categories
+
+
+def settle(play_bets, player_ranks, dealer_ranks, player_categories, dealer_categories):
+    """
+    Net result in antes of play bets on known showdowns, following resolve_round (no trips).
+
+    Args:
+        play_bets (np.ndarray): Play bets in antes, 0 for a fold; any shape ending in the hand axis
+
+    Returns:
+        np.ndarray: Net results with the shape of play_bets
+    """
+    win = player_ranks > dealer_ranks
+    loss = player_ranks < dealer_ranks
+    # The ante pushes when the dealer does not qualify (high card)
+    win_net = play_bets + BLIND_MULTIPLIERS[player_categories] + (dealer_categories >= 2)
+    net = np.where(win, win_net, np.where(loss, -(2 + play_bets), 0.0))
+    return np.where(play_bets == 0, FOLD_EV, net)
+
+
+def compare_strategies(strategies, num_hands=10000, seed=None, flop_samples=1000, confidence=0.95, deals=None):
+    """
+    Play several strategies on the same deals (common random numbers).
+
+    Every hand is dealt once and both showdown hands are ranked once. Batch
+    strategies (bet_*_batch) decide on one shared HandBatch, one call per
+    street; other strategies pick their play bet per hand from one shared
+    HandState. The batch rows and the HandStates sample from the same
+    per-deal seeds, so each equity feature is estimated once per deal and
+    seen identically by every strategy. Because the strategies
+    face identical cards, the per-hand differences to the first strategy
+    cancel most of the deal-to-deal variance.
+
+    Args:
+        strategies (list): Batch strategies or objects with play_bet(state); the first is the baseline
+        num_hands (int): Deals
+        seed (int): Seed of the deals and of the flop samples
+        flop_samples (int): Samples of the flop equity feature
+        confidence (float): Confidence level of the intervals
+        deals (np.ndarray): (N, 9) deals to play instead of dealing num_hands (e.g. a DealCorpus slice)
+
+    Returns:
+        dict: 'nets' (strategies x hands, in antes) and per strategy rows of
+            'EV', 'EV CI', 'Diff' and 'Diff CI' (paired difference to the baseline)
+            and 'Independent CI' (the half-width two separate runs would give)
+    """
+    rng = np.random.default_rng(seed)
+    if deals is None:
+        deals = deal_hands(num_hands, rng)
+    num_hands = len(deals)
+    flop_seeds = rng.integers(1 << 31, size=num_hands)
+    player_ranks, dealer_ranks, player_categories, dealer_categories = showdown(deals)
+
+    play_bets = np.zeros((len(strategies), num_hands), dtype=np.int64)
+    batch = HandBatch(deals[:, :2], deals[:, 4:9], flop_samples, seeds=flop_seeds)
+    per_hand = []
+    for k, strategy in enumerate(strategies):
+        if hasattr(strategy, 'bet_preflop_batch'):
+            play_bets[k] = batch_play_bets(strategy, batch)
+        else:
+            per_hand.append(k)
+    if per_hand:
+        for i in range(num_hands):
+            state = HandState(deals[i], player_categories[i], flop_samples, int(flop_seeds[i]))
+            for k in per_hand:
+                play_bets[k, i] = strategies[k].play_bet(state)
+
+    nets = settle(play_bets, player_ranks, dealer_ranks, player_categories, dealer_categories)
+    return summarize_nets(nets, [strategy.name for strategy in strategies], confidence)
+
+
+def summarize_nets(nets, names, confidence=0.95):
+    # Means with normal intervals, and paired differences to the first row
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    num_hands = nets.shape[1]
+    rows = []
+    for k, name in enumerate(names):
+        differences = nets[k] - nets[0]
+        ev_error = z * nets[k].std(ddof=1) / np.sqrt(num_hands)
+        diff_error = z * differences.std(ddof=1) / np.sqrt(num_hands)
+        # Half-width an independent run of each strategy would have given
+        independent_error = z * np.sqrt(nets[k].var(ddof=1) + nets[0].var(ddof=1)) / np.sqrt(num_hands)
+        rows.append({
+            'Strategy': name,
+            'EV': float(nets[k].mean()),
+            'EV CI': float(ev_error),
+            'Diff': float(differences.mean()),
+            'Diff CI': float(diff_error),
+            'Independent CI': float(independent_error)
+        })
+    return {'nets': nets, 'rows': rows}
+
+
+def print_comparison(result):
+    for row in result['rows']:
+        print(f"{row['Strategy']:40s} EV {row['EV']:+.4f} ± {row['EV CI']:.4f}  "
+              f"diff {row['Diff']:+.4f} ± {row['Diff CI']:.4f} (independent runs ± {row['Independent CI']:.4f})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare threshold strategies on common deals")
+    parser.add_argument('--hands', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--flop-samples', type=int, default=1000)
+    parser.add_argument('--corpus', help="Play the first --hands deals of a deal_corpus.py file")
+    args = parser.parse_args(argv)
+
+    strategies = [
+        ThresholdStrategy(name='bot'),
+        ThresholdStrategy(river_dealer_win=50, name='river 50%'),
+        ThresholdStrategy(flop_dealer_win=45, name='flop 45%'),
+        ThresholdStrategy(preflop_win_rate=0.55, name='preflop 0.55')
+    ]
+    started = time.perf_counter()
+    deals = DealCorpus(args.corpus).slice(0, args.hands) if args.corpus else None
+    result = compare_strategies(strategies, args.hands, args.seed, args.flop_samples, deals=deals)
+    print_comparison(result)
+    print(f"{args.hands} hands in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
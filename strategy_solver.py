@@ -0,0 +1,301 @@
+import os
+import sys
+import random
+import itertools
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+from casino_poker import CasinoPokerGame
+from range_equity import *
+from shared_tables import TableRegistry, publish_rank_table, attach_worker_tables
+
+# Play bet sizes in antes for each street
+PREFLOP_PLAY = 4
+FLOP_PLAY = 2
+RIVER_PLAY = 1
+
+# Folding forfeits the ante and the blind
+FOLD_EV = -2.0
+
+SOLVER_CACHE_DIR = os.path.join(TABLE_DIR, 'solver')
+STRATEGY_TABLE_FILE = 'strategy_table.npz'
+
+# Blind payout multiplier of each HAND_RANKINGS score, taken from resolve_round's paytable
+BLIND_MULTIPLIERS = np.array([0.0] + [CasinoPokerGame().get_blind_multiplier(score) for score in range(1, 11)])
+
+SUIT_PERMUTATIONS = list(itertools.permutations(range(4)))
+
+
+def permute_cards(cards, permutation):
+    # Relabel the suits of card indices
+    return [card & ~3 | permutation[card & 3] for card in cards]
+
+
+def canonical_flop(flop):
+    """
+    Canonical representative of a flop under suit relabelling.
+
+    Args:
+        flop (list): Three card indices
+
+    Returns:
+        tuple: (canonical sorted card indices, the suit permutation mapping flop onto it)
+    """
+    best = None
+    for permutation in SUIT_PERMUTATIONS:
+        candidate = tuple(sorted(permute_cards(flop, permutation)))
+        if best is None or candidate < best[0]:
+            best = (candidate, permutation)
+    return best
+
+
+def canonical_flops():
+    """
+    Every suit-isomorphic flop class.
+
+    Returns:
+        tuple: (flops as an (N, 3) array, number of raw flops in each class)
+    """
+    counts = {}
+    for flop in itertools.combinations(range(52), 3):
+        canonical = canonical_flop(flop)[0]
+        counts[canonical] = counts.get(canonical, 0) + 1
+    flops = sorted(counts)
+    return np.array(flops, dtype=np.intp), np.array([counts[flop] for flop in flops])
+
+
+def showdown_ev(ranks, unblocked, play_bet):
+    """
+    Exact EV of every hero combo calling with play_bet on a complete board.
+
+    The dealer holds any unblocked combo with equal probability. Payouts
+    follow resolve_round with equal ante and blind: a win pays the play
+    bet, the ante unless the dealer fails to qualify (high card, ante
+    pushes) and the blind paytable; a loss costs ante, blind and play;
+    a tie pushes everything.
+
+    Args:
+        ranks (np.ndarray): combo_ranks of the board
+        unblocked (np.ndarray): Boolean mask of combos not sharing a card with the board
+        play_bet (int): Play bet in antes (4, 2 or 1)
+
+    Returns:
+        np.ndarray: EV in antes per hero combo (0 where blocked)
+    """
+    weights = unblocked.astype(np.float64)
+    categories = category_of_rank(ranks)
+    qualified = np.where(categories >= 2, weights, 0.0)
+    wins, ties, totals = showdown_weights(ranks, weights, weights)
+    qualified_wins, _, _ = showdown_weights(ranks, weights, qualified)
+    losses = totals - wins - ties
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ev = (wins * (play_bet + BLIND_MULTIPLIERS[categories]) + qualified_wins
+              - losses * (2 + play_bet)) / totals
+    return np.where(unblocked, ev, 0.0)
+
+
+def solve_river(board):
+    """
+    River stage: EV of a 1x play bet and of folding for every hero combo.
+
+    Args:
+        board (list): Five card indices
+
+    Returns:
+        tuple: (bet EV, fold EV) arrays over the 1326 combos
+    """
+    unblocked = (COMBO_MASKS & board_mask(board)) == 0
+    return showdown_ev(combo_ranks(board), unblocked, RIVER_PLAY), np.where(unblocked, FOLD_EV, 0.0)
+
+
+def solve_flop(flop):
+    """
+    Flop stage: EV of a 2x play bet and of checking for every hero combo.
+
+    Checking is valued by backward induction: for every turn and river the
+    hero plays the better of the river bet and folding. The 4x preflop bet
+    EV on this flop is collected in the same pass for the preflop stage.
+
+    Args:
+        flop (list): Three card indices
+
+    Returns:
+        dict: 'bet', 'check' and 'preflop_bet' EV arrays over the 1326 combos
+        (NaN for combos blocked by the flop)
+    """
+    flop_unblocked = (COMBO_MASKS & board_mask(flop)) == 0
+    bet = np.zeros(NUM_COMBOS)
+    check = np.zeros(NUM_COMBOS)
+    preflop_bet = np.zeros(NUM_COMBOS)
+    runouts = np.zeros(NUM_COMBOS)
+
+    remaining = [card for card in range(52) if card not in flop]
+    for turn_river in itertools.combinations(remaining, 2):
+        board = list(flop) + list(turn_river)
+        unblocked = (COMBO_MASKS & board_mask(board)) == 0
+        ranks = combo_ranks(board)
+        river_bet = showdown_ev(ranks, unblocked, RIVER_PLAY)
+        bet += showdown_ev(ranks, unblocked, FLOP_PLAY)
+        preflop_bet += showdown_ev(ranks, unblocked, PREFLOP_PLAY)
+        check += np.where(unblocked, np.maximum(river_bet, FOLD_EV), 0.0)
+        runouts += unblocked
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return {
+            'bet': np.where(flop_unblocked, bet / runouts, np.nan),
+            'check': np.where(flop_unblocked, check / runouts, np.nan),
+            'preflop_bet': np.where(flop_unblocked, preflop_bet / runouts, np.nan)
+        }
+
+
+def _flop_cache_path(flop, cache_dir):
+    return os.path.join(cache_dir, 'flop_' + '_'.join(str(card) for card in flop) + '.npz')
+
+
+def _solve_flop_job(job):
+    # Worker entry point: solve one canonical flop, reusing the stage cache
+    flop, cache_dir = job
+    path = _flop_cache_path(flop, cache_dir)
+    if os.path.exists(path):
+        with np.load(path) as cached:
+            return {key: cached[key] for key in cached.files}
+    result = solve_flop(flop)
+    os.makedirs(cache_dir, exist_ok=True)
+    np.savez_compressed(path, **result)
+    return result
+
+
+class StrategyTable:
+    """
+    Basic strategy computed by solve_strategy.
+
+    Preflop decisions are keyed by preflop class ("AKs", "1010"), flop
+    decisions by canonical flop and hero combo. River decisions are solved
+    exactly on demand (one board ranking), so they need no table.
+    """
+
+    def __init__(self, preflop_classes, preflop_bet, preflop_check, flops, flop_bet, flop_check):
+        self.preflop = {combo_class: (bet, check) for combo_class, bet, check
+                        in zip(preflop_classes, preflop_bet, preflop_check)}
+        self.flops = np.asarray(flops)
+        self.flop_bet = np.asarray(flop_bet)
+        self.flop_check = np.asarray(flop_check)
+        self.flop_rows = {tuple(int(card) for card in flop): row for row, flop in enumerate(self.flops)}
+
+    @classmethod
+    def load(cls, path=STRATEGY_TABLE_FILE):
+        with np.load(path) as table:
+            return cls(table['preflop_classes'].tolist(), table['preflop_bet'], table['preflop_check'],
+                       table['flops'], table['flop_bet'], table['flop_check'])
+
+    def save(self, path=STRATEGY_TABLE_FILE):
+        classes = sorted(self.preflop)
+        np.savez_compressed(path, preflop_classes=np.array(classes),
+                            preflop_bet=np.array([self.preflop[c][0] for c in classes]),
+                            preflop_check=np.array([self.preflop[c][1] for c in classes]),
+                            flops=self.flops, flop_bet=self.flop_bet, flop_check=self.flop_check)
+
+    def preflop_action(self, hand):
+        """
+        Returns:
+            bool: True to make the 4x bet, None if the class is not in the table
+        """
+        evs = self.preflop.get(get_preflop_abstraction(hand))
+        if evs is None:
+            return None
+        return evs[0] > evs[1]
+
+    def flop_action(self, hand, flop):
+        """
+        Returns:
+            bool: True to make the 2x bet, None if the flop was not solved
+        """
+        canonical, permutation = canonical_flop(cards_to_indices(flop))
+        row = self.flop_rows.get(canonical)
+        if row is None:
+            return None
+        combo = COMBO_INDEX[tuple(sorted(permute_cards(cards_to_indices(hand), permutation)))]
+        return self.flop_bet[row, combo] > self.flop_check[row, combo]
+
+    def river_action(self, hand, community_cards):
+        """
+        Returns:
+            bool: True to make the 1x bet, False to fold
+        """
+        bet, fold = solve_river(cards_to_indices(community_cards))
+        return bet[COMBO_INDEX[tuple(sorted(cards_to_indices(hand)))]] > FOLD_EV
+
+
+def solve_strategy(num_flops=None, workers=None, cache_dir=SOLVER_CACHE_DIR, seed=None):
+    """
+    Solve the ante/blind/play decisions by backward induction.
+
+    River values feed the flop stage (solve_flop), whose check and bet
+    values feed the preflop stage: checking preflop is worth the flop
+    decision's better EV averaged over flops, betting 4x is the showdown
+    EV over every flop, runout and dealer hand. Flops are solved in
+    parallel processes and cached one file per canonical flop.
+
+    Args:
+        num_flops (int): Solve only this many randomly drawn flops (all 1755
+            canonical flops when None); the preflop stage is then approximate
+        workers (int): Worker processes (os.cpu_count() when None)
+        cache_dir (str): Directory of the per-flop stage cache
+        seed (int): Seed of the flop sample
+
+    Returns:
+        StrategyTable: The solved strategy
+    """
+    flops, counts = canonical_flops()
+    if num_flops is not None:
+        sampled = random.Random(seed).sample(range(len(flops)), min(num_flops, len(flops)))
+        flops, counts = flops[sorted(sampled)], counts[sorted(sampled)]
+
+    jobs = [(tuple(int(card) for card in flop), cache_dir) for flop in flops]
+    # Workers map one shared copy of the rank table instead of loading their own
+    with TableRegistry() as registry:
+        publish_rank_table(registry)
+        with ProcessPoolExecutor(max_workers=workers, initializer=attach_worker_tables,
+                                 initargs=(registry.directory,)) as executor:
+            results = list(executor.map(_solve_flop_job, jobs))
+    return assemble_strategy(flops, counts, results)
+
+
+def assemble_strategy(flops, counts, results):
+    """
+    Preflop stage and StrategyTable from solved flops.
+
+    Args:
+        flops (np.ndarray): (N, 3) canonical flops
+        counts (np.ndarray): Raw flops in each canonical flop class
+        results (list): solve_flop result of each flop, in the same order
+
+    Returns:
+        StrategyTable: The solved strategy
+    """
+    flop_bet = np.array([result['bet'] for result in results])
+    flop_check = np.array([result['check'] for result in results])
+    preflop_bet = np.array([result['preflop_bet'] for result in results])
+
+    # Summing a class over its combos makes each flop's contribution suit-invariant,
+    # so canonical flops weighted by their class sizes stand in for all 22100 flops
+    live = ~np.isnan(flop_bet)
+    weights = counts[:, None] * live
+    flop_value = np.where(live, np.maximum(flop_bet, flop_check), 0.0)
+    classes = sorted(set(COMBO_CLASSES))
+    class_bet, class_check = [], []
+    for combo_class in classes:
+        members = np.array([c == combo_class for c in COMBO_CLASSES])
+        total = weights[:, members].sum()
+        class_bet.append((np.where(live, preflop_bet, 0.0)[:, members] * weights[:, members]).sum() / total)
+        class_check.append((flop_value[:, members] * weights[:, members]).sum() / total)
+
+    return StrategyTable(classes, class_bet, class_check, flops, flop_bet, flop_check)
+
+
+if __name__ == "__main__":
+    num_flops = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    table = solve_strategy(num_flops=num_flops, seed=0)
+    table.save()
+    for combo_class, (bet, check) in sorted(table.preflop.items(), key=lambda item: -item[1][0]):
+        print(f"{combo_class:5s} bet 4x {bet:+.3f}  check {check:+.3f}  -> {'bet' if bet > check else 'check'}")
@@ -0,0 +1,190 @@
+import sys
+import time
+
+from entire_game import *
+from casino_poker import *
+from fast_evaluator import hand_strength, hand_category, cards_to_indices
+from strategy_solver import StrategyTable
+from strategies import PLAY_BETS, HandBatch, ThresholdStrategy, batch_play_bets
+
+# Dealer hands and runouts sampled per flop decision, the trials of simulate_scenario_1
+FLOP_SAMPLES = 100 * 100
+
+
+class TableSimulator:
+    """
+    Ultimate Texas Hold'em table with several seats against one dealer.
+
+    Every seat has its own CasinoPokerGame (stack and bets). All hole cards,
+    the dealer hand and the board come out of one shuffled deck, so seats
+    remove each other's cards. Per deal the dealer hand is evaluated once
+    and the seats' decisions share one HandBatch; each seat then only
+    evaluates its own hand.
+
+    Seats play the same decisions as CasinoGameSimulator: the strategy
+    table where it has an entry, otherwise the strategy, by default the
+    simulator's equity thresholds (ThresholdStrategy).
+    """
+
+    def __init__(self, num_seats=6, initial_stack=1000, min_bet=10, max_bet=100, min_trip=5, max_trip=100,
+                 strategy_table=None, strategy=None, flop_samples=FLOP_SAMPLES):
+        if not 1 <= num_seats <= 6:
+            raise ValueError("A table seats 1 to 6 players")
+        self.poker_game = PokerGame()
+        self.seats = [CasinoPokerGame(initial_player_stack=initial_stack, min_amount=min_bet, max_amount=max_bet,
+                                      min_trip_bet=min_trip, max_trip_bet=max_trip)
+                      for _ in range(num_seats)]
+
+        if isinstance(strategy_table, str):
+            strategy_table = StrategyTable.load(strategy_table)
+        self.strategy_table = strategy_table
+        self.strategy = strategy if strategy is not None else ThresholdStrategy()
+        self.flop_samples = flop_samples
+
+        # Stats tracking
+        self.total_rounds = 0
+        self.hands_won = [0] * num_seats
+        self.elapsed = 0.0
+
+    def deal_round(self):
+        """
+        Deal every seat, the dealer and the board from one deck.
+
+        Returns:
+            dict: 'Seats' (list of hole cards), 'Dealer' and 'Community Cards'
+        """
+        self.poker_game.reset_deck()
+        deck = self.poker_game.deck
+        seat_hands = [[deck.pop(), deck.pop()] for _ in self.seats]
+        dealer_hand = [deck.pop(), deck.pop()]
+        community_cards = [deck.pop() for _ in range(5)]
+        return {'Seats': seat_hands, 'Dealer': dealer_hand, 'Community Cards': community_cards}
+
+    def _play_bets(self, hands, community_cards):
+        """
+        Play bet in antes (4, 2, 1, or 0 to fold) of each seated hand.
+        """
+        batch = HandBatch.from_cards(hands, [community_cards] * len(hands), flop_samples=self.flop_samples)
+        if not self.strategy_table:
+            return batch_play_bets(self.strategy, batch)
+
+        play_bets = [0] * len(hands)
+        for row, hand in enumerate(hands):
+            state = batch.subset([row])
+            streets = (('preflop', lambda: self.strategy_table.preflop_action(hand), self.strategy.bet_preflop_batch),
+                       ('flop', lambda: self.strategy_table.flop_action(hand, community_cards[:3]),
+                        self.strategy.bet_flop_batch),
+                       ('river', lambda: self.strategy_table.river_action(hand, community_cards),
+                        self.strategy.bet_river_batch))
+            for street, table_action, decide in streets:
+                action = table_action()
+                if action is None:
+                    action = bool(decide(state)[0])
+                if action:
+                    play_bets[row] = PLAY_BETS[street]
+                    break
+        return play_bets
+
+    def play_round(self, start_bet=10, make_trip_bet=False, trip_bet_amount=0, deal=None):
+        """
+        Play one deal for every seat that can still cover its bets.
+
+        Args:
+            start_bet (int): Ante (the blind matches it)
+            make_trip_bet (bool): Whether every seat places a trips bet
+            trip_bet_amount (int): Trips bet per seat
+            deal (dict): Cards to use instead of a fresh deal (see deal_round)
+
+        Returns:
+            list: Per seat the winner code (1 seat, 2 dealer, 3 tie), 'fold', or None if the seat sat out
+        """
+        started = time.perf_counter()
+        if deal is None:
+            deal = self.deal_round()
+        community_cards = deal['Community Cards']
+        board = cards_to_indices(community_cards)
+
+        # Shared per deal: the dealer's hand
+        dealer_strength = hand_strength(cards_to_indices(deal['Dealer']) + board)
+        dealer_score = hand_category(dealer_strength)
+
+        outcomes = [None] * len(self.seats)
+        seated = []
+        for seat, casino_game in enumerate(self.seats):
+            if casino_game.is_game_over() or not casino_game.place_bet(start_bet):
+                continue
+            casino_game.place_blind_bet()
+            if make_trip_bet and trip_bet_amount > 0:
+                casino_game.place_trip_bet(trip_bet_amount)
+            seated.append(seat)
+
+        play_bets = self._play_bets([deal['Seats'][seat] for seat in seated], community_cards) if seated else []
+        for seat, play_bet in zip(seated, play_bets):
+            casino_game = self.seats[seat]
+            hand_indices = cards_to_indices(deal['Seats'][seat])
+            if play_bet == PLAY_BETS['preflop']:
+                casino_game.place_pre_flop_bet()
+            elif play_bet == PLAY_BETS['flop']:
+                casino_game.place_flop_bet()
+            elif play_bet == PLAY_BETS['river']:
+                casino_game.place_river_bet()
+            else:
+                casino_game.fold()
+                outcomes[seat] = 'fold'
+                continue
+
+            player_strength = hand_strength(hand_indices + board)
+            if player_strength > dealer_strength:
+                winner = 1
+                self.hands_won[seat] += 1
+            elif player_strength < dealer_strength:
+                winner = 2
+            else:
+                winner = 3
+            casino_game.resolve_round(hand_category(player_strength), dealer_score, winner)
+            outcomes[seat] = winner
+
+        self.total_rounds += 1
+        self.elapsed += time.perf_counter() - started
+        return outcomes
+
+    def simulate_session(self, num_rounds=100, start_bet=10, make_trip_bet=False, trip_bet_amount=0):
+        """Play rounds until num_rounds or until every seat is out of chips"""
+        for _ in range(num_rounds):
+            if all(casino_game.is_game_over() for casino_game in self.seats):
+                break
+            self.play_round(start_bet, make_trip_bet, trip_bet_amount)
+        self._print_session_stats()
+
+    def get_seat_stats(self):
+        """
+        Returns:
+            list: Per seat the hands played and won, profit and final stack
+        """
+        stats = []
+        for seat, casino_game in enumerate(self.seats):
+            stats.append({
+                'seat': seat + 1,
+                'hands_played': len(casino_game.get_round_history()),
+                'hands_won': self.hands_won[seat],
+                'profit': casino_game.get_player_stack() - casino_game.starting_stack,
+                'final_stack': casino_game.get_player_stack()
+            })
+        return stats
+
+    def _print_session_stats(self):
+        """Print statistics for the session"""
+        print("\n=== Table Statistics ===")
+        print(f"Rounds played: {self.total_rounds}")
+        if self.elapsed:
+            seat_hands = sum(stats['hands_played'] for stats in self.get_seat_stats())
+            print(f"Throughput: {self.total_rounds / self.elapsed:.1f} rounds/s, {seat_hands / self.elapsed:.1f} seat-hands/s")
+        for stats in self.get_seat_stats():
+            print(f"Seat {stats['seat']}: hands {stats['hands_played']}, won {stats['hands_won']}, "
+                  f"profit ${stats['profit']}, final stack ${stats['final_stack']}")
+
+
+if __name__ == "__main__":
+    num_seats = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    table = TableSimulator(num_seats=num_seats)
+    table.simulate_session(num_rounds=1000)
@@ -11,7 +11,7 @@ CARD_IMAGES = [f"card_images/{suit}_{rank}.png" for suit in ["hearts", "diamonds
 STARTING_BALANCE = 1000
 
 class PokerGameUI:
-    def __init__(self, root):
+    def __init__(self, root, compact_log=None):
         self.root = root
         self.root.title("Ultimate Texas Holdem")
         self.root.geometry("1200x800")
@@ -20,7 +20,6 @@ class PokerGameUI:
         self.game = PokerGame()
         self.casino_game = CasinoPokerGame()
         self.evaluate = PokerHandEvaluator()
-        self.bot_simulator = CasinoGameSimulator()
         
         # Game stats tracking
         self.total_hands = 0
@@ -31,6 +30,18 @@ class PokerGameUI:
         self.output_bot_txt = f'bot_stats_{generate_timestamp()}.txt'
         self.starting_stack = self.casino_game.get_player_stack()
 
+        # Compact mode: the player's hands are dealt from the log's seed and
+        # only decisions are written; the text log is rebuilt from it at exit.
+        # The bot plays the same deals, so its log shares the seed and position
+        self.compact_log = compact_log
+        self.bot_compact_log = None
+        if compact_log is not None:
+            self.game = compact_log.poker_game()
+            self.bot_compact_log = CompactLog(compact_log.path.replace('player_stats_', 'bot_stats_'),
+                                              seed=compact_log.seed, position=compact_log.position,
+                                              deal_order='deal_cards', start_bet=10, trip_bet=5, source='ui bot')
+        self.bot_simulator = CasinoGameSimulator(compact_log=self.bot_compact_log)
+
         # Round state tracking
         self.game_stage = "initial"  # Possible stages: initial, ante, pre-flop, flop, river, showdown
         self.player_cards = []
@@ -58,6 +69,10 @@ class PokerGameUI:
         self.dealer_card_frame = self.create_card_frame("Dealer Cards")
         self.com_card_frame = self.create_card_frame("Community Cards")
         self.player_card_frame = self.create_card_frame("Player Cards")
+
+        # River equity overlay against every possible dealer hand
+        self.equity_label = tk.Label(self.root, text="", font=("Arial", 11))
+        self.equity_label.pack(pady=5)
         
         # Action Buttons Frame
         self.action_frame = tk.Frame(self.root)
@@ -194,6 +209,7 @@ class PokerGameUI:
     def place_river_cards(self):
         # Add 4th and 5th community cards
         self.display_cards(self.com_cards, self.com_card_frame)
+        self.show_equity()
         
         # Update game stage
         self.game_stage = "river"
@@ -231,6 +247,8 @@ class PokerGameUI:
 
         self.display_cards(self.dealer_cards, self.dealer_card_frame)
         # Call fold method in casino game
+        if self.compact_log is not None:
+            self.compact_log.record(self.casino_game, folded=True)
         self.casino_game.fold()
 
         self.total_profit = self.casino_game.get_player_stack() - self.starting_stack
@@ -255,10 +273,17 @@ class PokerGameUI:
         
         # Add full community cards
         self.display_cards(self.com_cards, self.com_card_frame)
+        self.show_equity()
         
         # Setup showdown actions
         self.setup_showdown_actions()
     
+    def show_equity(self):
+        # Exact equity from the board cache; the bot's river decision reuses the same entry
+        equity = get_board_ranks(self.com_cards).equity(self.player_cards)
+        self.equity_label.config(text=f"Versus any dealer hand: win {equity['Player 1 Win']}%, "
+                                      f"lose {equity['Player 2 Win']}%, tie {equity['Tie']}%")
+
     def setup_showdown_actions(self):
         # Clear previous action buttons
         for widget in self.action_frame.winfo_children():
@@ -269,6 +294,7 @@ class PokerGameUI:
                                     font=("Arial", 10))
         showdown_button.pack(side=tk.LEFT, padx=5)
     
+    @INSTRUMENTATION.timed('ui.showdown')
     def showdown(self):
         # Display dealer cards
         self.display_cards(self.dealer_cards, self.dealer_card_frame)
@@ -281,6 +307,8 @@ class PokerGameUI:
         dealer_hand_score = self.evaluate.evaluate_hand(self.dealer_cards, self.com_cards)
 
         # Resolve the round
+        if self.compact_log is not None:
+            self.compact_log.record(self.casino_game)
         self.casino_game.resolve_round(player_hand_score[0], dealer_hand_score[0], winner_index)
 
         if winner_index == 1:
@@ -325,6 +353,8 @@ class PokerGameUI:
             for widget in frame.winfo_children():
                 widget.destroy()
         
+        self.equity_label.config(text="")
+
         # Reset game stage
         self.game_stage = "initial"
         self.stage_label.config(text="Game Stage: Initial")
@@ -351,7 +381,10 @@ class PokerGameUI:
         converted_cards = [f"card_images/{suit_map[suit]}_{rank_map[rank]}.png" for rank, suit in cards]
         return converted_cards
     
+    @INSTRUMENTATION.timed('logging')
     def append_hand_to_txt(self, round_results, result):
+        if self.compact_log is not None:
+            return
         with open(self.output_player_txt, "a") as file:
             sys.stdout = file  # Redirect print statements to the file
             print(f"\n=== Hand {self.total_hands} ===")
@@ -363,7 +396,12 @@ class PokerGameUI:
             print(f"\nHand complete. Current stack: {self.casino_game.get_player_stack()}")
             sys.stdout = sys.__stdout__
         
+    @INSTRUMENTATION.timed('ui.bot_logic')
     def bot_logic(self):
+        if self.bot_compact_log is not None:
+            self.bot_simulator.simulate_hand_with_given_cards(10, self.player_cards, self.dealer_cards, self.com_cards,
+                                                              make_trip_bet=True, trip_bet_amount=5, verbose=False)
+            return
         with open(self.output_bot_txt, "a") as file:
             sys.stdout = file  # Redirect print statements to the file
             print(f"\n=== Hand {self.total_hands} ===")
@@ -392,6 +430,7 @@ class PokerGameUI:
         
         return sums
     
+    @INSTRUMENTATION.timed('ui.display_cards')
     def display_cards(self, cards, frame, width=100, height=150):
         # Clear previous cards in the frame
         for widget in frame.winfo_children():
@@ -408,8 +447,23 @@ class PokerGameUI:
 
 if __name__ == "__main__":
     root = tk.Tk()
-    game = PokerGameUI(root)
+    compact_log = None
+    if '--compact' in sys.argv:
+        compact_log = CompactLog(f'player_stats_{generate_timestamp()}.uthlog', deal_order='deal_cards',
+                                 initial_stack=STARTING_BALANCE, trip_bet=5, source='ui')
+    game = PokerGameUI(root, compact_log)
     root.mainloop()
 
+    if compact_log is not None:
+        # Rebuild the player's and the bot's text logs from the seed for the graphs
+        for log, output in ((compact_log, game.output_player_txt), (game.bot_compact_log, game.output_bot_txt)):
+            with open(output, 'w') as file:
+                sys.stdout = file
+                replay_session(log.path, verbose=True)
+                sys.stdout = sys.__stdout__
+
+    if INSTRUMENTATION.enabled:
+        INSTRUMENTATION.to_json(f'ui_instrumentation_{generate_timestamp()}.json')
+
     plot_graph(game.output_bot_txt)
     plot_graph(game.output_player_txt)
\ No newline at end of file